@@ -1,17 +1,117 @@
-import os
+import argparse
 import sys
+from typing import List, Optional, TextIO
 
 from src.config import Config
-from mazegen import MazeGenerator
+from mazegen import MazeCache, MazeGenerator, save_images, save_many
+from mazegen.image import is_image_file
+
+# Terminal lines the menu and prompt need below the maze.
+MENU_ROWS = 11
+# Menu keys that scroll the view, in half screens.
+PAN_KEYS = {"w": (0, -1), "a": (-1, 0), "s": (0, 1), "d": (1, 0)}
+
+
+def parse_seeds(spec: str) -> List[int]:
+    """Seeds from "START:STOP" (STOP excluded) or "A,B,C"."""
+    if ":" in spec:
+        start, _, stop = spec.partition(":")
+        return list(range(int(start), int(stop)))
+    return [int(s) for s in spec.split(",")]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="A-Maze-ing")
+    parser.add_argument("config", nargs="?", default="config.txt")
+    parser.add_argument(
+        "--seeds",
+        help="generate these seeds (START:STOP or A,B,C) without the "
+        "interactive menu",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="worker processes for --seeds (default: all cores)",
+    )
+    parser.add_argument(
+        "--output",
+        help="output file for --seeds (a .png or .ppm name saves images); "
+        "{seed} is replaced by the seed "
+        "(default: OUTPUT_FILE with the seed appended)",
+    )
+    parser.add_argument(
+        "--combined",
+        action="store_true",
+        help="write all --seeds mazes to the single --output file",
+    )
+    parser.add_argument(
+        "--cache",
+        nargs="?",
+        const="",
+        metavar="DIR",
+        help="load mazes generated before from an on-disk cache (default "
+        "directory: $MAZEGEN_CACHE or ~/.cache/mazegen) and store new ones",
+    )
+    parser.add_argument(
+        "--stats",
+        metavar="FILE",
+        help="append the timings and counters of every generation to FILE "
+        "as JSON lines ('-' for standard error)",
+    )
+    parser.add_argument(
+        "--prefetch",
+        type=int,
+        default=2,
+        metavar="N",
+        help="generate the next N mazes in the background so that "
+        "re-generating is instant (default: 2, 0 to turn off)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="include the top cProfile functions in --stats (standard "
+        "error if not given)",
+    )
+    return parser.parse_args()
+
+
+def write_stats(mg: MazeGenerator, out: Optional[TextIO]) -> None:
+    if out is not None and mg.stats is not None:
+        out.write(mg.stats.to_json() + "\n")
+        out.flush()
 
 
 def main() -> None:
     from src.renderer import Renderer
 
+    args = parse_args()
+    stats: Optional[TextIO] = None
+    mg: Optional[MazeGenerator] = None
     try:
-        config_path = sys.argv[1] if len(sys.argv) > 1 else "config.txt"
         config = Config()
-        config.load(config_path)
+        config.load(args.config)
+
+        if args.seeds is not None:
+            if args.stats is not None or args.profile:
+                raise ValueError("--stats and --profile need the menu")
+            output = args.output or config.output_file
+            if is_image_file(output):
+                if args.combined:
+                    raise ValueError("--combined needs a text --output")
+                paths = save_images(
+                    config, parse_seeds(args.seeds), output, args.workers
+                )
+            else:
+                paths = save_many(
+                    config,
+                    parse_seeds(args.seeds),
+                    output,
+                    workers=args.workers,
+                    combined=args.combined,
+                )
+            print(f"Wrote {len(paths)} file(s)")
+            return
 
         mg = MazeGenerator(
             config.width,
@@ -20,14 +120,25 @@ def main() -> None:
             config.exit,
             42,
             config.perfect,
+            config.algorithm,
+            cache=None if args.cache is None else MazeCache(args.cache),
+            instrument=args.stats is not None,
+            profile=args.profile,
         )
-        r = Renderer(mg.maze)
+        # --profile alone prints the stats to standard error.
+        target = "-" if args.stats is None and args.profile else args.stats
+        if target == "-":
+            stats = sys.stderr
+        elif target is not None:
+            stats = open(target, "a")
+        write_stats(mg, stats)
+        mg.prefetch(args.prefetch)
+        r = Renderer(mg.maze, reserve_rows=MENU_ROWS)
 
         show_solution = False
 
         mg.save(config.output_file)
-        os.system("clear")
-        r.render()
+        r.draw()
 
         while True:
 
@@ -36,6 +147,7 @@ def main() -> None:
             print("2. Show/Hide path from entry to exit")
             print("3. Rotate maze colors")
             print("4. Quit")
+            print("w/a/s/d. Scroll the view   +/-. Zoom in/out")
             if not mg.maze.did_draw_42:
                 print(
                     "\n\033[93mMaze size is too small"
@@ -48,20 +160,39 @@ def main() -> None:
 
             if choice == "1":
                 mg.regenerate()
-                mg.save(config.output_file)
+                write_stats(mg, stats)
+                mg.save_async(config.output_file)
             elif choice == "2":
                 show_solution = not show_solution
             elif choice == "3":
                 r.rotate_colors()
+            elif choice in PAN_KEYS:
+                dx, dy = PAN_KEYS[choice]
+                columns, lines = r.view_size()
+                r.pan(dx * max(1, columns // 2), dy * max(1, lines // 2))
+            elif choice == "+":
+                r.zoom_in()
+            elif choice == "-":
+                r.zoom_out()
 
-            os.system("clear")
+            # Only the characters that changed are redrawn.
             if show_solution:
-                r.render(mg.solution)
+                r.draw(mg.path_overlay)
             else:
-                r.render()
+                r.draw()
 
     except Exception as e:
         print(f"Error: {e}")
+    finally:
+        # Finish the last save_async() however the menu ended (Quit, EOF,
+        # Ctrl-C or an error), and report it if it failed.
+        if mg is not None:
+            try:
+                mg.close()
+            except Exception as e:
+                print(f"Error: {e}")
+        if stats is not None and stats is not sys.stderr:
+            stats.close()
 
 
 if __name__ == "__main__":
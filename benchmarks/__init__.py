@@ -0,0 +1 @@
+"""Performance benchmarks for the mazegen package (not shipped)."""
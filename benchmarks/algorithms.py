@@ -0,0 +1,46 @@
+"""Time and peak memory of every algorithm in mazegen.ALGORITHMS.
+
+Usage:
+    python -m benchmarks.algorithms [SIZE ...]
+
+Time is measured on a plain run; peak memory is the tracemalloc peak of a
+second run with the same seed, on top of the already allocated Maze.
+"""
+
+import sys
+import time
+import tracemalloc
+from typing import List
+
+from mazegen.algorithms import ALGORITHMS
+from mazegen.maze import Maze
+
+DEFAULT_SIZES = [100, 300, 1000]
+SEED = 42
+
+
+def main(argv: List[str]) -> None:
+    sizes = [int(a) for a in argv] or DEFAULT_SIZES
+    print(f"{'algorithm':<12} {'size':>10} {'time':>10} {'peak':>12}")
+    for size in sizes:
+        for name, cls in ALGORITHMS.items():
+            maze = Maze(size, size, (0, 0), (size - 1, size - 1))
+            gen = cls(maze)
+
+            start = time.perf_counter()
+            gen.generate(SEED)
+            elapsed = time.perf_counter() - start
+
+            tracemalloc.start()
+            gen.generate(SEED)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            print(
+                f"{name:<12} {f'{size}x{size}':>10} {elapsed:9.3f}s"
+                f" {peak / 2**20:8.2f} MiB"
+            )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
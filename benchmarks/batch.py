@@ -0,0 +1,58 @@
+"""Scaling of mazegen.generate_many from one worker up to all cores.
+
+Usage:
+    python -m benchmarks.batch [SEEDS [WIDTH HEIGHT]]
+
+Workers=1 is the serial in-process path; the others go through the
+process pool.  Every run must yield the same texts.
+"""
+
+import os
+import sys
+import time
+from typing import List
+
+from mazegen import generate_many
+from mazegen.maze import Coord
+
+DEFAULT_SEEDS = 2000
+DEFAULT_SIZE = (20, 15)
+
+
+class _Config:
+    def __init__(self, width: int, height: int) -> None:
+        self.width = width
+        self.height = height
+        self.entry: Coord = (0, 0)
+        self.exit: Coord = (width - 1, height - 1)
+        self.perfect = True
+
+
+def main(argv: List[str]) -> None:
+    count = int(argv[0]) if argv else DEFAULT_SEEDS
+    width, height = (
+        (int(argv[1]), int(argv[2])) if len(argv) > 2 else DEFAULT_SIZE
+    )
+    config = _Config(width, height)
+    cores = os.cpu_count() or 1
+
+    baseline = 0.0
+    reference: List[str] = []
+    for workers in sorted({1, 2, cores // 2, cores} - {0}):
+        if workers > cores:
+            continue
+        start = time.perf_counter()
+        texts = [t for _, t in generate_many(config, range(count), workers)]
+        elapsed = time.perf_counter() - start
+        if workers == 1:
+            baseline, reference = elapsed, texts
+        same = "same" if texts == reference else "DIFFERENT"
+        print(
+            f"{width}x{height} x{count} workers={workers:<3}"
+            f" {elapsed:8.2f}s {count / elapsed:9.0f} mazes/s"
+            f"  speedup {baseline / elapsed:5.2f}  {same}"
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
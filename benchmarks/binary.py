@@ -0,0 +1,147 @@
+"""Round-trip and load-time checks for the binary .mzb format.
+
+Usage:
+    python -m benchmarks.binary [GIB]
+
+First saves mazes of a few sizes both ways, checks that the loaded .mzb
+writes back exactly the same hex text and seed (exiting with an error
+if not), and compares file sizes and save times.  Then builds a
+GIB-sized .mzb file (default 1) by stacking copies of one streamed
+16384-wide maze (walls stay consistent, the copies are just not
+connected), and times opening it, random cell reads and a sequential
+scan of every row.
+"""
+
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import List
+
+from mazegen import MazeGenerator, load_binary, stream_rows
+from mazegen.binary import HEADER, MAGIC, VERSION, _pack
+from mazegen.writer import Writer
+
+SIZES = [20, 100, 1000]
+BIG_WIDTH = 16384
+TILE_ROWS = 64
+RANDOM_READS = 1_000_000
+
+
+def round_trip(directory: str) -> None:
+    for size in SIZES:
+        mg = MazeGenerator(size, size, seed=size)
+        text_path = os.path.join(directory, "maze.txt")
+        bin_path = os.path.join(directory, "maze.mzb")
+
+        start = time.perf_counter()
+        mg.save(text_path)
+        t_text = time.perf_counter() - start
+        start = time.perf_counter()
+        mg.save_binary(bin_path)
+        t_bin = time.perf_counter() - start
+
+        expected = io.StringIO()
+        mg.dump(expected)
+        with load_binary(bin_path) as view:
+            got = io.StringIO()
+            w = view.width
+            rows = (view.walls[y * w:(y + 1) * w] for y in range(size))
+            Writer.write_rows(got, rows)
+            Writer.write_endpoints(got, view.entry, view.exit)
+            got.write(view.directions + "\n")
+            same = got.getvalue() == expected.getvalue() and (
+                view.seed == size
+            )
+        print(
+            f"{size}x{size}: text {os.path.getsize(text_path)} B "
+            f"in {t_text:.3f}s, mzb {os.path.getsize(bin_path)} B "
+            f"in {t_bin:.3f}s, round trip {'ok' if same else 'MISMATCH'}"
+        )
+        if not same:
+            raise SystemExit(f"{size}x{size}: .mzb round trip differs")
+
+
+def write_big(path: str, gib: float) -> int:
+    """Write a .mzb of about gib GiB; returns its height."""
+    row_bytes = BIG_WIDTH // 2
+    height = max(TILE_ROWS, int(gib * 2**30 / row_bytes))
+    height -= height % TILE_ROWS
+    tile = b"".join(
+        _pack(bytes(row), 4)
+        for row in stream_rows(BIG_WIDTH, TILE_ROWS, seed=1)
+    )
+    with open(path, "wb") as f:
+        f.write(
+            HEADER.pack(
+                MAGIC,
+                VERSION,
+                1,
+                0,
+                BIG_WIDTH,
+                height,
+                0,
+                0,
+                BIG_WIDTH - 1,
+                height - 1,
+                0,
+                0,
+            )
+        )
+        for _ in range(height // TILE_ROWS):
+            f.write(tile)
+    return height
+
+
+def load_big(directory: str, gib: float) -> None:
+    path = os.path.join(directory, "big.mzb")
+    start = time.perf_counter()
+    height = write_big(path, gib)
+    size = os.path.getsize(path)
+    print(
+        f"\n{BIG_WIDTH}x{height} ({size / 2**30:.2f} GiB) written in "
+        f"{time.perf_counter() - start:.1f}s"
+    )
+
+    start = time.perf_counter()
+    view = load_binary(path)
+    print(f"open: {(time.perf_counter() - start) * 1e3:.2f} ms")
+
+    rnd = random.Random(0)
+    n = BIG_WIDTH * height
+    picks = [rnd.randrange(n) for _ in range(RANDOM_READS)]
+    walls = view.walls
+    start = time.perf_counter()
+    for i in picks:
+        walls[i]
+    t = time.perf_counter() - start
+    print(
+        f"{RANDOM_READS} random cell reads: {t:.2f}s "
+        f"({t / RANDOM_READS * 1e6:.2f} us/read)"
+    )
+
+    start = time.perf_counter()
+    open_east = 0
+    for y in range(height):
+        row = walls[y * BIG_WIDTH:(y + 1) * BIG_WIDTH]
+        open_east += BIG_WIDTH - row.count(2) - row.count(3)
+    t = time.perf_counter() - start
+    print(
+        f"row scan: {t:.2f}s ({size / 2**20 / t:.0f} MiB/s, "
+        f"{n / t / 1e6:.0f}M cells/s)"
+    )
+    view.close()
+    os.remove(path)
+
+
+def main(argv: List[str]) -> None:
+    gib = float(argv[0]) if argv else 1.0
+    with tempfile.TemporaryDirectory() as directory:
+        round_trip(directory)
+        load_big(directory, gib)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,100 @@
+"""Show that carving no longer costs a pass over the border, and that
+generation time grows linearly with the number of cells.
+
+Usage:
+    python -m benchmarks.borders [SIZE ...]
+
+BorderPassMaze re-closes every border wall after each carve() and fill(),
+as Maze did before border integrity held by construction; with it a
+carve costs O(width + height) instead of O(1).  Both mazes carve the
+same CARVES walls and must end up identical.  Then Genarator.generate
+runs on SIZE x SIZE mazes (default up to 2000x2000): its time per cell
+should stay about the same at every size.  Every maze is checked with
+Maze.check_invariants().
+"""
+
+import sys
+import time
+from typing import List, Tuple
+
+from mazegen.cell import EAST, NORTH, SOUTH, WEST
+from mazegen.direction import Direction
+from mazegen.generator import Genarator
+from mazegen.maze import Maze
+
+DEFAULT_SIZES = [250, 500, 1000, 2000]
+CARVES = 2000
+SEED = 42
+
+
+class BorderPassMaze(Maze):
+    def _close_borders(self) -> None:
+        w, h = self.width, self.height
+        walls = self.walls
+        last = (h - 1) * w
+        for x in range(w):
+            walls[x] |= NORTH
+            walls[last + x] |= SOUTH
+        for i in range(0, w * h, w):
+            walls[i] |= WEST
+            walls[i + w - 1] |= EAST
+
+    def carve(self, x: int, y: int, d: Direction) -> None:
+        super().carve(x, y, d)
+        self._close_borders()
+
+    def fill(self, x: int, y: int) -> None:
+        super().fill(x, y)
+        self._close_borders()
+
+
+def _carve(maze: Maze) -> Tuple[float, bytes]:
+    """Seconds per carve() opening east walls row by row."""
+    w = maze.width
+    done = 0
+    start = time.perf_counter()
+    for y in range(maze.height):
+        for x in range(w - 1):
+            if maze.is_locked(x, y) or maze.is_locked(x + 1, y):
+                continue
+            maze.carve(x, y, Direction.E)
+            done += 1
+            if done == CARVES:
+                return (time.perf_counter() - start) / done, bytes(
+                    maze.walls
+                )
+    return (time.perf_counter() - start) / max(done, 1), bytes(maze.walls)
+
+
+def main(argv: List[str]) -> None:
+    sizes = [int(a) for a in argv] or DEFAULT_SIZES
+    for size in sizes:
+        corners = (0, 0), (size - 1, size - 1)
+        old_time, old_walls = _carve(BorderPassMaze(size, size, *corners))
+        maze = Maze(size, size, *corners)
+        new_time, new_walls = _carve(maze)
+        maze.check_invariants()
+        same = "identical" if old_walls == new_walls else "DIFFERENT"
+        print(
+            f"{size}x{size} carve: border pass {old_time * 1e6:9.2f}us  "
+            f"by construction {new_time * 1e6:6.2f}us  "
+            f"x{old_time / new_time:7.1f}  {same}"
+        )
+
+    for size in sizes:
+        maze = Maze(size, size, (0, 0), (size - 1, size - 1))
+        start = time.perf_counter()
+        Genarator(maze).generate(SEED)
+        elapsed = time.perf_counter() - start
+        start = time.perf_counter()
+        maze.check_invariants()
+        checked = time.perf_counter() - start
+        print(
+            f"{size}x{size} generate: {elapsed:8.3f}s  "
+            f"{elapsed * 1e9 / (size * size):6.0f}ns/cell  "
+            f"check_invariants {checked:6.3f}s"
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,40 @@
+"""Time MazeCache misses against hits.
+
+Usage:
+    python -m benchmarks.cache [SIZE ...]
+
+For each SIZE x SIZE maze (default 200 and 1000) builds a MazeGenerator
+with an empty cache (generate, solve and store) and then again (load),
+and reports both times, the entry size and the cache counters.
+"""
+
+import sys
+import tempfile
+import time
+from typing import List
+
+from mazegen import MazeCache, MazeGenerator
+
+SIZES = [200, 1000]
+
+
+def main(argv: List[str]) -> None:
+    sizes = [int(a) for a in argv] or SIZES
+    with tempfile.TemporaryDirectory() as directory:
+        cache = MazeCache(directory)
+        for size in sizes:
+            times = []
+            for _ in range(2):
+                start = time.perf_counter()
+                MazeGenerator(size, size, seed=1, cache=cache)
+                times.append(time.perf_counter() - start)
+            miss, hit = times
+            print(
+                f"{size}x{size}: miss {miss:.3f}s, hit {hit:.3f}s "
+                f"({miss / hit:.0f}x), {cache.size():,} B cached"
+            )
+        print(cache.stats())
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
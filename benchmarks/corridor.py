@@ -0,0 +1,82 @@
+"""Compare imperfect (PERFECT=False) generation with and without the
+incremental 3x3 open-wall counts.
+
+Usage:
+    python -m benchmarks.corridor [SIZE ...]
+
+The reference generator answers "would this carve open a 3x3 area?" by
+rescanning the walls of every 3x3 region around the carve, as Genarator
+did before Maze kept per-region counts.  Both runs must carve the same
+walls.
+"""
+
+import sys
+import time
+from typing import List, Tuple
+
+from mazegen.cell import EAST, SOUTH
+from mazegen.generator import Genarator
+from mazegen.maze import Maze
+
+DEFAULT_SIZES = [200, 500, 1000]
+SEED = 42
+
+
+class RescanGenarator(Genarator):
+    vectorize_loops = False
+
+    def _would_create_wide_corridor(self, i: int, d: int) -> bool:
+        w = self.maze.width
+        if d == 1:
+            carved, bit = i, EAST
+        elif d == 3:
+            carved, bit = i - 1, EAST
+        elif d == 2:
+            carved, bit = i, SOUTH
+        else:
+            carved, bit = i - w, SOUTH
+        cy, cx = divmod(carved, w)
+        tx_min = max(cx - (1 if bit == EAST else 2), 0)
+        tx_max = min(cx, w - 3)
+        ty_min = max(cy - (2 if bit == EAST else 1), 0)
+        ty_max = min(cy, self.maze.height - 3)
+        for ty in range(ty_min, ty_max + 1):
+            for tx in range(tx_min, tx_max + 1):
+                if self._is_3x3_open(ty * w + tx, carved, bit):
+                    return True
+        return False
+
+    def _is_3x3_open(self, t: int, carved: int, bit: int) -> bool:
+        walls = self.maze.walls
+        w = self.maze.width
+        for p in (t, t + 1, t + w, t + w + 1, t + 2 * w, t + 2 * w + 1):
+            if walls[p] & EAST and not (p == carved and bit == EAST):
+                return False
+        for p in (t, t + 1, t + 2, t + w, t + w + 1, t + w + 2):
+            if walls[p] & SOUTH and not (p == carved and bit == SOUTH):
+                return False
+        return True
+
+
+def _time(size: int, rescan: bool) -> Tuple[float, bytes]:
+    maze = Maze(size, size, (0, 0), (size - 1, size - 1), perfect=False)
+    gen = RescanGenarator(maze) if rescan else Genarator(maze)
+    start = time.perf_counter()
+    gen.generate(SEED)
+    return time.perf_counter() - start, bytes(maze.walls)
+
+
+def main(argv: List[str]) -> None:
+    sizes = [int(a) for a in argv] or DEFAULT_SIZES
+    for size in sizes:
+        old_time, old_walls = _time(size, rescan=True)
+        new_time, new_walls = _time(size, rescan=False)
+        same = "identical" if old_walls == new_walls else "DIFFERENT"
+        print(
+            f"{size}x{size}: rescan {old_time:8.3f}s  "
+            f"counts {new_time:8.3f}s  x{old_time / new_time:5.2f}  {same}"
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
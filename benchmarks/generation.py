@@ -0,0 +1,120 @@
+"""Compare Genarator.generate against the previous Direction-based DFS.
+
+Usage:
+    python -m benchmarks.generation [SIZE ...]
+
+The reference implementation below is the tuple/set/enum DFS that
+Genarator used before it switched to flat cell indices.  It carves through
+``cells[y][x]`` views without the per-carve border pass, so the comparison
+measures the DFS loop itself.  Both runs must produce identical walls.
+"""
+
+import random
+import sys
+import time
+from typing import List, Set, Tuple
+
+from mazegen.direction import Direction
+from mazegen.generator import Genarator
+from mazegen.maze import Maze
+
+DEFAULT_SIZES = [100, 300, 1000]
+SEED = 42
+
+
+class ReferenceGenarator:
+    def __init__(self, maze: Maze):
+        self.maze = maze
+
+    def _is_3x3_open(
+        self, tx: int, ty: int, carved: Tuple[int, int, Direction]
+    ) -> bool:
+        for row in range(3):
+            for col in range(3):
+                if not self.maze.in_bounds(tx + col, ty + row):
+                    return False
+        for row in range(3):
+            for col in range(2):
+                px, py = tx + col, ty + row
+                if (px, py, Direction.E) == carved:
+                    continue
+                if self.maze.cells[py][px].is_closed(Direction.E):
+                    return False
+        for row in range(2):
+            for col in range(3):
+                px, py = tx + col, ty + row
+                if (px, py, Direction.S) == carved:
+                    continue
+                if self.maze.cells[py][px].is_closed(Direction.S):
+                    return False
+        return True
+
+    def _would_create_wide_corridor(
+        self, x: int, y: int, d: Direction
+    ) -> bool:
+        nx, ny = x + d.dx, y + d.dy
+        if d == Direction.E:
+            carved = (x, y, Direction.E)
+        elif d == Direction.W:
+            carved = (nx, ny, Direction.E)
+        elif d == Direction.S:
+            carved = (x, y, Direction.S)
+        else:
+            carved = (nx, ny, Direction.S)
+        for tx in range(max(x, nx) - 2, min(x, nx) + 1):
+            for ty in range(max(y, ny) - 2, min(y, ny) + 1):
+                if self._is_3x3_open(tx, ty, carved):
+                    return True
+        return False
+
+    def generate(self, seed: int) -> None:
+        maze = self.maze
+        maze.reset()
+        random.seed(seed)
+        visited: Set[Tuple[int, int]] = set()
+        x = random.randint(0, maze.width - 1)
+        y = random.randint(0, maze.height - 1)
+        while maze.cells[y][x].locked:
+            x = random.randint(0, maze.width - 1)
+            y = random.randint(0, maze.height - 1)
+        stack = [(x, y)]
+        visited.add((x, y))
+        while stack:
+            x, y = stack[-1]
+            candidates = []
+            for d, nx, ny in maze.neighbors(x, y):
+                if (nx, ny) not in visited and not maze.cells[ny][nx].locked:
+                    if not self._would_create_wide_corridor(x, y, d):
+                        candidates.append((d, nx, ny))
+            if candidates:
+                d, nx, ny = random.choice(candidates)
+                maze.cells[y][x].set_wall(d, False)
+                maze.cells[ny][nx].set_wall(Direction.opposite(d), False)
+                visited.add((nx, ny))
+                stack.append((nx, ny))
+            else:
+                stack.pop()
+
+
+def _time(size: int, fast: bool) -> Tuple[float, bytes]:
+    maze = Maze(size, size, (0, 0), (size - 1, size - 1))
+    gen = Genarator(maze) if fast else ReferenceGenarator(maze)
+    start = time.perf_counter()
+    gen.generate(SEED)
+    return time.perf_counter() - start, bytes(maze.walls)
+
+
+def main(argv: List[str]) -> None:
+    sizes = [int(a) for a in argv] or DEFAULT_SIZES
+    for size in sizes:
+        ref_time, ref_walls = _time(size, fast=False)
+        new_time, new_walls = _time(size, fast=True)
+        same = "identical" if ref_walls == new_walls else "DIFFERENT"
+        print(
+            f"{size}x{size}: reference {ref_time:8.3f}s  "
+            f"flat {new_time:8.3f}s  x{ref_time / new_time:5.1f}  {same}"
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,74 @@
+"""Time PNG and PPM export of mazes up to 2000x2000.
+
+Usage:
+    python -m benchmarks.image [SIZE ...]
+
+For each SIZE x SIZE maze (default 100, 500 and 2000) writes the image
+with its solution at 1- and 4-pixel cells, as PNG (zlib levels 6 and 1)
+and as PPM, and reports times and file sizes.  Then exports BATCH small
+mazes with save_images() serially and with all cores.
+"""
+
+import os
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+from typing import List
+
+from mazegen import MazeGenerator, save_images
+from mazegen.image import dump_png
+
+SIZES = [100, 500, 2000]
+CELLS = [1, 4]
+BATCH = 40
+BATCH_SIZE = 50
+
+
+def main(argv: List[str]) -> None:
+    sizes = [int(a) for a in argv] or SIZES
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            start = time.perf_counter()
+            mg = MazeGenerator(size, size, seed=1)
+            print(
+                f"{size}x{size} (generated in "
+                f"{time.perf_counter() - start:.2f}s)"
+            )
+            for cell in CELLS:
+                for name, level in (("png", 6), ("png -1", 1), ("ppm", 0)):
+                    path = os.path.join(directory, "maze." + name[:3])
+                    start = time.perf_counter()
+                    if level:
+                        with open(path, "wb") as f:
+                            dump_png(f, mg.maze, mg.path_overlay, cell, 1,
+                                     level=level)
+                    else:
+                        mg.save_image(path, cell)
+                    elapsed = time.perf_counter() - start
+                    print(
+                        f"  cell {cell} {name:<7} {elapsed:7.2f}s "
+                        f"{os.path.getsize(path):>12,} B"
+                    )
+
+        config = SimpleNamespace(
+            width=BATCH_SIZE,
+            height=BATCH_SIZE,
+            entry=(0, 0),
+            exit=(BATCH_SIZE - 1, BATCH_SIZE - 1),
+            perfect=True,
+        )
+        output = os.path.join(directory, "batch_{seed}.png")
+        for workers in (1, None):
+            start = time.perf_counter()
+            save_images(config, range(BATCH), output, workers=workers)
+            elapsed = time.perf_counter() - start
+            print(
+                f"save_images {BATCH} x {BATCH_SIZE}x{BATCH_SIZE}, "
+                f"workers={workers or os.cpu_count()}: "
+                f"{BATCH / elapsed:.1f} images/s"
+            )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,123 @@
+"""Compare loop insertion and maze statistics with and without NumPy.
+
+Usage:
+    python -m benchmarks.loops [SIZE ...]
+
+For each SIZE x SIZE imperfect maze (default 200 and 1000) carves the
+tree once, then adds the loops one attempt at a time (Genarator without
+vectorize_loops) and with mazegen.vectorized; both must open the same
+walls and leave the random generator in the same state, with a stock
+random.Random and with a subclass that only overrides random() and
+seed() (which add_loops() must leave to Genarator).  Then compares
+mazegen.vectorized.maze_stats() with the same statistics computed by
+looping over Maze.cells.
+"""
+
+import random
+import sys
+import time
+from typing import Dict, List, Tuple, Type
+
+from mazegen.generator import Genarator
+from mazegen.maze import Maze
+from mazegen.solver import Solver
+from mazegen.vectorized import maze_stats
+
+SIZES = [200, 1000]
+SEED = 42
+
+
+class _LinearRandom(random.Random):
+    """A 64-bit linear congruential generator behind the Random API."""
+
+    def seed(self, a: object = None, version: int = 2) -> None:
+        self._state = hash(a) & (1 << 64) - 1
+
+    def random(self) -> float:
+        self._state = (
+            self._state * 6364136223846793005 + 1442695040888963407
+        ) & (1 << 64) - 1
+        return (self._state >> 11) / (1 << 53)
+
+
+def _add_loops(
+    size: int, vectorize: bool, rng_class: Type[random.Random]
+) -> Tuple[float, bytes, float]:
+    maze = Maze(size, size, (0, 0), (size - 1, size - 1), perfect=False)
+    gen = Genarator(maze, rng_class())
+    gen.vectorize_loops = vectorize
+    gen.rng.seed(SEED)
+    visited = gen._carve_tree()
+    start = time.perf_counter()
+    gen._add_loops(visited)
+    return time.perf_counter() - start, bytes(maze.walls), gen.rng.random()
+
+
+def reference_stats(
+    maze: Maze, solution: List[Tuple[int, int]]
+) -> Dict[str, int]:
+    stats = dict.fromkeys(
+        ("cells", "dead_ends", "junctions", "longest_corridor"), 0
+    )
+    across = [0] * maze.width
+    for y, row in enumerate(maze.cells):
+        run = 0
+        for x, cell in enumerate(row):
+            run = run + 1 if x and not row[x - 1].east else 1
+            across[x] = (
+                across[x] + 1 if y and not maze.cells[y - 1][x].south else 1
+            )
+            if cell.locked:
+                continue
+            sides = 4 - (cell.north + cell.east + cell.south + cell.west)
+            stats["cells"] += 1
+            stats["dead_ends"] += sides == 1
+            stats["junctions"] += sides >= 3
+            stats["longest_corridor"] = max(
+                stats["longest_corridor"], run, across[x]
+            )
+    stats["solution_length"] = len(solution) - 1
+    return stats
+
+
+def main(argv: List[str]) -> None:
+    sizes = [int(a) for a in argv] or SIZES
+    for size in sizes:
+        for rng_class in (random.Random, _LinearRandom):
+            old_time, old_walls, old_next = _add_loops(
+                size, False, rng_class
+            )
+            new_time, new_walls, new_next = _add_loops(
+                size, True, rng_class
+            )
+            same = (old_walls, old_next) == (new_walls, new_next)
+            print(
+                f"{size}x{size} loops, {rng_class.__name__:<13} one by one "
+                f"{old_time:7.3f}s  numpy {new_time:7.3f}s  "
+                f"x{old_time / new_time:5.2f}  "
+                f"{'identical' if same else 'DIFFERENT'}"
+            )
+            if not same:
+                raise SystemExit(
+                    f"{size}x{size} {rng_class.__name__}: loops differ"
+                )
+
+        maze = Maze(size, size, (0, 0), (size - 1, size - 1), perfect=False)
+        maze.load_walls(new_walls)
+        solution = Solver(maze).solve()
+        start = time.perf_counter()
+        expected = reference_stats(maze, solution)
+        old_time = time.perf_counter() - start
+        start = time.perf_counter()
+        stats = maze_stats(maze, solution)
+        new_time = time.perf_counter() - start
+        print(
+            f"{size}x{size} stats: Maze.cells {old_time:7.3f}s  "
+            f"numpy {new_time:7.3f}s  x{old_time / new_time:5.0f}  "
+            f"{'identical' if stats == expected else 'DIFFERENT'}"
+        )
+        print(f"  {stats}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
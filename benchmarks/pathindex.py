@@ -0,0 +1,73 @@
+"""Time PathIndex queries against one Solver search per query.
+
+Usage:
+    python -m benchmarks.pathindex [SIZE [QUERIES]]
+
+Builds a perfect SIZE x SIZE maze (default 1000), times the index build
+and QUERIES random distance() queries (default 1,000,000), then compares
+path() with Solver.solve on a sample of the same pairs.
+"""
+
+import random
+import sys
+import time
+from typing import List
+
+from mazegen import MazeGenerator
+from mazegen.solver import Solver
+
+SEED = 42
+SOLVER_SAMPLE = 20
+PATH_SAMPLE = 100
+
+
+def main(argv: List[str]) -> None:
+    size = int(argv[0]) if argv else 1000
+    queries = int(argv[1]) if len(argv) > 1 else 1_000_000
+    mg = MazeGenerator(size, size, seed=SEED)
+    maze = mg.maze
+    cells = [
+        (i % size, i // size) for i in range(size * size) if not maze.locked[i]
+    ]
+    rnd = random.Random(SEED)
+    pairs = [(rnd.choice(cells), rnd.choice(cells)) for _ in range(queries)]
+
+    start = time.perf_counter()
+    index = mg.path_index
+    build = time.perf_counter() - start
+    print(f"{size}x{size}: build {build:.3f}s")
+
+    distance = index.distance
+    start = time.perf_counter()
+    for a, b in pairs:
+        distance(a, b)
+    t = time.perf_counter() - start
+    print(
+        f"{queries} distance queries: {t:.3f}s "
+        f"({t / queries * 1e6:.2f} us/query)"
+    )
+
+    sample = pairs[:PATH_SAMPLE]
+    start = time.perf_counter()
+    steps = sum(len(index.path(a, b)) for a, b in sample)
+    t = time.perf_counter() - start
+    print(
+        f"{len(sample)} path queries: {t:.3f}s "
+        f"({t / len(sample) * 1e6:.1f} us/query, "
+        f"{steps / len(sample):.0f} cells/path)"
+    )
+
+    solver = Solver(maze, "bfs")
+    sample = pairs[:SOLVER_SAMPLE]
+    start = time.perf_counter()
+    for a, b in sample:
+        solver.solve(a, b)
+    t = time.perf_counter() - start
+    print(
+        f"{len(sample)} Solver.solve (bfs) queries: {t:.3f}s "
+        f"({t / len(sample) * 1e3:.1f} ms/query)"
+    )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,88 @@
+"""Latency of the interactive "Re-generate" step with and without
+MazeGenerator.prefetch().
+
+Usage:
+    python -m benchmarks.prefetch [SIZE [THINK [COUNT]]]
+
+Simulates the menu loop on a SIZE x SIZE imperfect maze (default 300):
+COUNT times (default 20) wait THINK seconds (default 1.0, the user
+looking at the maze), then regenerate() and save the file.  Without
+prefetch that is regenerate() and save(); with it, regenerate() swaps in
+the prepared maze and save_async() hands the write to a thread.  Prints
+the p50, p90, p99 and max latency of each.  Both must produce the same
+files.
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import List, Tuple
+
+from mazegen import MazeGenerator
+
+SIZE = 300
+THINK = 1.0
+COUNT = 20
+DEPTH = 2
+
+
+def _session(
+    size: int, think: float, count: int, prefetch: bool, path: str
+) -> Tuple[List[float], List[str]]:
+    mg = MazeGenerator(size, size, perfect=False)
+    if prefetch:
+        mg.prefetch(DEPTH)
+    latencies = []
+    texts = []
+    for _ in range(count):
+        time.sleep(think)
+        start = time.perf_counter()
+        mg.regenerate()
+        if prefetch:
+            saved = mg.save_async(path)
+        else:
+            mg.save(path)
+        latencies.append(time.perf_counter() - start)
+        if prefetch:
+            # Outside the measurement: the file is compared below.
+            saved.result()
+        with open(path) as f:
+            texts.append(f.read())
+    mg.close()
+    return latencies, texts
+
+
+def _percentiles(latencies: List[float]) -> str:
+    q = statistics.quantiles(latencies, n=100, method="inclusive")
+    return "  ".join(
+        f"{name} {value * 1000:9.1f}ms"
+        for name, value in (
+            ("p50", q[49]),
+            ("p90", q[89]),
+            ("p99", q[98]),
+            ("max", max(latencies)),
+        )
+    )
+
+
+def main(argv: List[str]) -> None:
+    size = int(argv[0]) if argv else SIZE
+    think = float(argv[1]) if len(argv) > 1 else THINK
+    count = int(argv[2]) if len(argv) > 2 else COUNT
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "maze.txt")
+        results = {}
+        for prefetch in (False, True):
+            results[prefetch] = _session(size, think, count, prefetch, path)
+    same = "same files" if results[False][1] == results[True][1] else (
+        "DIFFERENT files"
+    )
+    print(f"{size}x{size}, {count} regenerations {think}s apart, {same}")
+    for prefetch, name in ((False, "regenerate+save"), (True, "prefetched")):
+        print(f"  {name:<16} {_percentiles(results[prefetch][0])}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
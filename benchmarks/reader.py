@@ -0,0 +1,85 @@
+"""Time reading hex maze files back with mazegen.reader.
+
+Usage:
+    python -m benchmarks.reader [SIZE | FILE]
+
+Without a FILE, writes a SIZE x SIZE (default 2000) perfect maze with
+MazeGenerator.stream_to_file first.  Times load_maze() and a streaming
+read_rows() pass (with its peak traced memory), and compares them with a
+character-by-character parser on files of up to REFERENCE_LIMIT cells.
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import List, Tuple
+
+from mazegen import MazeGenerator
+from mazegen.reader import load_maze, read_footer, read_rows
+
+REFERENCE_LIMIT = 4_000_000
+
+
+def reference_parse(path: str) -> Tuple[List[List[int]], str]:
+    """How callers parsed the format by hand before mazegen.reader."""
+    grid: List[List[int]] = []
+    with open(path) as f:
+        lines = f.read().split("\n")
+    k = 0
+    while lines[k]:
+        grid.append([int(c, 16) for c in lines[k]])
+        k += 1
+    return grid, lines[k + 3]
+
+
+def run(path: str) -> None:
+    size = os.path.getsize(path)
+    print(f"{path}: {size / 2**20:.1f} MiB")
+
+    start = time.perf_counter()
+    maze, solution = load_maze(path)
+    t = time.perf_counter() - start
+    cells = maze.width * maze.height
+    print(
+        f"load_maze: {t:.2f}s for {maze.width}x{maze.height} "
+        f"({cells / t / 1e6:.0f}M cells/s, {len(solution)} path cells)"
+    )
+    del maze, solution
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    with open(path, "rb") as f:
+        rows = sum(1 for _ in read_rows(f))
+        read_footer(f)
+    t = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(
+        f"read_rows: {t:.2f}s for {rows} rows, "
+        f"peak {peak / 2**20:.2f} MiB"
+    )
+
+    if cells <= REFERENCE_LIMIT:
+        start = time.perf_counter()
+        reference_parse(path)
+        t = time.perf_counter() - start
+        print(f"reference (no checks): {t:.2f}s")
+
+
+def main(argv: List[str]) -> None:
+    if argv and not argv[0].isdigit():
+        run(argv[0])
+        return
+    n = int(argv[0]) if argv else 2000
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "maze.txt")
+        start = time.perf_counter()
+        MazeGenerator.stream_to_file(path, n, n)
+        print(f"wrote {n}x{n} in {time.perf_counter() - start:.1f}s")
+        run(path)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,115 @@
+"""Regenerations per second of one MazeGenerator, and what resetting the
+grid in bulk and reusing the scratch buffers saves.
+
+Usage:
+    python -m benchmarks.regenerate [SIZE ...]
+
+For each SIZE x SIZE maze (default 50 and 500), perfect and imperfect:
+
+    reference   Maze.reset() closing the walls one cell at a time and
+                fresh visited/parent buffers every time, as before
+    reuse       the current Maze.reset() (one slice assignment of the
+                stamped grid) and Genarator's reused buffers
+    regenerate  MazeGenerator.regenerate(), generation and solving
+
+All run as many seeds as fit in DURATION seconds; the first two must
+carve identical mazes.  The depth-first search itself dominates, so the
+time of Maze.reset() alone is printed too.
+"""
+
+import sys
+import time
+from array import array
+from typing import Callable, List, Tuple
+
+from mazegen import MazeGenerator
+from mazegen.cell import ALL_WALLS
+from mazegen.generator import Genarator
+from mazegen.maze import Maze
+from mazegen.solver import Solver
+
+DEFAULT_SIZES = [50, 500]
+DURATION = 2.0
+
+
+class ReferenceMaze(Maze):
+    def reset(self) -> None:
+        walls, locked = self.walls, self.locked
+        for i in range(len(walls)):
+            if not locked[i]:
+                walls[i] = ALL_WALLS
+        self._open_3x3 = None
+
+
+class ReferenceGenarator(Genarator):
+    def _cell_buffer(self, slot: int = 0) -> bytearray:
+        return bytearray(self.maze.width * self.maze.height)
+
+    def _parent_buffer(self) -> "array[int]":
+        return array("i", range(self.maze.width * self.maze.height))
+
+
+def _rate(step: Callable[[int], object]) -> Tuple[float, int]:
+    """Calls of step(seed) per second over DURATION."""
+    seed = 0
+    start = time.perf_counter()
+    while not seed or time.perf_counter() - start < DURATION:
+        seed += 1
+        step(seed)
+    return seed / (time.perf_counter() - start), seed
+
+
+def _generate(size: int, perfect: bool, reference: bool) -> Tuple[float, int]:
+    corners = (0, 0), (size - 1, size - 1)
+    if reference:
+        maze: Maze = ReferenceMaze(size, size, *corners, perfect)
+        gen: Genarator = ReferenceGenarator(maze)
+    else:
+        maze = Maze(size, size, *corners, perfect)
+        gen = Genarator(maze)
+    solver = Solver(maze)
+
+    def step(seed: int) -> None:
+        gen.generate(seed)
+        solver.solve()
+
+    rate, _ = _rate(step)
+    gen.generate(1)
+    return rate, hash(bytes(maze.walls))
+
+
+def _reset(size: int, reference: bool) -> float:
+    cls = ReferenceMaze if reference else Maze
+    maze = cls(size, size, (0, 0), (size - 1, size - 1))
+    runs = max(1, 10**6 // (size * size))
+    start = time.perf_counter()
+    for _ in range(runs):
+        maze.reset()
+    return (time.perf_counter() - start) / runs
+
+
+def main(argv: List[str]) -> None:
+    sizes = [int(a) for a in argv] or DEFAULT_SIZES
+    for size in sizes:
+        for perfect in (True, False):
+            kind = "perfect" if perfect else "imperfect"
+            old_rate, old_hash = _generate(size, perfect, reference=True)
+            new_rate, new_hash = _generate(size, perfect, reference=False)
+            mg = MazeGenerator(size, size, perfect=perfect)
+            rate, _ = _rate(lambda seed: mg.regenerate(seed))
+            print(
+                f"{size}x{size} {kind:<9} reference {old_rate:9.1f}/s  "
+                f"reuse {new_rate:9.1f}/s  x{new_rate / old_rate:5.2f}  "
+                f"regenerate {rate:9.1f}/s"
+            )
+            if old_hash != new_hash:
+                print("  DIFFERENT mazes")
+        old_reset, new_reset = _reset(size, True), _reset(size, False)
+        print(
+            f"{size}x{size} reset     reference {old_reset * 1e6:9.1f}us "
+            f"slice {new_reset * 1e6:9.1f}us  x{old_reset / new_reset:5.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
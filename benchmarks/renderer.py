@@ -0,0 +1,181 @@
+"""Frames per second of the terminal renderer.
+
+Usage:
+    python -m benchmarks.renderer [WIDTH HEIGHT]
+
+Draws a WIDTH x HEIGHT maze (default 100x50) into an in-memory stream
+and reports frames per second and bytes per frame for a full redraw,
+for the incremental draw() after toggling the path and after rotating
+colors, and for the previous print-per-line renderer kept here as
+reference_render().  Then draws a VIEW-sized view of it and of a BIG
+maze in each zoom mode, scrolling or toggling the path every frame:
+those rates should not depend on the maze size.  Last, full frames with
+a PathOverlay of 1 and of AGENTS paths: building the kind rows costs
+the same, only the extra escape sequences written differ.
+"""
+
+import contextlib
+import io
+import random
+import sys
+import time
+from typing import Callable, List, Optional, Set
+
+from mazegen import MazeGenerator, PathOverlay
+from mazegen.maze import Coord, Maze
+from src.renderer import END, FROZEN, PATH, RESET, SPACE, START
+from src.renderer import MODES, WALL_COLORS, Renderer
+
+MIN_TIME = 1.0
+VIEW = (160, 48)
+BIG = 1000
+AGENTS = 8
+
+
+def reference_render(
+    maze: Maze, solution: List[Coord], color: Optional[str]
+) -> None:
+    """The renderer before draw(): one print() per line, one escape
+    sequence per colored character."""
+    wall = "█" if color is None else f"{color}█{RESET}"
+    path_set: Set[Coord] = set(solution)
+    edges = {
+        frozenset((solution[i], solution[i + 1]))
+        for i in range(len(solution) - 1)
+    }
+    print(wall * (maze.width * 2 + 1))
+    for y in range(maze.height):
+        line = ""
+        for x in range(maze.width):
+            cell = maze.cells[y][x]
+            if x == 0:
+                line += wall if cell.west else SPACE
+            if (x, y) == maze.entry:
+                line += START
+            elif (x, y) == maze.exit:
+                line += END
+            elif (x, y) in path_set:
+                line += PATH
+            elif cell.locked:
+                line += FROZEN
+            else:
+                line += SPACE
+            if not cell.east and frozenset(((x, y), (x + 1, y))) in edges:
+                line += PATH
+            else:
+                line += wall if cell.east else SPACE
+        print(line)
+        line = ""
+        for x in range(maze.width):
+            cell = maze.cells[y][x]
+            if x == 0:
+                line += wall if cell.south or cell.west else SPACE
+            if not cell.south and frozenset(((x, y), (x, y + 1))) in edges:
+                line += PATH
+            else:
+                line += wall if cell.south else SPACE
+            corner = cell.south or cell.east
+            if x < maze.width - 1:
+                corner = corner or maze.cells[y][x + 1].south
+            line += wall if corner else SPACE
+        print(line)
+
+
+def rate(name: str, out: io.StringIO, frame: Callable[[int], None]) -> None:
+    """Call frame(0), frame(1), ... for MIN_TIME seconds and report."""
+    frames = 0
+    written = 0
+    start = time.perf_counter()
+    while True:
+        out.seek(0)
+        out.truncate()
+        frame(frames)
+        written += out.tell()
+        frames += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_TIME:
+            break
+    print(
+        f"  {name:<24} {frames / elapsed:9.1f} fps "
+        f"{written // frames:9d} B/frame"
+    )
+
+
+def main(argv: List[str]) -> None:
+    width, height = (int(a) for a in argv) if argv else (100, 50)
+    mg = MazeGenerator(width, height, seed=1)
+    maze, solution = mg.maze, mg.solution
+    print(f"{width}x{height}, path of {len(solution)} cells")
+
+    out = io.StringIO()
+    r = Renderer(maze, out=out, size=(2 * width + 1, 2 * height + 1))
+
+    def full(i: int) -> None:
+        r.render(solution if i % 2 else [])
+
+    def toggle_path(i: int) -> None:
+        r.draw(solution if i % 2 else [])
+
+    def rotate(i: int) -> None:
+        r.rotate_colors()
+        r.draw(solution)
+
+    def reference(i: int) -> None:
+        color = WALL_COLORS[i % len(WALL_COLORS)]
+        with contextlib.redirect_stdout(out):
+            reference_render(maze, solution if i % 2 else [], color)
+
+    rate("reference render", out, reference)
+    rate("render (full frame)", out, full)
+    r.draw()
+    rate("draw (toggle path)", out, toggle_path)
+    rate("draw (rotate colors)", out, rotate)
+
+    rng = random.Random(1)
+    paths = [solution] + [
+        mg.solve(
+            (rng.randrange(width), rng.randrange(height)),
+            (rng.randrange(width), rng.randrange(height)),
+        )
+        for _ in range(AGENTS - 1)
+    ]
+    start = time.perf_counter()
+    overlays = [PathOverlay(maze, paths[:1]), PathOverlay(maze, paths)]
+    elapsed = time.perf_counter() - start
+    print(
+        f"  overlays of 1 and {AGENTS} paths "
+        f"({sum(map(len, paths))} cells) built in {elapsed:.3f}s"
+    )
+    r = Renderer(maze, out=out)
+    for overlay in overlays:
+
+        def kinds(i: int) -> None:
+            r.frame(overlay)
+
+        def overlay_frame(i: int) -> None:
+            r.render(overlay)
+
+        rate(f"frame ({overlay.paths} paths)", out, kinds)
+        rate(f"render ({overlay.paths} paths)", out, overlay_frame)
+
+    big = MazeGenerator(BIG, BIG, seed=1)
+    for mg in (mg, big):
+        maze, solution = mg.maze, mg.solution
+        print(f"{maze.width}x{maze.height}, {VIEW[0]}x{VIEW[1]} view")
+        for mode in MODES:
+            r = Renderer(maze, out=out, size=VIEW)
+            r.mode = mode
+
+            def scroll(i: int) -> None:
+                r.pan(1 if i % 40 < 20 else -1, 1 if i % 60 < 30 else -1)
+                r.draw(solution)
+
+            def toggle(i: int) -> None:
+                r.draw(solution if i % 2 else [])
+
+            rate(f"{mode} (scroll)", out, scroll)
+            rate(f"{mode} (toggle path)", out, toggle)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,82 @@
+"""Throughput of mazegen.find_seeds against the plain regenerate loop.
+
+Usage:
+    python -m benchmarks.search [COUNT [WIDTH HEIGHT]]
+
+Looks for the first COUNT seeds (default 10) of WIDTH x HEIGHT perfect
+mazes (default 40x30) whose solution is 100 to 140 moves long, a rare
+length for that size: first with MazeGenerator.regenerate() and the
+solution of every seed, then with find_seeds() and 1 worker, all cores
+(at least 2), and again from the score cache.  Prints the seeds tried
+per second of each, how many were rejected while carving, and whether
+all found the same seeds.
+"""
+
+import os
+import sys
+import time
+from typing import List
+
+from mazegen import Criteria, MazeGenerator, find_seeds
+from mazegen.maze import Coord
+from mazegen.search import ScoreCache
+
+COUNT = 10
+SIZE = (40, 30)
+CRITERIA = Criteria(min_length=100, max_length=140)
+
+
+class _Config:
+    def __init__(self, width: int, height: int) -> None:
+        self.width = width
+        self.height = height
+        self.entry: Coord = (0, 0)
+        self.exit: Coord = (width - 1, height - 1)
+        self.perfect = True
+
+
+def _loop(config: _Config, count: int) -> List[int]:
+    mg = MazeGenerator(config.width, config.height, seed=0)
+    found: List[int] = []
+    seed = 0
+    while len(found) < count:
+        mg.regenerate(seed)
+        length = len(mg.solution) - 1
+        if not CRITERIA.too_short(length) and not CRITERIA.too_long(length):
+            found.append(seed)
+        seed += 1
+    return found
+
+
+def main(argv: List[str]) -> None:
+    count = int(argv[0]) if argv else COUNT
+    width, height = (int(argv[1]), int(argv[2])) if len(argv) > 2 else SIZE
+    config = _Config(width, height)
+
+    start = time.perf_counter()
+    reference = _loop(config, count)
+    elapsed = time.perf_counter() - start
+    tried = reference[-1] + 1
+    print(
+        f"{width}x{height}, {count} seeds of {CRITERIA.min_length} to "
+        f"{CRITERIA.max_length} moves, found among the first {tried}"
+    )
+    print(f"  {'regenerate loop':<22} {tried / elapsed:9.0f} seeds/s")
+
+    cache = ScoreCache()
+    runs = [("find_seeds, 1 worker", 1, ScoreCache())]
+    workers = max(os.cpu_count() or 1, 2)
+    runs.append((f"find_seeds, {workers} workers", workers, cache))
+    runs.append(("find_seeds, cached", 1, cache))
+    for name, n, scores in runs:
+        result = find_seeds(config, CRITERIA, count, n, cache=scores)
+        same = "same" if result.seeds == reference else "DIFFERENT"
+        print(
+            f"  {name:<22} {result.rate:9.0f} seeds/s  "
+            f"{result.rejected_early:>6} rejected early  "
+            f"{result.cached:>6} cached  {same}"
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
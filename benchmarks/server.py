@@ -0,0 +1,129 @@
+"""Latency of mazegen.server with and without the warm pools, measured
+by local clients.
+
+Usage:
+    python -m benchmarks.server [SIZE [CLIENTS [COUNT [THINK]]]]
+
+Starts a MazeServer on a free port of 127.0.0.1, then CLIENTS keep-alive
+clients (default 4) each request COUNT (default 20) SIZE x SIZE mazes
+without a seed (default 100), THINK seconds apart (default 0.5).  Runs
+once with pool_size 0 (every request generates) and once warm.  Every
+maze is checked against MazeGenerator with the seed of its X-Maze-Seed
+header.  Then CLIENTS clients ask for the same seed at once, which must
+take one generation.  Prints the client-side p50, p90, p99 and max
+latency and the server's /metrics counters.
+"""
+
+import asyncio
+import io
+import json
+import statistics
+import sys
+import time
+from typing import Dict, List, Tuple
+
+from mazegen import MazeGenerator
+from mazegen.server import MazeServer
+
+SIZE = 100
+CLIENTS = 4
+COUNT = 20
+THINK = 0.5
+
+
+async def _get(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter, path: str
+) -> Tuple[Dict[str, str], bytes]:
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: bench\r\n\r\n".encode())
+    await writer.drain()
+    head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1")
+    headers = {}
+    for line in head.split("\r\n")[1:]:
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(headers["content-length"]))
+    return headers, body
+
+
+async def _client(
+    port: int, path: str, count: int, think: float
+) -> List[Tuple[float, int, bytes]]:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    results = []
+    for _ in range(count):
+        await asyncio.sleep(think)
+        start = time.perf_counter()
+        headers, body = await _get(reader, writer, path)
+        elapsed = time.perf_counter() - start
+        results.append((elapsed, int(headers["x-maze-seed"]), body))
+    writer.close()
+    return results
+
+
+def _expected(size: int, seed: int) -> bytes:
+    text = io.StringIO()
+    MazeGenerator(size, size, seed=seed).dump(text)
+    return text.getvalue().encode("ascii")
+
+
+def _percentiles(latencies: List[float]) -> str:
+    q = statistics.quantiles(latencies, n=100, method="inclusive")
+    return "  ".join(
+        f"{name} {value * 1000:8.1f}ms"
+        for name, value in (
+            ("p50", q[49]),
+            ("p90", q[89]),
+            ("p99", q[98]),
+            ("max", max(latencies)),
+        )
+    )
+
+
+async def _run(
+    size: int, clients: int, count: int, think: float, pool_size: int
+) -> None:
+    config = (size, size, True, "dfs", "text")
+    server = MazeServer(port=0, pool_size=pool_size, warm=[config])
+    await server.start()
+    try:
+        # Let the pool fill, as it would on a running server.
+        await asyncio.sleep(1.0 if pool_size else 0)
+        path = f"/maze?width={size}&height={size}"
+        runs = await asyncio.gather(
+            *(_client(server.port, path, count, think) for _ in range(clients))
+        )
+        results = [r for run in runs for r in run]
+        bad = sum(body != _expected(size, seed) for _, seed, body in results)
+        name = f"pool_size {pool_size}"
+        check = "all match" if not bad else f"{bad} DIFFERENT"
+        print(f"  {name:<12} {_percentiles([r[0] for r in results])}  {check}")
+
+        same = f"{path}&seed=12345"
+        await asyncio.gather(
+            *(_client(server.port, same, 1, 0) for _ in range(clients))
+        )
+        metrics = server.snapshot()
+        keys = ("pool_hits", "pool_misses", "coalesced", "generated")
+        print("  " + json.dumps({k: metrics[k] for k in keys}))
+    finally:
+        await server.close()
+
+
+async def _main(size: int, clients: int, count: int, think: float) -> None:
+    print(
+        f"{size}x{size}, {clients} clients x {count} requests {think}s apart"
+    )
+    for pool_size in (0, clients):
+        await _run(size, clients, count, think, pool_size)
+
+
+def main(argv: List[str]) -> None:
+    size = int(argv[0]) if argv else SIZE
+    clients = int(argv[1]) if len(argv) > 1 else CLIENTS
+    count = int(argv[2]) if len(argv) > 2 else COUNT
+    think = float(argv[3]) if len(argv) > 3 else THINK
+    asyncio.run(_main(size, clients, count, think))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
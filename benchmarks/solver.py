@@ -0,0 +1,108 @@
+"""Compare the Solver strategies against the previous tuple/dict BFS.
+
+Usage:
+    python -m benchmarks.solver [SIZE ...]
+
+Each strategy solves entry to exit (corner to corner) on the same perfect
+and imperfect maze; distance_field() is timed from the entry.  First,
+"tree" is checked against "bfs" on TREE_CHECKS small imperfect mazes,
+both as they are and wrongly flagged perfect: it must return a shortest
+path from entry to exit, and must not hang on the loops.
+"""
+
+import sys
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Set
+
+from mazegen import MazeGenerator
+from mazegen.maze import Coord, Maze
+from mazegen.solver import Solver
+
+DEFAULT_SIZES = [100, 300, 1000]
+SEED = 42
+TREE_CHECKS = 40
+
+
+def reference_solve(maze: Maze) -> List[Coord]:
+    """The BFS Solver.solve used before it moved to flat indices."""
+    queue: Deque[Coord] = deque([maze.entry])
+    visited: Set[Coord] = {maze.entry}
+    parent: Dict[Coord, Optional[Coord]] = {maze.entry: None}
+    while queue:
+        current = queue.popleft()
+        if current == maze.exit:
+            path: List[Coord] = []
+            cur: Optional[Coord] = current
+            while cur is not None:
+                path.append(cur)
+                cur = parent[cur]
+            path.reverse()
+            return path
+        x, y = current
+        cell = maze.cells[y][x]
+        for d, nx, ny in maze.neighbors(x, y):
+            if (nx, ny) not in visited and not cell.is_closed(d):
+                visited.add((nx, ny))
+                parent[(nx, ny)] = current
+                queue.append((nx, ny))
+    return []
+
+
+def _is_path(maze: Maze, path: List[Coord]) -> bool:
+    """path leads from entry to exit through open walls."""
+    if not path or path[0] != maze.entry or path[-1] != maze.exit:
+        return False
+    for (x, y), nxt in zip(path, path[1:]):
+        cell = maze.cells[y][x]
+        if not any(
+            (nx, ny) == nxt and not cell.is_closed(d)
+            for d, nx, ny in maze.neighbors(x, y)
+        ):
+            return False
+    return True
+
+
+def check_tree_on_loops() -> None:
+    """Raise SystemExit if "tree" gets an imperfect maze wrong."""
+    for seed in range(TREE_CHECKS):
+        mg = MazeGenerator(23, 17, seed=seed, perfect=False)
+        maze = mg.maze
+        shortest = len(mg.solve(strategy="bfs"))
+        if len(mg.solve(strategy="tree")) != shortest:
+            raise SystemExit(f"tree: wrong path on imperfect seed {seed}")
+        # Flagged perfect, "tree" walks the maze until it meets a loop.
+        maze.perfect = True
+        if not _is_path(maze, mg.solve(strategy="tree")):
+            raise SystemExit(f"tree: no path on mislabelled seed {seed}")
+    print(f"tree on {TREE_CHECKS} imperfect mazes: ok")
+
+
+def _time(fn: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main(argv: List[str]) -> None:
+    sizes = [int(a) for a in argv] or DEFAULT_SIZES
+    check_tree_on_loops()
+    for size in sizes:
+        for perfect in (True, False):
+            mg = MazeGenerator(size, size, seed=SEED, perfect=perfect)
+            maze = mg.maze
+            solver = Solver(maze)
+            label = f"{size}x{size} {'perfect' if perfect else 'loops'}"
+            ref = _time(lambda: reference_solve(maze))
+            print(f"{label:<20} reference bfs   {ref:8.3f}s")
+            for strategy in ("bfs", "bidirectional", "astar", "tree"):
+                t = _time(lambda: solver.solve(strategy=strategy))
+                print(
+                    f"{label:<20} {strategy:<15} {t:8.3f}s  x{ref / t:5.1f}"
+                )
+            t = _time(lambda: solver.distance_field())
+            print(f"{label:<20} distance_field  {t:8.3f}s")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
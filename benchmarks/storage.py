@@ -0,0 +1,111 @@
+"""Compare the flat bytearray wall storage against List[List[Cell]].
+
+Usage:
+    python -m benchmarks.storage [SIZE ...]
+
+For every size the legacy grid of ``Cell`` dataclasses and the current
+``Maze`` storage are built under ``tracemalloc`` and then scanned once.
+Legacy grids above LEGACY_LIMIT cells would not fit in memory on a typical
+machine, so their cost is extrapolated from the per-cell figures measured
+at LEGACY_LIMIT.
+"""
+
+import sys
+import time
+import tracemalloc
+from typing import Callable, List, Tuple
+
+from mazegen.cell import Cell
+from mazegen.maze import Maze
+
+DEFAULT_SIZES = [100, 1000, 5000]
+LEGACY_LIMIT = 1000 * 1000
+
+
+def _measure(build: Callable[[], object]) -> Tuple[object, int, float]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    obj = build()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, peak, elapsed
+
+
+def _legacy(size: int) -> List[List[Cell]]:
+    return [[Cell() for _ in range(size)] for _ in range(size)]
+
+
+def _scan_legacy(cells: List[List[Cell]]) -> int:
+    closed = 0
+    for row in cells:
+        for c in row:
+            closed += c.north + c.east + c.south + c.west
+    return closed
+
+
+_POPCOUNT = bytes(bin(b).count("1") for b in range(256))
+
+
+def _scan_flat(maze: Maze) -> int:
+    return sum(maze.walls.translate(_POPCOUNT))
+
+
+def _scan_views(maze: Maze) -> int:
+    closed = 0
+    for row in maze.cells:
+        for c in row:
+            closed += c.north + c.east + c.south + c.west
+    return closed
+
+
+def _timed(fn: Callable[[], int]) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def run(size: int, legacy_per_cell: List[float]) -> None:
+    n = size * size
+    print(f"--- {size}x{size} ({n:,} cells)")
+
+    if n <= LEGACY_LIMIT:
+        cells, peak, build = _measure(lambda: _legacy(size))
+        assert isinstance(cells, list)
+        scan = _timed(lambda: _scan_legacy(cells))
+        del cells
+        legacy_per_cell[:] = [peak / n, build / n, scan / n]
+        note = ""
+    else:
+        note = " (extrapolated)"
+    peak_pc, build_pc, scan_pc = legacy_per_cell
+    print(
+        f"legacy  List[List[Cell]]: {peak_pc * n / 2**20:10.1f} MiB"
+        f"  build {build_pc * n:8.3f}s  scan {scan_pc * n:8.3f}s{note}"
+    )
+
+    maze, peak, build = _measure(
+        lambda: Maze(size, size, (0, 0), (size - 1, size - 1))
+    )
+    assert isinstance(maze, Maze)
+    flat = _timed(lambda: _scan_flat(maze))
+    print(
+        f"flat    bytearray       : {peak / 2**20:10.1f} MiB"
+        f"  build {build:8.3f}s  scan {flat:8.3f}s"
+    )
+    if n <= LEGACY_LIMIT:
+        views = _timed(lambda: _scan_views(maze))
+        print(f"flat    cells[y][x] view:  scan {views:8.3f}s")
+
+
+def main(argv: List[str]) -> None:
+    sizes = [int(a) for a in argv] or DEFAULT_SIZES
+    legacy_per_cell: List[float] = []
+    for size in sorted(sizes):
+        if size * size > LEGACY_LIMIT and not legacy_per_cell:
+            run(int(LEGACY_LIMIT ** 0.5), legacy_per_cell)
+        run(size, legacy_per_cell)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,47 @@
+"""Peak memory and speed of MazeGenerator.stream_to_file.
+
+Usage:
+    python -m benchmarks.stream [WIDTH [HEIGHT ...]]
+
+Streams a WIDTH-wide maze of each HEIGHT to a temporary file without
+solving it, once for timing and once under tracemalloc.  Peak memory
+should stay flat as the height grows.
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import List
+
+from mazegen import MazeGenerator
+
+DEFAULT_WIDTH = 1000
+DEFAULT_HEIGHTS = [100, 1000, 3000]
+
+
+def main(argv: List[str]) -> None:
+    width = int(argv[0]) if argv else DEFAULT_WIDTH
+    heights = [int(a) for a in argv[1:]] or DEFAULT_HEIGHTS
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "maze.txt")
+        for height in heights:
+            start = time.perf_counter()
+            MazeGenerator.stream_to_file(path, width, height, solve=False)
+            elapsed = time.perf_counter() - start
+
+            tracemalloc.start()
+            MazeGenerator.stream_to_file(path, width, height, solve=False)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(
+                f"{width}x{height}: {elapsed:8.2f}s"
+                f"  {height / elapsed:8.0f} rows/s"
+                f"  peak {peak / 2**20:6.2f} MiB"
+                f"  file {os.path.getsize(path) / 2**20:8.1f} MiB"
+            )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
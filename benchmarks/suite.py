@@ -0,0 +1,303 @@
+"""Regression harness: time and memory of generation, solving, writing
+and rendering over a ladder of maze sizes.
+
+Usage:
+    python -m benchmarks.suite run [-o FILE] [--sizes WxH,...] [--seeds N]
+    python -m benchmarks.suite compare OLD NEW [--threshold PERCENT]
+
+run measures every operation of OPERATIONS on every size of LADDER
+(20x15 to 2000x2000) with several seeds each, and writes the results as
+JSON (default: bench.json).  For each case:
+
+    time            best wall time of as many runs as fit in MIN_TIME
+                    seconds (at least one)
+    peak            tracemalloc peak in bytes during one more run, on top
+                    of what the case had allocated before it
+    peak_per_cell   peak / (width * height)
+    blocks_per_cell memory blocks still allocated after that run, per
+                    cell (what the operation keeps)
+
+compare matches the cases of two runs by operation and size (median time
+and largest peak over the seeds) and flags those that got slower or use
+more memory by more than the threshold (default 10%).  Its exit status
+is 1 if any did, so it can gate a CI job.  ``make bench`` runs the suite
+and ``make bench-compare`` compares against BASE.
+"""
+
+import argparse
+import gc
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    TextIO,
+    Tuple,
+    cast,
+)
+
+from mazegen.generator import HAVE_NUMPY, Genarator
+from mazegen.maze import Maze
+from mazegen.solver import Solver
+from mazegen.version import __version__
+from mazegen.writer import Writer
+from src.renderer import Renderer
+
+# (width, height) and the number of seeds to run it with.
+Ladder = List[Tuple[Tuple[int, int], int]]
+LADDER: Ladder = [
+    ((20, 15), 5),
+    ((100, 100), 5),
+    ((500, 500), 3),
+    ((1000, 1000), 2),
+    ((2000, 2000), 2),
+]
+MIN_TIME = 0.5
+THRESHOLD = 10.0
+OUTPUT = "bench.json"
+
+Result = Dict[str, Any]
+Run = Callable[[], object]
+Setup = Callable[["_Case"], Run]
+
+
+class _Discard(io.TextIOBase):
+    """Text stream that drops what is written to it."""
+
+    def write(self, s: str) -> int:
+        return len(s)
+
+
+class _Case:
+    """A maze of one size and seed, with the solution and files the
+    operations need, built once outside the measurements."""
+
+    def __init__(self, width: int, height: int, seed: int, directory: str):
+        self.width, self.height, self.seed = width, height, seed
+        self.perfect = self.maze(True)
+        self.loops = self.maze(False)
+        Genarator(self.perfect).generate(seed)
+        Genarator(self.loops).generate(seed)
+        self.solution = Solver(self.perfect).solve()
+        self.path = os.path.join(directory, "maze.txt")
+
+    def maze(self, perfect: bool) -> Maze:
+        w, h = self.width, self.height
+        return Maze(w, h, (0, 0), (w - 1, h - 1), perfect)
+
+
+def _generate(perfect: bool) -> Setup:
+    def setup(case: _Case) -> Run:
+        gen = Genarator(case.maze(perfect))
+        return lambda: gen.generate(case.seed)
+
+    return setup
+
+
+def _solve(perfect: bool) -> Setup:
+    def setup(case: _Case) -> Run:
+        return Solver(case.perfect if perfect else case.loops).solve
+
+    return setup
+
+
+def _write(case: _Case) -> Run:
+    writer = Writer(case.perfect)
+    return lambda: writer.save(case.solution, case.path)
+
+
+def _render(case: _Case) -> Run:
+    out = cast(TextIO, _Discard())
+    renderer = Renderer(case.perfect, out=out, size=(80, 24))
+    return lambda: renderer.render(case.solution)
+
+
+OPERATIONS: Dict[str, Setup] = {
+    "generate-perfect": _generate(True),
+    "generate-imperfect": _generate(False),
+    "solve-perfect": _solve(True),
+    "solve-imperfect": _solve(False),
+    "write": _write,
+    "render": _render,
+}
+
+
+def measure(run: Run, cells: int) -> Dict[str, float]:
+    """Time, tracemalloc peak and retained blocks of run()."""
+    times: List[float] = []
+    start = time.perf_counter()
+    while not times or time.perf_counter() - start < MIN_TIME:
+        t = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - t)
+
+    gc.collect()
+    blocks = sys.getallocatedblocks()
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    gc.collect()
+    kept = sys.getallocatedblocks() - blocks
+    return {
+        "time": min(times),
+        "runs": len(times),
+        "peak": peak,
+        "peak_per_cell": peak / cells,
+        "blocks_per_cell": max(kept, 0) / cells,
+    }
+
+
+def run_suite(
+    ladder: Ladder,
+    operations: List[str],
+    log: Callable[[str], None] = print,
+) -> List[Result]:
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for (width, height), seeds in ladder:
+            for seed in range(1, seeds + 1):
+                case = _Case(width, height, seed, directory)
+                for name in operations:
+                    result: Result = {
+                        "operation": name,
+                        "size": f"{width}x{height}",
+                        "seed": seed,
+                    }
+                    result.update(
+                        measure(OPERATIONS[name](case), width * height)
+                    )
+                    results.append(result)
+                    log(
+                        f"{name:<20} {result['size']:>10} seed {seed:<3}"
+                        f"{result['time']:10.4f}s "
+                        f"{result['peak'] / 2**20:9.2f} MiB "
+                        f"{result['peak_per_cell']:8.1f} B/cell"
+                    )
+                # Free this maze before building the next one.
+                del case
+    return results
+
+
+def _summary(
+    results: List[Result],
+) -> Dict[Tuple[str, str], Tuple[float, int]]:
+    """(operation, size) -> (median time, largest peak) over the seeds."""
+    grouped: Dict[Tuple[str, str], List[Result]] = {}
+    for r in results:
+        grouped.setdefault((r["operation"], r["size"]), []).append(r)
+    return {
+        key: (
+            statistics.median(r["time"] for r in rs),
+            max(r["peak"] for r in rs),
+        )
+        for key, rs in grouped.items()
+    }
+
+
+def compare(old: List[Result], new: List[Result], threshold: float) -> int:
+    """Print how every case changed; return how many regressed by more
+    than threshold percent."""
+    before, after = _summary(old), _summary(new)
+    regressions = 0
+    print(
+        f"{'operation':<20} {'size':>10} {'time':>22} {'change':>8} "
+        f"{'peak MiB':>19} {'change':>8}"
+    )
+    for key in sorted(before.keys() & after.keys(), key=_order):
+        (t0, p0), (t1, p1) = before[key], after[key]
+        dt = 100 * (t1 - t0) / t0 if t0 else 0.0
+        dp = 100 * (p1 - p0) / p0 if p0 else 0.0
+        slow = dt > threshold or dp > threshold
+        regressions += slow
+        print(
+            f"{key[0]:<20} {key[1]:>10} {t0:10.4f} {t1:10.4f}s "
+            f"{dt:+7.1f}% {p0 / 2**20:9.2f} {p1 / 2**20:9.2f} "
+            f"{dp:+7.1f}%{'  REGRESSION' if slow else ''}"
+        )
+    for key in sorted(before.keys() ^ after.keys(), key=_order):
+        print(f"{key[0]:<20} {key[1]:>10} only in one run")
+    return regressions
+
+
+def _order(key: Tuple[str, str]) -> Tuple[int, int, str]:
+    w, h = (int(n) for n in key[1].split("x"))
+    names = list(OPERATIONS)
+    return (w * h, names.index(key[0]) if key[0] in names else -1, key[0])
+
+
+def _parse_sizes(spec: str, seeds: Optional[int]) -> Ladder:
+    ladder = []
+    for size in spec.split(","):
+        w, _, h = size.partition("x")
+        ladder.append(((int(w), int(h or w)), seeds or 1))
+    return ladder
+
+
+def _load(path: str) -> List[Result]:
+    with open(path) as f:
+        results: List[Result] = json.load(f)["results"]
+    return results
+
+
+def main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run", help="run the benchmarks")
+    run.add_argument("-o", "--output", default=OUTPUT)
+    run.add_argument(
+        "--sizes", help="comma-separated WxH sizes (default: the ladder)"
+    )
+    run.add_argument("--seeds", type=int, help="seeds per size")
+    run.add_argument(
+        "--only", help="comma-separated operations (default: all)"
+    )
+    cmp = commands.add_parser("compare", help="compare two runs")
+    cmp.add_argument("old")
+    cmp.add_argument("new")
+    cmp.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        regressions = compare(
+            _load(args.old), _load(args.new), args.threshold
+        )
+        if regressions:
+            print(f"{regressions} regression(s) above {args.threshold}%")
+            sys.exit(1)
+        return
+
+    if args.sizes:
+        ladder = _parse_sizes(args.sizes, args.seeds)
+    else:
+        ladder = [(size, args.seeds or n) for size, n in LADDER]
+    operations = args.only.split(",") if args.only else list(OPERATIONS)
+    unknown = set(operations) - set(OPERATIONS)
+    if unknown:
+        parser.error(f"unknown operation(s) {sorted(unknown)}")
+    results = run_suite(ladder, operations)
+    meta = {
+        "version": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": HAVE_NUMPY,
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "min_time": MIN_TIME,
+    }
+    with open(args.output, "w") as f:
+        json.dump({"meta": meta, "results": results}, f, indent=1)
+    print(f"Wrote {len(results)} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,73 @@
+"""Throughput of mazegen.generate_concurrently (threads) against
+mazegen.generate_many (processes).
+
+Usage:
+    python -m benchmarks.threads [SEEDS [WIDTH HEIGHT]]
+
+Runs both with 2 workers and up to all cores (at least 2, so the thread
+and process pools are used even on one core), plus the serial path as
+the baseline.  Every run must yield the same texts.  Threads only scale
+across cores on a free-threaded CPython build; the GIL line tells which
+one is running.
+"""
+
+import os
+import sys
+import time
+from typing import Callable, Iterator, List, Tuple
+
+from mazegen import generate_concurrently, generate_many
+from mazegen.batch import MazeConfig
+from mazegen.maze import Coord
+
+DEFAULT_SEEDS = 1000
+DEFAULT_SIZE = (20, 15)
+
+Runner = Callable[[MazeConfig, range, int], Iterator[Tuple[int, str]]]
+
+
+class _Config:
+    def __init__(self, width: int, height: int) -> None:
+        self.width = width
+        self.height = height
+        self.entry: Coord = (0, 0)
+        self.exit: Coord = (width - 1, height - 1)
+        self.perfect = True
+
+
+def main(argv: List[str]) -> None:
+    count = int(argv[0]) if argv else DEFAULT_SEEDS
+    width, height = (
+        (int(argv[1]), int(argv[2])) if len(argv) > 2 else DEFAULT_SIZE
+    )
+    config = _Config(width, height)
+    cores = os.cpu_count() or 1
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"{cores} core(s), GIL {'enabled' if gil else 'disabled'}")
+
+    runners: List[Tuple[str, Runner]] = [
+        ("threads", generate_concurrently),
+        ("processes", generate_many),
+    ]
+    baseline = 0.0
+    reference: List[str] = []
+    for workers in sorted({1, 2, max(cores, 2)}):
+        for name, run in runners:
+            if workers == 1 and name == "processes":
+                continue
+            start = time.perf_counter()
+            texts = [t for _, t in run(config, range(count), workers)]
+            elapsed = time.perf_counter() - start
+            if workers == 1:
+                baseline, reference = elapsed, texts
+                name = "serial"
+            same = "same" if texts == reference else "DIFFERENT"
+            print(
+                f"{width}x{height} x{count} {name:<9} {workers:>3}"
+                f" {elapsed:8.2f}s {count / elapsed:9.0f} mazes/s"
+                f"  speedup {baseline / elapsed:5.2f}  {same}"
+            )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,79 @@
+"""Speedup of tiled generation (mazegen.tiled) against the number of
+worker processes.
+
+Usage:
+    python -m benchmarks.tiled [SIZE [TILES]]
+
+Generates one SIZE x SIZE perfect maze (default 2000) with the serial
+Genarator, then as TILES tiles (default 16) with 1, 2, 4, ... workers up
+to os.cpu_count().  Prints each time and its speedup over the serial
+run.  Every tiled run must give the same maze, with all walls
+consistent, every unlocked cell reachable and exactly one wall fewer
+open than there are unlocked cells (a spanning tree).
+"""
+
+import os
+import sys
+import time
+from typing import List
+
+from mazegen.cell import EAST, SOUTH
+from mazegen.generator import Genarator
+from mazegen.maze import Maze
+from mazegen.solver import Solver
+from mazegen.tiled import TiledGenerator
+
+SIZE = 2000
+TILES = 16
+SEED = 42
+
+# 1 for each wall byte whose east (resp. south) wall is open, else 0.
+_EAST_OPEN = bytes(0 if b & EAST else 1 for b in range(256))
+_SOUTH_OPEN = bytes(0 if b & SOUTH else 1 for b in range(256))
+
+
+def _is_tree(maze: Maze) -> bool:
+    walls = maze.walls
+    opened = walls.translate(_EAST_OPEN).count(1)
+    opened += walls.translate(_SOUTH_OPEN).count(1)
+    unlocked = maze.locked.count(0)
+    reached = len(walls) - Solver(maze).distance_field().count(-1)
+    return opened == unlocked - 1 and reached == unlocked
+
+
+def main(argv: List[str]) -> None:
+    size = int(argv[0]) if argv else SIZE
+    tiles = int(argv[1]) if len(argv) > 1 else TILES
+    corners = (0, 0), (size - 1, size - 1)
+
+    maze = Maze(size, size, *corners)
+    start = time.perf_counter()
+    Genarator(maze).generate(SEED)
+    serial = time.perf_counter() - start
+    print(f"{size}x{size} serial Genarator      {serial:8.3f}s")
+
+    counts = [1]
+    while counts[-1] * 2 <= (os.cpu_count() or 1):
+        counts.append(counts[-1] * 2)
+    first = None
+    for workers in counts:
+        maze = Maze(size, size, *corners)
+        gen = TiledGenerator(maze, tiles, workers)
+        start = time.perf_counter()
+        gen.generate(SEED)
+        elapsed = time.perf_counter() - start
+        maze.check_invariants()
+        walls = bytes(maze.walls)
+        if first is None:
+            first = walls
+        cols, rows = gen.layout
+        ok = "tree" if _is_tree(maze) else "NOT A TREE"
+        same = "same" if walls == first else "DIFFERENT"
+        print(
+            f"{size}x{size} {cols}x{rows} tiles, {workers:>2} workers "
+            f"{elapsed:8.3f}s  x{serial / elapsed:5.2f}  {ok}  {same}"
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
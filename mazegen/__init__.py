@@ -10,6 +10,9 @@ Usage:
     # Create with custom parameters
     mg = MazeGenerator(width=30, height=20, seed=42, perfect=True)
 
+    # Pick another spanning-tree algorithm (see mazegen.ALGORITHMS)
+    mg = MazeGenerator(width=30, height=20, algorithm="wilson")
+
     # Access the maze object and its structure
     maze = mg.maze
     print(maze.width, maze.height)
@@ -20,18 +23,118 @@ Usage:
     # Get a solution path from entry to exit
     path = mg.solution  # list of (x, y) coordinates
 
+    # Shortest path between any two cells, and distances from one cell
+    path = mg.solve((0, 0), (5, 5), strategy="astar")
+    dist = mg.distance_field((0, 0))  # dist[y * width + x]
+
+    # Per-cell flags of the solution, for renderers; add more paths
+    overlay = mg.path_overlay
+    overlay.add(mg.solve((0, 0), (5, 5)))
+
+    # Many queries on one perfect maze: build the LCA index once
+    steps = mg.path_index.distance((0, 0), (5, 5))
+    path = mg.path_index.path((0, 0), (5, 5))
+
+    # Compact binary file, read back through a memory map
+    mg.save_binary("maze.mzb")
+    with load_binary("maze.mzb") as view:
+        print(view.cells[y][x].east, view.solution)
+
+    # Read back a file written by save() (checks wall consistency)
+    mg = MazeGenerator.from_file("maze.txt")
+    maze = Maze.load("maze.txt")
+
     # Regenerate with a new seed
     mg.regenerate(seed=123)
+
+    # Prepare the next 3 seeds in the background; regenerate() then swaps
+    # the next one in, and save_async() writes it from another thread
+    mg.prefetch(depth=3)
+    mg.regenerate()
+    mg.save_async("maze.txt")
+    mg.close()
+
+    # Load mazes generated before (by any process) from a disk cache
+    mg = MazeGenerator(2000, 2000, seed=7, cache=MazeCache())
+    print(mg.cache.hits, mg.cache.misses)
+
+    # Phase timings and counters of each generate/regenerate, as JSON
+    mg = MazeGenerator(1000, 1000, perfect=False, instrument=True)
+    print(mg.stats.phases["loops"], mg.stats.counters["loop_rejections"])
+    mg.regenerate()
+    print(mg.stats.to_json())
+
+    # One huge maze carved as 16 tiles by 8 worker processes
+    mg = MazeGenerator(20000, 20000, tiles=16, workers=8)
+
+    # Stream a maze too large for memory straight to a file, row by row
+    MazeGenerator.stream_to_file("big.txt", 100000, 100000, solve=False)
+
+    # PNG or PPM image (4-pixel cells, 1-pixel walls by default)
+    mg.save_image("maze.png", cell=8, colors={"path": (255, 128, 0)})
+
+    # Generate many seeded mazes across processes
+    from mazegen import generate_many
+    for seed, text in generate_many(config, range(1000), workers=8):
+        ...
+    # ... or across threads, one MazeGenerator (and random.Random) each
+    for seed, text in generate_concurrently(config, range(1000), threads=8):
+        ...
+    save_images(config, range(100), "thumbs/maze_{seed}.png")
+
+    # The first 10 seeds whose maze has a 200 to 300 move solution and at
+    # least 40 dead ends, scored across processes
+    from mazegen import Criteria, find_seeds
+    found = find_seeds(config, Criteria(200, 300, min_dead_ends=40), 10)
+    print(found.seeds, f"{found.rate:.0f} seeds/s")
 """
 
-from typing import List, Optional
+import cProfile
+import io
+import time
+from array import array
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, TextIO
 
 from mazegen.maze import Coord, Maze
-from mazegen.generator import Genarator
+from mazegen.algorithms import ALGORITHMS, get_algorithm
+from mazegen.batch import generate_concurrently, generate_many, save_many
+from mazegen.binary import BinaryMaze, load_binary, save_binary
+from mazegen.cache import MazeCache
+from mazegen.image import RGB, save_image, save_images
+from mazegen.overlay import PathOverlay
+from mazegen.pathindex import PathIndex
+from mazegen.prefetch import DEFAULT_MAX_BYTES, Prefetcher
+from mazegen.profiling import GenerationStats, profile_rows
+from mazegen.reader import load_maze
+from mazegen.search import Criteria, find_seeds
 from mazegen.solver import Solver
+from mazegen.stream import stream_rows, stream_to_file
+from mazegen.tiled import TiledGenerator
+from mazegen.version import __version__
 from mazegen.writer import Writer
 
-__all__ = ["MazeGenerator", "Coord", "Maze"]
+__all__ = [
+    "__version__",
+    "MazeGenerator",
+    "Coord",
+    "Maze",
+    "ALGORITHMS",
+    "PathIndex",
+    "PathOverlay",
+    "MazeCache",
+    "TiledGenerator",
+    "GenerationStats",
+    "BinaryMaze",
+    "load_binary",
+    "stream_rows",
+    "generate_many",
+    "generate_concurrently",
+    "save_many",
+    "save_images",
+    "Criteria",
+    "find_seeds",
+]
 
 
 class MazeGenerator:
@@ -45,6 +148,22 @@ class MazeGenerator:
         seed: Random seed for reproducible generation (default: 42).
         perfect: If True, generate a perfect maze (no loops). If False,
                  add ~10% random loops (default: True).
+        algorithm: Name of the spanning-tree algorithm, one of
+                   ALGORITHMS: "dfs", "kruskal", "wilson", "eller" or
+                   "binary_tree" (default: "dfs").
+        cache: A MazeCache to load the maze and solution from instead of
+               generating them, and to store them in otherwise; used by
+               regenerate() too (default: None, always generate).
+        instrument: If True, time the phases of every generation and
+                    count what they did, in .stats (default: False).
+        profile: If True, also run every generation under cProfile and
+                 keep the top functions in .stats.profile; implies
+                 instrument (default: False).
+        tiles: Carve the maze as this many tiles in worker processes and
+               stitch them (see mazegen.tiled); needs the "dfs"
+               algorithm.  The maze depends on the seed and tiles, and
+               differs from the untiled one (default: None, untiled).
+        workers: Worker processes for tiles (default: os.cpu_count()).
     """
 
     def __init__(
@@ -55,21 +174,169 @@ class MazeGenerator:
         exit: Optional[Coord] = None,
         seed: int = 42,
         perfect: bool = True,
+        algorithm: str = "dfs",
+        cache: Optional[MazeCache] = None,
+        instrument: bool = False,
+        profile: bool = False,
+        tiles: Optional[int] = None,
+        workers: Optional[int] = None,
     ) -> None:
         if entry is None:
             entry = (0, 0)
         if exit is None:
             exit = (width - 1, height - 1)
 
-        self._maze = Maze(width, height, entry, exit, perfect)
-        self._generator = Genarator(self._maze)
-        self._solver = Solver(self._maze)
-        self._writer = Writer(self._maze)
-        self._solution: List[Coord] = []
-        self._seed = seed
+        maze = Maze(width, height, entry, exit, perfect)
+        self._attach(maze, algorithm, seed, tiles, workers)
+        self._cache = cache
+        self._instrument = instrument or profile
+        self._profile = profile
+        self._build()
+
+    def _build(self) -> None:
+        """Generate and solve the maze for the current seed, or load both
+        from the cache, recording stats if instrumented."""
+        if not self._instrument:
+            self._load_or_generate(None)
+            return
+        maze = self._maze
+        stats = GenerationStats(
+            self._seed, self._algorithm, maze.width, maze.height, maze.perfect
+        )
+        self._generator.stats = stats
+        start = time.perf_counter()
+        try:
+            if self._profile:
+                profiler = cProfile.Profile()
+                profiler.runcall(self._load_or_generate, stats)
+                stats.profile = profile_rows(profiler)
+            else:
+                self._load_or_generate(stats)
+        finally:
+            self._generator.stats = None
+        stats.elapsed = time.perf_counter() - start
+        self._stats: Optional[GenerationStats] = stats
 
-        self._generator.generate(seed)
+    def _solve(self, stats: Optional[GenerationStats]) -> None:
+        start = time.perf_counter()
         self._solution = self._solver.solve()
+        if stats is not None:
+            stats.phases["solve"] = time.perf_counter() - start
+            stats.counters["solver_expanded"] = self._solver.expanded()
+
+    def _load_or_generate(self, stats: Optional[GenerationStats]) -> None:
+        cache = self._cache
+        if cache is None:
+            self._generator.generate(self._seed)
+            self._solve(stats)
+            return
+        start = time.perf_counter()
+        maze = self._maze
+        key = cache.key(
+            maze.width,
+            maze.height,
+            maze.entry,
+            maze.exit,
+            self._seed,
+            maze.perfect,
+            self._algorithm,
+        )
+        found = cache.get(key)
+        if found is not None:
+            walls, self._solution = found
+            maze.load_walls(walls)
+            if stats is not None:
+                stats.cached = True
+                stats.phases["cache"] = time.perf_counter() - start
+            return
+        looked_up = time.perf_counter()
+        self._generator.generate(self._seed)
+        self._solve(stats)
+        stored = time.perf_counter()
+        cache.put(key, maze, self._solution, self._seed)
+        if stats is not None:
+            stats.phases["cache"] = (
+                looked_up - start + time.perf_counter() - stored
+            )
+
+    def _attach(
+        self,
+        maze: Maze,
+        algorithm: str,
+        seed: int,
+        tiles: Optional[int] = None,
+        workers: Optional[int] = None,
+    ) -> None:
+        generator_class = get_algorithm(algorithm)
+        self._maze = maze
+        self._generator = generator_class(maze)
+        self._algorithm = algorithm
+        if tiles is not None:
+            if algorithm != "dfs":
+                raise ValueError("tiles need the 'dfs' algorithm")
+            tiled = TiledGenerator(maze, tiles, workers)
+            self._generator = tiled
+            # Tiled mazes are other mazes: keep them apart in the cache.
+            cols, rows = tiled.layout
+            self._algorithm = f"dfs/tiles={cols}x{rows}"
+        self._solver = Solver(maze)
+        self._writer = Writer(maze)
+        self._path_index: Optional[PathIndex] = None
+        self._path_overlay: Optional[PathOverlay] = None
+        self._seed = seed
+        self._instrument = False
+        self._profile = False
+        self._stats = None
+        self._tiles, self._workers = tiles, workers
+        # save() text of the current maze when it was prefetched.
+        self._text: Optional[str] = None
+        self._prefetcher: Optional[Prefetcher] = None
+        self._saver: Optional[ThreadPoolExecutor] = None
+        # save_async() writes not yet known to have succeeded.
+        self._saves: List["Future[None]"] = []
+
+    @classmethod
+    def from_file(
+        cls, path: str, seed: int = 42, algorithm: str = "dfs"
+    ) -> "MazeGenerator":
+        """Load a maze saved by save() instead of generating one.
+
+        The saved solution is checked and kept (or solved afresh if the
+        file has none).  seed and algorithm are only used by a later
+        regenerate().
+
+        Args:
+            path: Path to a file in the save() format.
+            seed: Seed reported by .seed until regenerate() (default: 42).
+            algorithm: Algorithm for regenerate() (default: "dfs").
+        """
+        maze, solution = load_maze(path)
+        mg = cls.__new__(cls)
+        mg._attach(maze, algorithm, seed)
+        mg._cache = None
+        mg._solution = solution or mg._solver.solve()
+        return mg
+
+    @classmethod
+    def blank(
+        cls,
+        width: int,
+        height: int,
+        entry: Coord,
+        exit: Coord,
+        perfect: bool = True,
+        algorithm: str = "dfs",
+    ) -> "MazeGenerator":
+        """A generator that has not generated anything yet: every wall is
+        closed and there is no solution until regenerate(seed), which
+        then gives the maze of MazeGenerator(..., seed=seed).  Saves the
+        first generation when a seed is picked right away (see
+        mazegen.batch)."""
+        mg = cls.__new__(cls)
+        mg._attach(Maze(width, height, entry, exit, perfect), algorithm, 42)
+        mg._cache = None
+        mg._solution = []
+        return mg
 
     @property
     def maze(self) -> Maze:
@@ -79,34 +346,171 @@ class MazeGenerator:
         - maze.width, maze.height: dimensions
         - maze.entry, maze.exit: coordinates (x, y)
         - maze.perfect: whether the maze has no loops
-        - maze.cells: 2D grid of Cell objects (cells[y][x])
+        - maze.cells: 2D grid of cell views (cells[y][x])
+        - maze.walls, maze.locked: flat row-major bytearrays backing it
         - maze.in_bounds(x, y): boundary check
         - maze.neighbors(x, y): adjacent cells
         """
         return self._maze
 
+    @property
+    def algorithm(self) -> str:
+        """Name of the generation algorithm in use."""
+        return self._algorithm
+
+    @property
+    def cache(self) -> Optional[MazeCache]:
+        """The MazeCache in use (hits/misses counters, stats()), if any."""
+        return self._cache
+
     @property
     def seed(self) -> int:
         """Current random seed."""
         return self._seed
 
+    @property
+    def stats(self) -> Optional[GenerationStats]:
+        """Phase timings and counters of the last generation or
+        regenerate() (to_dict(), to_json()), if instrumented."""
+        return self._stats
+
     @property
     def solution(self) -> List[Coord]:
         """Solution path as a list of (x, y) coordinates from entry to exit."""
         return self._solution
 
+    def solve(
+        self,
+        start: Optional[Coord] = None,
+        goal: Optional[Coord] = None,
+        strategy: Optional[str] = None,
+    ) -> List[Coord]:
+        """Shortest path between any two cells.
+
+        Args:
+            start: Start cell (default: entry).
+            goal: Goal cell (default: exit).
+            strategy: One of mazegen.solver.STRATEGIES ("bfs",
+                "bidirectional", "astar", "tree"); default "auto" uses
+                "tree" for perfect mazes and "bfs" otherwise.
+        """
+        return self._solver.solve(start, goal, strategy)
+
+    def distance_field(self, source: Optional[Coord] = None) -> "array[int]":
+        """Distance in steps from source (default: entry) to every cell.
+
+        Returns an array indexed by y * width + x, with -1 for cells that
+        cannot be reached (the locked "42" cells).
+        """
+        return self._solver.distance_field(source)
+
+    @property
+    def path_index(self) -> PathIndex:
+        """PathIndex answering distance/path queries between any two cells
+        of the current maze (perfect mazes only).
+
+        Built on first use and dropped by regenerate(), so it always
+        matches the current maze.
+        """
+        if self._path_index is None:
+            self._path_index = PathIndex(self._maze)
+        return self._path_index
+
+    @property
+    def path_overlay(self) -> PathOverlay:
+        """PathOverlay of the solution: one byte per cell telling whether
+        the path goes through it and crosses its east or south wall.
+
+        Built on first use and dropped by regenerate().  More paths can
+        be add()ed to it; they stay until then.
+        """
+        if self._path_overlay is None:
+            self._path_overlay = PathOverlay(self._maze, [self._solution])
+        return self._path_overlay
+
     def regenerate(self, seed: Optional[int] = None) -> None:
         """Regenerate the maze with a new or specified seed.
 
         Args:
             seed: New random seed. If None, uses the current seed + 1.
         """
-        if seed is not None:
-            self._seed = seed
-        else:
-            self._seed += 1
-        self._generator.generate(self._seed)
-        self._solution = self._solver.solve()
+        if seed is None:
+            seed = self._seed + 1
+        ready = None
+        if self._prefetcher is not None:
+            try:
+                ready = self._prefetcher.take(seed)
+            except Exception:
+                # The background thread stopped on an error: carry on
+                # without it and generate in the foreground.
+                self._prefetcher.close()
+                self._prefetcher = None
+        self._path_index = None
+        self._path_overlay = None
+        self._text = None
+        previous, self._seed = self._seed, seed
+        if ready is not None:
+            w = self._maze.width
+            self._maze.load_walls(ready.walls)
+            self._solution = [(i % w, i // w) for i in ready.path]
+            self._text = ready.text
+            if ready.stats is not None:
+                ready.stats.prefetched = True
+            self._stats = ready.stats
+            return
+        try:
+            self._build()
+        except BaseException:
+            self._seed = previous
+            raise
+
+    def prefetch(
+        self, depth: int = 2, max_bytes: int = DEFAULT_MAX_BYTES
+    ) -> None:
+        """Generate, solve and serialize the next seeds in a background
+        thread, so that regenerate() to the next seed just swaps one in.
+
+        Args:
+            depth: Most mazes prepared ahead; 0 stops prefetching.
+            max_bytes: Most memory they may hold (at least one is kept).
+        """
+        if self._prefetcher is not None:
+            self._prefetcher.close()
+            self._prefetcher = None
+        if depth > 0:
+            self._prefetcher = Prefetcher(
+                self._spawn, self._seed + 1, depth, max_bytes
+            )
+
+    @property
+    def prefetcher(self) -> Optional[Prefetcher]:
+        """The Prefetcher started by prefetch() (hits, misses, queued),
+        or None."""
+        return self._prefetcher
+
+    def _spawn(self, seed: int) -> "MazeGenerator":
+        """A new MazeGenerator like this one, at seed."""
+        maze, cache = self._maze, self._cache
+        return MazeGenerator(
+            maze.width,
+            maze.height,
+            maze.entry,
+            maze.exit,
+            seed,
+            maze.perfect,
+            "dfs" if self._tiles is not None else self._algorithm,
+            # MazeCache instances are not shared between threads; several
+            # on one directory are fine.
+            cache=(
+                None
+                if cache is None
+                else MazeCache(cache.directory, cache.max_bytes)
+            ),
+            instrument=self._instrument,
+            profile=self._profile,
+            tiles=self._tiles,
+            workers=self._workers,
+        )
 
     def save(self, output_file: str) -> None:
         """Save the maze and its solution to a file.
@@ -114,4 +518,133 @@ class MazeGenerator:
         Args:
             output_file: Path to the output file.
         """
-        self._writer.save(self._solution, output_file)
+        if self._text is not None:
+            _write_text(output_file, self._text)
+        else:
+            self._writer.save(self._solution, output_file)
+
+    def save_async(self, output_file: str) -> "Future[None]":
+        """save() in a background thread; returns its Future.
+
+        The maze is serialized now (unless prefetched, which did that
+        already) and written later, one file after another.  The first
+        error of the earlier save_async() calls is raised here (once they
+        are done) or by close().
+        """
+        self._check_saves(wait=False)
+        text = self._text
+        if text is None:
+            buf = io.StringIO()
+            self.dump(buf)
+            text = buf.getvalue()
+        if self._saver is None:
+            self._saver = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="mazegen-save"
+            )
+        saved = self._saver.submit(_write_text, output_file, text)
+        self._saves.append(saved)
+        return saved
+
+    def _check_saves(self, wait: bool) -> None:
+        """Drop the finished save_async() writes (all of them, waiting,
+        if wait) and raise the first error among them."""
+        done = [f for f in self._saves if wait or f.done()]
+        self._saves = [f for f in self._saves if f not in done]
+        for saved in done:
+            saved.result()
+
+    def close(self) -> None:
+        """Stop prefetching and wait for pending save_async() writes."""
+        self.prefetch(0)
+        if self._saver is not None:
+            self._saver.shutdown(wait=True)
+            self._saver = None
+        self._check_saves(wait=True)
+
+    def save_binary(
+        self, output_file: str, locked: Optional[bool] = None
+    ) -> None:
+        """Save the maze, its solution and its seed in the compact binary
+        .mzb format (see mazegen.binary); load it with load_binary().
+        Raises ValueError if the seed does not fit the format's signed
+        64-bit field.
+
+        Args:
+            output_file: Path to the output file.
+            locked: Store the locked-cell bitmap (True), never (False),
+                or only when it differs from the standard "42" pattern,
+                which readers assume otherwise (None, the default).
+        """
+        save_binary(
+            output_file, self._maze, self._solution, self._seed, locked
+        )
+
+    def save_image(
+        self,
+        output_file: str,
+        cell: int = 4,
+        wall: int = 1,
+        colors: Optional[Dict[str, RGB]] = None,
+        show_path: bool = True,
+    ) -> None:
+        """Save the maze as a PNG or PPM image (by the extension of
+        output_file), see mazegen.image.
+
+        Args:
+            output_file: Path to the output .png or .ppm file.
+            cell: Size of a cell in pixels (default: 4).
+            wall: Thickness of a wall in pixels (default: 1).
+            colors: Colors replacing some of mazegen.image.COLORS, e.g.
+                {"path": (255, 128, 0)}.
+            show_path: Draw path_overlay (the solution, plus any paths
+                added to it).
+        """
+        save_image(
+            output_file,
+            self._maze,
+            self.path_overlay if show_path else None,
+            cell,
+            wall,
+            colors,
+        )
+
+    def dump(self, f: TextIO) -> None:
+        """Write the maze and its solution, in the save() format, to an
+        open text stream.
+
+        Args:
+            f: Writable text stream, e.g. an open file or io.StringIO.
+        """
+        self._writer.dump(self._solution, f)
+
+    @staticmethod
+    def stream_to_file(
+        output_file: str,
+        width: int = 20,
+        height: int = 15,
+        entry: Optional[Coord] = None,
+        exit: Optional[Coord] = None,
+        seed: int = 42,
+        perfect: bool = True,
+        solve: bool = True,
+    ) -> None:
+        """Generate a maze row by row into output_file without ever holding
+        the whole grid, using Eller's algorithm (memory grows with the
+        width only).
+
+        Args:
+            output_file: Path to the output file.
+            width, height, entry, exit, seed, perfect: As for the
+                constructor.
+            solve: Find the solution with a second pass over the written
+                rows (perfect mazes only). If False, the path line is left
+                empty.
+        """
+        stream_to_file(
+            output_file, width, height, entry, exit, seed, perfect, solve
+        )
+
+
+def _write_text(output_file: str, text: str) -> None:
+    with open(output_file, "w") as f:
+        f.write(text)
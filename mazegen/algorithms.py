@@ -0,0 +1,382 @@
+"""Alternative spanning-tree algorithms for Genarator.
+
+Every class here only replaces Genarator._carve_tree, so seeding, the
+locked "42" cells and the loop phase of imperfect mazes work exactly as for
+the default depth-first search.  Each algorithm carves a spanning tree over
+the unlocked cells, and a tree never contains an open 2x2 area, let alone a
+3x3 one.
+"""
+
+import random
+from array import array
+from typing import Callable, Dict, Iterator, List, Optional, Type, Union
+
+from mazegen.cell import (
+    ALL_WALLS,
+    DIR_BITS,
+    EAST,
+    NORTH,
+    OPPOSITE_DIR_BITS,
+    SOUTH,
+    WEST,
+)
+from mazegen.generator import Genarator
+from mazegen.maze import Maze
+
+# 1 for every unlocked cell of Maze.locked, 0 for the locked ones.
+_UNLOCKED = bytes([1]) + bytes(255)
+
+
+def _unlocked_map(maze: Maze) -> bytearray:
+    return bytearray(maze.locked.translate(_UNLOCKED))
+
+
+def _find(parent: "array[int]", i: int) -> int:
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def _shuffled_walls(maze: Maze, rng: random.Random) -> List[int]:
+    """Every closed wall between two unlocked cells, in random order.
+
+    A wall is encoded as ``2 * i`` for the east wall of cell i and
+    ``2 * i + 1`` for its south wall.
+    """
+    w, h = maze.width, maze.height
+    walls, locked = maze.walls, maze.locked
+    edges = []
+    for i in range(w * h):
+        if locked[i]:
+            continue
+        if (i + 1) % w and walls[i] & EAST and not locked[i + 1]:
+            edges.append(2 * i)
+        if i + w < w * h and walls[i] & SOUTH and not locked[i + w]:
+            edges.append(2 * i + 1)
+    rng.shuffle(edges)
+    return edges
+
+
+def _join_trees(maze: Maze, parent: "array[int]", edges: List[int]) -> None:
+    """Open each wall of ``edges`` that joins two different trees."""
+    walls, w = maze.walls, maze.width
+    for e in edges:
+        i = e >> 1
+        j = i + (w if e & 1 else 1)
+        ri, rj = _find(parent, i), _find(parent, j)
+        if ri == rj:
+            continue
+        parent[ri] = rj
+        if e & 1:
+            walls[i] &= ~SOUTH
+            walls[j] &= ~NORTH
+        else:
+            walls[i] &= ~EAST
+            walls[j] &= ~WEST
+
+
+class KruskalGenerator(Genarator):
+    """Randomized Kruskal: visit every wall in random order and open it
+    when it joins two different trees of a union-find forest."""
+
+    def _carve_tree(self) -> bytearray:
+        parent = self._parent_buffer()
+        _join_trees(self.maze, parent, _shuffled_walls(self.maze, self.rng))
+        return _unlocked_map(self.maze)
+
+
+class WilsonGenerator(Genarator):
+    """Wilson's algorithm: loop-erased random walks produce a spanning tree
+    drawn uniformly from all spanning trees of the unlocked cells."""
+
+    def _carve_tree(self) -> bytearray:
+        maze = self.maze
+        w, h = maze.width, maze.height
+        walls, locked = maze.walls, maze.locked
+        offsets = (-w, 1, w, -1)
+        choice = self.rng.choice
+
+        cells = [i for i in range(w * h) if not locked[i]]
+        self.rng.shuffle(cells)
+        in_tree = self._cell_buffer()
+        in_tree[cells[0]] = 1
+        # Direction last taken out of each cell by the current walk;
+        # overwriting it on revisits is what erases the loops.
+        step = self._cell_buffer(1)
+
+        for start in cells:
+            i = start
+            while not in_tree[i]:
+                y, x = divmod(i, w)
+                dirs = [
+                    d
+                    for d, ok in enumerate(
+                        (y > 0, x < w - 1, y < h - 1, x > 0)
+                    )
+                    if ok and not locked[i + offsets[d]]
+                ]
+                d = choice(dirs)
+                step[i] = d
+                i += offsets[d]
+
+            i = start
+            while not in_tree[i]:
+                d = step[i]
+                walls[i] &= ~DIR_BITS[d]
+                walls[i + offsets[d]] &= ~OPPOSITE_DIR_BITS[d]
+                in_tree[i] = 1
+                i += offsets[d]
+
+        return _unlocked_map(maze)
+
+
+# Share of a row's cells that eller_rows() tries to turn into loops when
+# asked to, matching the ~10% of Genarator._add_loops.
+ROW_LOOP_RATE = 0.1
+
+
+def _eller_join(
+    row: bytearray, sets: List[int], members: Dict[int, List[int]], x: int
+) -> None:
+    """Open the east wall of cell x and merge the two sets."""
+    row[x] &= ~EAST
+    row[x + 1] &= ~WEST
+    keep, drop = sets[x], sets[x + 1]
+    if len(members[keep]) < len(members[drop]):
+        keep, drop = drop, keep
+    cols = members.pop(drop)
+    for c in cols:
+        sets[c] = keep
+    members[keep].extend(cols)
+
+
+def _row_opens_3x3(rows: List[bytearray], x: int) -> bool:
+    """Whether opening the east wall of cell x in rows[2] would leave a 3x3
+    region of rows[0:3] without internal walls.
+
+    Regions reaching into later rows are never open yet: those rows are
+    still fully walled.
+    """
+    top, mid, cur = rows
+    for tx in (x - 1, x):
+        if tx < 0 or tx + 2 >= len(cur):
+            continue
+        if any(r[c] & EAST for r in (top, mid) for c in (tx, tx + 1)):
+            continue
+        other = tx + 1 if tx == x else tx
+        if cur[other] & EAST:
+            continue
+        if any(r[c] & SOUTH for r in (top, mid) for c in range(tx, tx + 3)):
+            continue
+        return True
+    return False
+
+
+def eller_rows(
+    width: int,
+    height: int,
+    locked_row: Callable[[int], Union[bytes, bytearray]],
+    loops: bool = False,
+    rng: Optional[random.Random] = None,
+) -> Iterator[bytearray]:
+    """Run Eller's algorithm and yield each row of wall nibbles as soon as
+    it is final, so the working state is O(width) whatever the height.
+
+    ``locked_row(y)`` returns one byte per cell of row y, non-zero for
+    locked cells; those take no part in any set.  A set that cannot
+    continue into the next row (every cell below it is locked) is merged
+    sideways into a neighbouring set first so that no region is cut off.
+
+    With ``loops`` some walls between cells that are already connected are
+    opened as well, about ROW_LOOP_RATE per cell.  Only the two previous
+    rows are needed to keep those loops from opening a 3x3 area: a later
+    tree carve always joins two unconnected cells, so it can never be the
+    wall that completes an open region.
+
+    Random numbers come from ``rng`` (default: the random module's).
+    """
+    rand = random.random if rng is None else rng.random
+    shuffle = random.shuffle if rng is None else rng.shuffle
+    sets = [-1] * width
+    next_id = 0
+    cur = bytearray([ALL_WALLS]) * width
+    lock = locked_row(0)
+    done: List[bytearray] = []
+
+    for y in range(height):
+        last = y == height - 1
+        members: Dict[int, List[int]] = {}
+        for x in range(width):
+            if lock[x]:
+                sets[x] = -1
+                continue
+            if sets[x] < 0:
+                sets[x] = next_id
+                next_id += 1
+            members.setdefault(sets[x], []).append(x)
+
+        for x in range(width - 1):
+            a, b = sets[x], sets[x + 1]
+            if a < 0 or b < 0 or a == b:
+                continue
+            if last or rand() < 0.5:
+                _eller_join(cur, sets, members, x)
+
+        if loops:
+            budget = int((width - lock.count(1)) * ROW_LOOP_RATE)
+            eligible = [
+                x
+                for x in range(width - 1)
+                if sets[x] >= 0 and sets[x] == sets[x + 1] and cur[x] & EAST
+            ]
+            shuffle(eligible)
+            for x in eligible:
+                if budget <= 0:
+                    break
+                if len(done) == 2 and _row_opens_3x3(done + [cur], x):
+                    continue
+                cur[x] &= ~EAST
+                cur[x + 1] &= ~WEST
+                budget -= 1
+
+        if last:
+            yield cur
+            break
+
+        lock = locked_row(y + 1)
+        merged = True
+        while merged:
+            merged = False
+            for sid in list(members):
+                cols = members.get(sid)
+                if cols is None or any(not lock[x] for x in cols):
+                    continue
+                for x in cols:
+                    if x + 1 < width and sets[x + 1] not in (-1, sid):
+                        _eller_join(cur, sets, members, x)
+                        merged = True
+                        break
+                    if x > 0 and sets[x - 1] not in (-1, sid):
+                        _eller_join(cur, sets, members, x - 1)
+                        merged = True
+                        break
+
+        nxt = bytearray([ALL_WALLS]) * width
+        below = [-1] * width
+        for sid, cols in members.items():
+            down = [x for x in cols if not lock[x]]
+            shuffle(down)
+            for k, x in enumerate(down):
+                if k == 0 or rand() < 0.5:
+                    cur[x] &= ~SOUTH
+                    nxt[x] &= ~NORTH
+                    below[x] = sid
+
+        yield cur
+        done = (done + [cur])[-2:]
+        cur, sets = nxt, below
+
+
+class EllerGenerator(Genarator):
+    """Eller's algorithm: build the maze one row at a time, tracking only
+    which set each cell of the current row belongs to (see eller_rows)."""
+
+    def _carve_tree(self) -> bytearray:
+        maze = self.maze
+        w, h = maze.width, maze.height
+        walls, locked = maze.walls, maze.locked
+        rows = eller_rows(
+            w, h, lambda y: locked[y * w:(y + 1) * w], rng=self.rng
+        )
+        for y, row in enumerate(rows):
+            walls[y * w:(y + 1) * w] = row
+        return _unlocked_map(maze)
+
+
+class BinaryTreeGenerator(Genarator):
+    """Binary tree: every cell opens its north or west wall at random.
+
+    Cells whose north and west neighbours are both locked or outside the
+    maze start a separate tree.  Apart from the top-left one these trees
+    are small (they sit in the shadow of the "42"), so they are joined
+    Kruskal-style using only the walls around them.
+    """
+
+    def _carve_tree(self) -> bytearray:
+        maze = self.maze
+        w, h = maze.width, maze.height
+        walls, locked = maze.walls, maze.locked
+        choice = self.rng.choice
+        parent = self._parent_buffer()
+        roots = []
+
+        for i in range(w * h):
+            if locked[i]:
+                continue
+            dirs = []
+            if i >= w and not locked[i - w]:
+                dirs.append(0)
+            if i % w and not locked[i - 1]:
+                dirs.append(3)
+            if not dirs:
+                roots.append(i)
+                continue
+            d = choice(dirs)
+            j = i - w if d == 0 else i - 1
+            walls[i] &= ~DIR_BITS[d]
+            walls[j] &= ~OPPOSITE_DIR_BITS[d]
+            parent[i] = j
+
+        if len(roots) > 1:
+            edges = set()
+            for root in roots[1:]:
+                edges.update(self._boundary_walls(root))
+            ordered = sorted(edges)
+            self.rng.shuffle(ordered)
+            _join_trees(maze, parent, ordered)
+        return _unlocked_map(maze)
+
+    def _boundary_walls(self, root: int) -> List[int]:
+        """Closed walls (encoded as in _shuffled_walls) between the tree of
+        ``root`` and the unlocked cells around it."""
+        w, h = self.maze.width, self.maze.height
+        walls, locked = self.maze.walls, self.maze.locked
+        offsets = (-w, 1, w, -1)
+        seen = {root}
+        todo = [root]
+        edges = []
+        while todo:
+            i = todo.pop()
+            y, x = divmod(i, w)
+            for d, ok in enumerate((y > 0, x < w - 1, y < h - 1, x > 0)):
+                j = i + offsets[d]
+                if not ok or locked[j] or j in seen:
+                    continue
+                if walls[i] & DIR_BITS[d]:
+                    lo = min(i, j)
+                    edges.append(2 * lo + (d % 2 == 0))
+                else:
+                    seen.add(j)
+                    todo.append(j)
+        return edges
+
+
+ALGORITHMS: Dict[str, Type[Genarator]] = {
+    "dfs": Genarator,
+    "kruskal": KruskalGenerator,
+    "wilson": WilsonGenerator,
+    "eller": EllerGenerator,
+    "binary_tree": BinaryTreeGenerator,
+}
+
+
+def get_algorithm(name: str) -> Type[Genarator]:
+    """Look up a generator class by its ALGORITHMS name."""
+    try:
+        return ALGORITHMS[name]
+    except KeyError:
+        names = ", ".join(sorted(ALGORITHMS))
+        raise ValueError(
+            f"unknown algorithm {name!r} (expected one of: {names})"
+        ) from None
@@ -0,0 +1,230 @@
+"""Generate many seeded mazes from one configuration, across processes.
+
+Each worker process builds one MazeGenerator for the configuration and
+calls regenerate(seed) for every seed it is handed, which gives exactly
+the maze a fresh ``MazeGenerator(..., seed=seed)`` would.  Workers send
+back the maze already serialized in the save() text format, so only short
+strings cross the process boundary.  map_seeds() runs any other job
+(e.g. writing an image, see mazegen.image.save_images) the same way.
+
+generate_concurrently() does the same with threads: every generator owns
+its random.Random, so each thread can keep its own MazeGenerator without
+pickling or process startup.  Under the GIL the threads take turns; on a
+free-threaded CPython build they run on all cores.
+"""
+
+import io
+import math
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Protocol,
+    Tuple,
+    TypeVar,
+)
+
+from mazegen.maze import Coord
+
+if TYPE_CHECKING:
+    from mazegen import MazeGenerator
+
+
+class MazeConfig(Protocol):
+    """What generate_many needs from a configuration object."""
+
+    width: int
+    height: int
+    entry: Coord
+    exit: Coord
+    perfect: bool
+
+
+# What a worker builds its MazeGenerator from (picklable, hashable):
+# width, height, entry, exit, perfect, algorithm.
+Params = Tuple[int, int, Coord, Coord, bool, str]
+
+T = TypeVar("T")
+
+# Chunks handed to each worker per run; more chunks balance better, fewer
+# pickle less.
+CHUNKS_PER_WORKER = 4
+
+_generator: Optional["MazeGenerator"] = None
+
+
+def config_params(config: MazeConfig) -> Params:
+    """The Params of a configuration object (algorithm: "dfs" unless it
+    has one)."""
+    return (
+        config.width,
+        config.height,
+        config.entry,
+        config.exit,
+        config.perfect,
+        getattr(config, "algorithm", "dfs"),
+    )
+
+
+def make_generator(params: Params) -> "MazeGenerator":
+    """A MazeGenerator for params, with nothing generated yet;
+    regenerate(seed) then gives the maze of that seed."""
+    from mazegen import MazeGenerator
+
+    return MazeGenerator.blank(*params)
+
+
+def _init_worker(params: Params) -> None:
+    global _generator
+    _generator = make_generator(params)
+
+
+def _render(mg: "MazeGenerator", seed: int) -> Tuple[int, str]:
+    mg.regenerate(seed)
+    buf = io.StringIO()
+    mg.dump(buf)
+    return seed, buf.getvalue()
+
+
+def _call_in_worker(
+    job: Callable[["MazeGenerator", int], T], seed: int
+) -> T:
+    assert _generator is not None
+    return job(_generator, seed)
+
+
+def map_seeds(
+    config: MazeConfig,
+    seeds: Iterable[int],
+    job: Callable[["MazeGenerator", int], T],
+    workers: Optional[int] = None,
+    chunksize: Optional[int] = None,
+) -> Iterator[T]:
+    """Yield job(mg, seed) for each seed, in seed order.
+
+    mg is the MazeGenerator of config reused by the worker for all its
+    seeds; job is expected to call mg.regenerate(seed) first.  job must
+    be picklable (a module-level function or a functools.partial of
+    one).  workers and chunksize are as for generate_many().
+    """
+    params = config_params(config)
+    seeds = list(seeds)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(seeds) <= 1:
+        mg = make_generator(params)
+        for seed in seeds:
+            yield job(mg, seed)
+        return
+
+    if chunksize is None:
+        chunksize = max(
+            1, math.ceil(len(seeds) / (workers * CHUNKS_PER_WORKER))
+        )
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(params,)
+    ) as pool:
+        yield from pool.map(
+            partial(_call_in_worker, job), seeds, chunksize=chunksize
+        )
+
+
+def generate_many(
+    config: MazeConfig,
+    seeds: Iterable[int],
+    workers: Optional[int] = None,
+    chunksize: Optional[int] = None,
+) -> Iterator[Tuple[int, str]]:
+    """Generate one maze per seed and yield ``(seed, text)`` pairs in seed
+    order, where text is what MazeGenerator.save() would write.
+
+    Args:
+        config: Any object with width, height, entry, exit and perfect
+            attributes (and optionally algorithm), e.g. src.config.Config.
+        seeds: Seeds to generate.
+        workers: Number of worker processes; 1 runs serially in this
+            process. Defaults to os.cpu_count().
+        chunksize: Seeds per task sent to a worker. Defaults to splitting
+            the seeds into CHUNKS_PER_WORKER chunks per worker.
+    """
+    return map_seeds(config, seeds, _render, workers, chunksize)
+
+
+def generate_concurrently(
+    config: MazeConfig,
+    seeds: Iterable[int],
+    threads: Optional[int] = None,
+) -> Iterator[Tuple[int, str]]:
+    """generate_many() with worker threads instead of processes: yield
+    ``(seed, text)`` pairs in seed order, the same as generate_many().
+
+    Each thread builds one MazeGenerator for config on its first seed and
+    reuses it.  threads defaults to os.cpu_count(); 1 runs serially in
+    this thread.
+    """
+    params = config_params(config)
+    seeds = list(seeds)
+    if threads is None:
+        threads = os.cpu_count() or 1
+    if threads <= 1 or len(seeds) <= 1:
+        mg = make_generator(params)
+        for seed in seeds:
+            yield _render(mg, seed)
+        return
+
+    local = threading.local()
+
+    def render(seed: int) -> Tuple[int, str]:
+        mg = getattr(local, "generator", None)
+        if mg is None:
+            mg = local.generator = make_generator(params)
+        return _render(mg, seed)
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        yield from pool.map(render, seeds)
+
+
+def seed_path(output: str, seed: int) -> str:
+    """Output file for one seed: ``{seed}`` in output is replaced by the
+    seed, otherwise it is inserted before the extension (maze_7.txt)."""
+    if "{seed}" in output:
+        return output.replace("{seed}", str(seed))
+    root, ext = os.path.splitext(output)
+    return f"{root}_{seed}{ext}"
+
+
+def save_many(
+    config: MazeConfig,
+    seeds: Iterable[int],
+    output: str,
+    workers: Optional[int] = None,
+    combined: bool = False,
+) -> List[str]:
+    """Generate one maze per seed and save them.
+
+    By default each maze goes to its own file (see seed_path).  With
+    ``combined`` they all go to ``output``, each preceded by a
+    ``SEED <n>`` line.  Returns the paths written.
+    """
+    results = generate_many(config, seeds, workers)
+    if combined:
+        with open(output, "w") as f:
+            for seed, text in results:
+                f.write(f"SEED {seed}\n")
+                f.write(text)
+        return [output]
+
+    paths = []
+    for seed, text in results:
+        path = seed_path(output, seed)
+        with open(path, "w") as f:
+            f.write(text)
+        paths.append(path)
+    return paths
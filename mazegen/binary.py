@@ -0,0 +1,421 @@
+"""Compact binary maze files (``.mzb``) and a memory-mapped reader.
+
+Layout, all integers little-endian:
+
+    header   HEADER (48 bytes): magic b"MZB1", version, flags, reserved,
+             width, height, entry x/y, exit x/y, seed, solution length
+    walls    ceil(n / 2) bytes: two cells per byte, the even cell in the
+             low nibble (N=1, E=2, S=4, W=8 as in Maze.walls)
+    locked   ceil(n / 8) bytes, only with FLAG_LOCKED: one bit per cell,
+             least significant bit first
+    solution ceil(moves / 4) bytes, only with FLAG_SOLUTION: one 2-bit
+             direction number (N=0, E=1, S=2, W=3) per move, low bits first
+
+where n is width * height.  A file is about a quarter of the size of the
+hex text format.  Without FLAG_LOCKED the locked cells are the "42"
+pattern of a Maze of that size.  The seed field is a signed 64-bit
+integer, so only seeds from SEED_MIN to SEED_MAX can be saved.
+"""
+
+import mmap
+import struct
+from typing import BinaryIO, List, Optional, Set, Tuple, Union, overload
+
+from mazegen.cell import WALL_BITS, CellGrid
+from mazegen.direction import Direction
+from mazegen.maze import Coord, Maze, pattern_42
+from mazegen.writer import path_directions
+
+MAGIC = b"MZB1"
+VERSION = 1
+HEADER = struct.Struct("<4sBBHIIIIIIqQ")
+
+FLAG_PERFECT = 1
+FLAG_LOCKED = 2
+FLAG_SOLUTION = 4
+FLAG_SEED = 8
+
+# Seeds that fit the header's seed field.
+SEED_MIN = -(1 << 63)
+SEED_MAX = (1 << 63) - 1
+
+# Cells packed per call, so big mazes never need whole-maze temporaries.
+# A multiple of 8 keeps every chunk byte-aligned for all field widths.
+CHUNK = 1 << 20
+
+# bytes.translate() tables: shift every byte left by s bits, and extract
+# the bits-wide field at bit offset s.
+_SHIFT = {s: bytes((b << s) & 0xFF for b in range(256)) for s in range(8)}
+_FIELD = {
+    (bits, s): bytes((b >> s) & ((1 << bits) - 1) for b in range(256))
+    for bits in (1, 2, 4)
+    for s in range(0, 8, bits)
+}
+_MOVE_CODES = bytes(
+    "NESW".index(chr(c)) if chr(c) in "NESW" else 0 for c in range(256)
+)
+_MOVE_LETTERS = b"NESW" + bytes(252)
+_DX = (0, 1, 0, -1)
+_DY = (-1, 0, 1, 0)
+
+
+def _pack(values: Union[bytes, bytearray], bits: int) -> bytes:
+    """Pack values (each below 2**bits) 8 // bits to a byte, first value
+    in the low bits."""
+    per = 8 // bits
+    size = -(-len(values) // per)
+    acc = 0
+    for k in range(per):
+        part = values[k::per].ljust(size, b"\0")
+        if k:
+            part = part.translate(_SHIFT[k * bits])
+        acc |= int.from_bytes(part, "little")
+    return acc.to_bytes(size, "little")
+
+
+def _unpack(packed: bytes, bits: int, count: int) -> bytearray:
+    """Inverse of _pack: the first count values of packed."""
+    per = 8 // bits
+    out = bytearray(count)
+    for k in range(min(per, count)):
+        n = len(range(k, count, per))
+        out[k::per] = packed.translate(_FIELD[bits, k * bits])[:n]
+    return out
+
+
+def _pack_chunked(
+    data: Union[bytes, bytearray], bits: int
+) -> List[bytes]:
+    return [
+        _pack(data[i:i + CHUNK], bits) for i in range(0, len(data), CHUNK)
+    ]
+
+
+def _pattern_locked(width: int, height: int) -> "SparseCells":
+    return SparseCells(
+        {y * width + x for x, y in pattern_42(width, height)}, width * height
+    )
+
+
+def _check_seed(seed: Optional[int]) -> None:
+    if seed is not None and not SEED_MIN <= seed <= SEED_MAX:
+        raise ValueError(
+            f"seed {seed} does not fit a .mzb file "
+            f"({SEED_MIN} to {SEED_MAX})"
+        )
+
+
+def dump_binary(
+    f: BinaryIO,
+    maze: Maze,
+    solution: Optional[List[Coord]] = None,
+    seed: Optional[int] = None,
+    locked: Optional[bool] = None,
+) -> None:
+    """Write maze (and optionally its solution and seed) to an open binary
+    stream in the .mzb format.
+
+    The locked bitmap is written when ``locked`` is True, left out when it
+    is False, and by default only when the locked cells are not just the
+    "42" pattern.  Raises ValueError if seed does not fit the header
+    (SEED_MIN to SEED_MAX).
+    """
+    _check_seed(seed)
+    if locked is None:
+        pattern = _pattern_locked(maze.width, maze.height)
+        locked = maze.locked != pattern.tobytes()
+    flags = FLAG_PERFECT if maze.perfect else 0
+    moves = b""
+    if locked:
+        flags |= FLAG_LOCKED
+    if solution:
+        flags |= FLAG_SOLUTION
+        moves = path_directions(solution).encode("ascii")
+    if seed is not None:
+        flags |= FLAG_SEED
+    f.write(
+        HEADER.pack(
+            MAGIC,
+            VERSION,
+            flags,
+            0,
+            maze.width,
+            maze.height,
+            maze.entry[0],
+            maze.entry[1],
+            maze.exit[0],
+            maze.exit[1],
+            seed or 0,
+            len(moves),
+        )
+    )
+    for part in _pack_chunked(maze.walls, 4):
+        f.write(part)
+    if locked:
+        for part in _pack_chunked(maze.locked, 1):
+            f.write(part)
+    if moves:
+        f.write(_pack(moves.translate(_MOVE_CODES), 2))
+
+
+def save_binary(
+    output_file: str,
+    maze: Maze,
+    solution: Optional[List[Coord]] = None,
+    seed: Optional[int] = None,
+    locked: Optional[bool] = None,
+) -> None:
+    """Write a .mzb file; see dump_binary."""
+    _check_seed(seed)
+    with open(output_file, "wb") as f:
+        dump_binary(f, maze, solution, seed, locked)
+
+
+class PackedCells:
+    """Read-only per-cell sequence over packed fields of a buffer, used as
+    BinaryMaze.walls (4-bit fields) and BinaryMaze.locked (1-bit)."""
+
+    __slots__ = ("_buf", "_offset", "_count", "_bits", "_per", "_mask")
+
+    def __init__(
+        self, buf: Union[bytes, mmap.mmap], offset: int, count: int, bits: int
+    ) -> None:
+        self._buf = buf
+        self._offset = offset
+        self._count = count
+        self._bits = bits
+        self._per = 8 // bits
+        self._mask = (1 << bits) - 1
+
+    def __len__(self) -> int:
+        return self._count
+
+    @overload
+    def __getitem__(self, i: int) -> int:
+        ...
+
+    @overload
+    def __getitem__(self, i: slice) -> bytes:
+        ...
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[int, bytes]:
+        if isinstance(i, slice):
+            start, stop, step = i.indices(self._count)
+            if step != 1:
+                return bytes(self[j] for j in range(start, stop, step))
+            return self._range(start, max(stop, start))
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError("cell index out of range")
+        q, r = divmod(i, self._per)
+        return (self._buf[self._offset + q] >> (r * self._bits)) & self._mask
+
+    def __setitem__(self, i: int, value: int) -> None:
+        raise TypeError("mazes loaded from .mzb files are read-only")
+
+    def _range(self, start: int, stop: int) -> bytes:
+        first = start // self._per
+        last = -(-stop // self._per)
+        raw = self._buf[self._offset + first:self._offset + last]
+        skip = start - first * self._per
+        values = _unpack(raw, self._bits, len(raw) * self._per)
+        return bytes(values[skip:skip + stop - start])
+
+    def tobytes(self) -> bytes:
+        """All values unpacked, one byte per cell."""
+        return b"".join(
+            self._range(i, min(i + CHUNK, self._count))
+            for i in range(0, self._count, CHUNK)
+        )
+
+
+class SparseCells:
+    """Read-only per-cell 0/1 sequence that is 1 only for the given cells;
+    BinaryMaze.locked for files without a locked bitmap."""
+
+    __slots__ = ("_cells", "_count")
+
+    def __init__(self, cells: Set[int], count: int) -> None:
+        self._cells = cells
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    @overload
+    def __getitem__(self, i: int) -> int:
+        ...
+
+    @overload
+    def __getitem__(self, i: slice) -> bytes:
+        ...
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[int, bytes]:
+        if isinstance(i, slice):
+            return bytes(
+                j in self._cells for j in range(*i.indices(self._count))
+            )
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError("cell index out of range")
+        return 1 if i in self._cells else 0
+
+    def __setitem__(self, i: int, value: int) -> None:
+        raise TypeError("mazes loaded from .mzb files are read-only")
+
+    def tobytes(self) -> bytes:
+        """All values, one byte per cell."""
+        out = bytearray(self._count)
+        for i in self._cells:
+            out[i] = 1
+        return bytes(out)
+
+
+class BinaryMaze:
+    """Read-only, Maze-compatible view of a .mzb file.
+
+    Cells are read straight from a memory map of the file, so opening is
+    independent of the maze size and only the pages that are touched are
+    read.  ``cells[y][x]``, ``walls``, ``locked``, ``is_closed`` and the
+    other read-only Maze attributes work as usual; to_maze() makes a
+    regular, editable Maze.  Close it (or use it as a context manager)
+    to release the file.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(
+                self._file.fileno(), 0, access=mmap.ACCESS_READ
+            )
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"{path}: not a .mzb file") from None
+        try:
+            self._parse(path)
+        except Exception:
+            self.close()
+            raise
+
+    def _parse(self, path: str) -> None:
+        mm = self._mm
+        if len(mm) < HEADER.size:
+            raise ValueError(f"{path}: not a .mzb file")
+        (
+            magic,
+            version,
+            flags,
+            _,
+            width,
+            height,
+            ex,
+            ey,
+            tx,
+            ty,
+            seed,
+            moves,
+        ) = HEADER.unpack_from(mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not a .mzb file")
+        if version != VERSION:
+            raise ValueError(f"{path}: unsupported .mzb version {version}")
+
+        self.width: int = width
+        self.height: int = height
+        self.entry: Coord = (ex, ey)
+        self.exit: Coord = (tx, ty)
+        self.perfect = bool(flags & FLAG_PERFECT)
+        self.seed: Optional[int] = seed if flags & FLAG_SEED else None
+        self._moves: int = moves if flags & FLAG_SOLUTION else -1
+
+        n = width * height
+        offset = HEADER.size
+        self.walls = PackedCells(mm, offset, n, 4)
+        offset += -(-n // 2)
+        self.locked: Union[PackedCells, SparseCells]
+        if flags & FLAG_LOCKED:
+            self.locked = PackedCells(mm, offset, n, 1)
+            offset += -(-n // 8)
+        else:
+            self.locked = _pattern_locked(width, height)
+        self._solution_offset = offset
+        if self._moves > 0:
+            offset += -(-self._moves // 4)
+        if len(mm) < offset:
+            raise ValueError(f"{path}: truncated .mzb file")
+        self.cells = CellGrid(self.walls, self.locked, width, height)
+
+    def close(self) -> None:
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self) -> "BinaryMaze":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    @property
+    def has_solution(self) -> bool:
+        return self._moves >= 0
+
+    @property
+    def directions(self) -> str:
+        """The stored solution as an N/E/S/W string ("" if none)."""
+        if self._moves <= 0:
+            return ""
+        start = self._solution_offset
+        raw = self._mm[start:start + -(-self._moves // 4)]
+        codes = _unpack(raw, 2, self._moves)
+        return codes.translate(_MOVE_LETTERS).decode("ascii")
+
+    @property
+    def solution(self) -> List[Coord]:
+        """The stored solution as (x, y) coordinates from the entry, or []
+        if the file has none."""
+        if self._moves < 0:
+            return []
+        x, y = self.entry
+        path = [(x, y)]
+        for c in self.directions:
+            d = "NESW".index(c)
+            x += _DX[d]
+            y += _DY[d]
+            path.append((x, y))
+        return path
+
+    def in_bounds(self, x: int, y: int) -> bool:
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def index(self, x: int, y: int) -> int:
+        return y * self.width + x
+
+    def is_locked(self, x: int, y: int) -> bool:
+        return bool(self.locked[y * self.width + x])
+
+    def is_closed(self, x: int, y: int, d: Direction) -> bool:
+        return bool(self.walls[y * self.width + x] & WALL_BITS[d])
+
+    def neighbors(self, x: int, y: int) -> List[Tuple[Direction, int, int]]:
+        result = []
+        for d in Direction:
+            nx, ny = x + d.dx, y + d.dy
+            if self.in_bounds(nx, ny):
+                result.append((d, nx, ny))
+        return result
+
+    def to_maze(self) -> Maze:
+        """Copy the view into a regular, editable Maze."""
+        maze = Maze(
+            self.width, self.height, self.entry, self.exit, self.perfect
+        )
+        maze.walls[:] = self.walls.tobytes()
+        maze.locked[:] = self.locked.tobytes()
+        return maze
+
+
+def load_binary(path: str) -> BinaryMaze:
+    """Open a .mzb file as a read-only, memory-mapped BinaryMaze."""
+    return BinaryMaze(path)
@@ -0,0 +1,213 @@
+"""On-disk cache of generated mazes, shared between processes.
+
+A maze and its solution are fully determined by the generator's
+parameters, so MazeCache stores them under a hash of those parameters
+and the library version (a new release never reads an older release's
+mazes).  Entries are .mzb files (see mazegen.binary) written to a
+temporary file and renamed into place, so concurrent readers and writers
+only ever see complete files.  A hit refreshes the file's modification
+time, and after each write the least recently used files are deleted
+until the directory fits in max_bytes.  Temporary files older than
+TEMP_GRACE seconds were left by a writer that died before its rename,
+and are deleted on the same pass.
+"""
+
+import hashlib
+import os
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+from mazegen.binary import dump_binary, load_binary
+from mazegen.maze import Coord, Maze
+from mazegen.version import __version__
+
+# Bump when the meaning of cached files changes without a new release.
+CACHE_FORMAT = 1
+DEFAULT_MAX_BYTES = 256 << 20
+SUFFIX = ".mzb"
+TEMP_SUFFIX = ".tmp"
+# Seconds after which a temporary file is taken for the leftover of a
+# writer that died before renaming it (no write takes that long).
+TEMP_GRACE = 3600
+
+# (mtime, size, path) of a file in the cache directory.
+_File = Tuple[float, int, str]
+
+
+def default_directory() -> str:
+    """$MAZEGEN_CACHE, else ~/.cache/mazegen (under $XDG_CACHE_HOME)."""
+    directory = os.environ.get("MAZEGEN_CACHE")
+    if directory:
+        return directory
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(base, "mazegen")
+
+
+class MazeCache:
+    """Size-bounded LRU cache of mazes and solutions in a directory.
+
+    Args:
+        directory: Where to keep the files (default: default_directory()).
+            Several processes may share one directory.
+        max_bytes: Total size above which old entries are evicted.
+
+    Attributes:
+        hits, misses: Lookups of this object that found / did not find
+            an entry.
+        writes, evictions: Entries this object stored / deleted.
+        orphans: Orphaned temporary files this object deleted.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        self.directory = directory or default_directory()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.orphans = 0
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def key(
+        width: int,
+        height: int,
+        entry: Coord,
+        exit: Coord,
+        seed: int,
+        perfect: bool,
+        algorithm: str,
+    ) -> str:
+        """Hex digest naming the maze these generator parameters give."""
+        params = (
+            CACHE_FORMAT,
+            __version__,
+            width,
+            height,
+            tuple(entry),
+            tuple(exit),
+            seed,
+            bool(perfect),
+            algorithm,
+        )
+        return hashlib.sha256(repr(params).encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + SUFFIX)
+
+    def get(self, key: str) -> Optional[Tuple[bytes, List[Coord]]]:
+        """Walls (one nibble per cell, row-major) and solution stored
+        under key, or None.  Unreadable entries count as misses and are
+        removed."""
+        path = self._path(key)
+        try:
+            with load_binary(path) as view:
+                found = (view.walls.tobytes(), view.solution)
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError):
+            self._remove(path)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return found
+
+    def put(
+        self, key: str, maze: Maze, solution: List[Coord], seed: int
+    ) -> None:
+        """Store maze and solution under key, then evict old entries."""
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=TEMP_SUFFIX)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                dump_binary(f, maze, solution, seed)
+            os.replace(tmp, self._path(key))
+        except BaseException:
+            self._remove(tmp)
+            raise
+        self.writes += 1
+        self.evict()
+
+    def _scan(self) -> Tuple[List[_File], List[_File]]:
+        """The entries and the temporary files."""
+        entries: List[_File] = []
+        temps: List[_File] = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(SUFFIX):
+                    found = entries
+                elif entry.name.endswith(TEMP_SUFFIX):
+                    found = temps
+                else:
+                    continue
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                found.append((st.st_mtime, st.st_size, entry.path))
+        return entries, temps
+
+    def _entries(self) -> List[_File]:
+        return self._scan()[0]
+
+    def _remove_orphans(self, temps: List[_File]) -> None:
+        cutoff = time.time() - TEMP_GRACE
+        for mtime, _, path in temps:
+            if mtime < cutoff and self._remove(path):
+                self.orphans += 1
+
+    def evict(self) -> None:
+        """Delete orphaned temporary files, then least recently used
+        entries until the cache fits in max_bytes."""
+        entries, temps = self._scan()
+        self._remove_orphans(temps)
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if self._remove(path):
+                self.evictions += 1
+            total -= size
+
+    @staticmethod
+    def _remove(path: str) -> bool:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def clear(self) -> None:
+        """Delete every entry, and the orphaned temporary files."""
+        entries, temps = self._scan()
+        for _, _, path in entries:
+            self._remove(path)
+        self._remove_orphans(temps)
+
+    def size(self) -> int:
+        """Total size of the entries in bytes."""
+        return sum(size for _, size, _ in self._entries())
+
+    def stats(self) -> Dict[str, int]:
+        """The counters, plus the current number and size of entries."""
+        entries = self._entries()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "orphans": self.orphans,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+        }
@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, Optional, Protocol
 
 from mazegen.direction import Direction
 
@@ -49,3 +50,237 @@ class Cell:
         if self.locked:
             return
         self.north = self.east = self.west = self.south = True
+
+
+NORTH = 1
+EAST = 2
+SOUTH = 4
+WEST = 8
+ALL_WALLS = NORTH | EAST | SOUTH | WEST
+
+WALL_BITS: Dict[Direction, int] = {
+    Direction.N: NORTH,
+    Direction.E: EAST,
+    Direction.S: SOUTH,
+    Direction.W: WEST,
+}
+
+# Index-based variants for hot loops: direction numbers 0-3 follow the
+# Direction declaration order (N, E, S, W).
+DIR_INDEX: Dict[Direction, int] = {d: k for k, d in enumerate(Direction)}
+DIR_BITS = (NORTH, EAST, SOUTH, WEST)
+OPPOSITE_DIR_BITS = (SOUTH, WEST, NORTH, EAST)
+
+# Open direction indices, in N, E, S, W order, for every wall nibble.
+OPEN_DIRS = tuple(
+    tuple(d for d in range(4) if not b & DIR_BITS[d]) for b in range(16)
+)
+
+
+class ByteStorage(Protocol):
+    """Per-cell storage that cell views read and write: a Maze's
+    bytearrays, or a read-only stand-in like mazegen.binary.PackedCells
+    whose __setitem__ raises."""
+
+    def __getitem__(self, i: int) -> int:
+        ...
+
+    def __setitem__(self, i: int, value: int) -> None:
+        ...
+
+
+class CellView:
+    """Cell-compatible view of one entry of a Maze's flat wall storage.
+
+    Reads and writes go straight to the maze's ``walls`` and ``locked``
+    bytearrays, so views are cheap to create and never go stale.  Every
+    write calls ``changed`` (if given), which the Maze uses to drop what
+    it derived from the walls, like its 3x3 counts.
+    """
+
+    __slots__ = ("_walls", "_locked", "_i", "_changed")
+
+    def __init__(
+        self,
+        walls: ByteStorage,
+        locked: ByteStorage,
+        i: int,
+        changed: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self._walls = walls
+        self._locked = locked
+        self._i = i
+        self._changed = changed
+
+    def _get(self, bit: int) -> bool:
+        return bool(self._walls[self._i] & bit)
+
+    def _put(self, bit: int, closed: bool) -> None:
+        if closed:
+            self._walls[self._i] |= bit
+        else:
+            self._walls[self._i] &= ~bit & ALL_WALLS
+        if self._changed is not None:
+            self._changed()
+
+    def _set_locked(self, value: bool) -> None:
+        self._locked[self._i] = 1 if value else 0
+        if self._changed is not None:
+            self._changed()
+
+    @property
+    def north(self) -> bool:
+        return self._get(NORTH)
+
+    @north.setter
+    def north(self, closed: bool) -> None:
+        self._put(NORTH, closed)
+
+    @property
+    def east(self) -> bool:
+        return self._get(EAST)
+
+    @east.setter
+    def east(self, closed: bool) -> None:
+        self._put(EAST, closed)
+
+    @property
+    def south(self) -> bool:
+        return self._get(SOUTH)
+
+    @south.setter
+    def south(self, closed: bool) -> None:
+        self._put(SOUTH, closed)
+
+    @property
+    def west(self) -> bool:
+        return self._get(WEST)
+
+    @west.setter
+    def west(self, closed: bool) -> None:
+        self._put(WEST, closed)
+
+    @property
+    def locked(self) -> bool:
+        return bool(self._locked[self._i])
+
+    @locked.setter
+    def locked(self, value: bool) -> None:
+        self._set_locked(value)
+
+    def set_wall(self, d: Direction, closed: bool) -> None:
+        self._put(WALL_BITS[d], closed)
+
+    def is_closed(self, d: Direction) -> bool:
+        return self._get(WALL_BITS[d])
+
+    def to_bits(self) -> str:
+        return format(self._walls[self._i], "x")
+
+    def lock(self) -> None:
+        self._set_locked(True)
+
+    def reset(self) -> None:
+        if self._locked[self._i]:
+            return
+        self._put(ALL_WALLS, True)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (Cell, CellView)):
+            return (
+                self.north == other.north
+                and self.east == other.east
+                and self.south == other.south
+                and self.west == other.west
+                and self.locked == other.locked
+            )
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return (
+            f"CellView(north={self.north}, east={self.east}, "
+            f"south={self.south}, west={self.west}, locked={self.locked})"
+        )
+
+
+class CellRow:
+    """Row ``cells[y]`` of a CellGrid, indexable by x."""
+
+    __slots__ = ("_walls", "_locked", "_offset", "_width", "_changed")
+
+    def __init__(
+        self,
+        walls: ByteStorage,
+        locked: ByteStorage,
+        offset: int,
+        width: int,
+        changed: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self._walls = walls
+        self._locked = locked
+        self._offset = offset
+        self._width = width
+        self._changed = changed
+
+    def __len__(self) -> int:
+        return self._width
+
+    def __getitem__(self, x: int) -> CellView:
+        if x < 0:
+            x += self._width
+        if not 0 <= x < self._width:
+            raise IndexError("cell index out of range")
+        return CellView(
+            self._walls, self._locked, self._offset + x, self._changed
+        )
+
+    def __iter__(self) -> Iterator[CellView]:
+        for i in range(self._offset, self._offset + self._width):
+            yield CellView(self._walls, self._locked, i, self._changed)
+
+
+class CellGrid:
+    """``cells[y][x]`` view over flat, row-major wall/locked storage;
+    changed is called after every write through a view (see CellView)."""
+
+    __slots__ = ("_walls", "_locked", "_width", "_height", "_changed")
+
+    def __init__(
+        self,
+        walls: ByteStorage,
+        locked: ByteStorage,
+        width: int,
+        height: int,
+        changed: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self._walls = walls
+        self._locked = locked
+        self._width = width
+        self._height = height
+        self._changed = changed
+
+    def __len__(self) -> int:
+        return self._height
+
+    def __getitem__(self, y: int) -> CellRow:
+        if y < 0:
+            y += self._height
+        if not 0 <= y < self._height:
+            raise IndexError("row index out of range")
+        return CellRow(
+            self._walls,
+            self._locked,
+            y * self._width,
+            self._width,
+            self._changed,
+        )
+
+    def __iter__(self) -> Iterator[CellRow]:
+        for y in range(self._height):
+            yield CellRow(
+                self._walls,
+                self._locked,
+                y * self._width,
+                self._width,
+                self._changed,
+            )
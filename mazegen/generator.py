@@ -1,134 +1,226 @@
 import random
-from typing import Set, Tuple
+import time
+from array import array
+from typing import TYPE_CHECKING, List, Optional, Tuple
 
-from mazegen.direction import Direction
+from mazegen.cell import DIR_BITS, OPPOSITE_DIR_BITS
 from mazegen.maze import Maze
 
+if TYPE_CHECKING:
+    from mazegen.profiling import GenerationStats
+
+try:
+    from mazegen import vectorized
+    HAVE_NUMPY = True
+except ImportError:
+    HAVE_NUMPY = False
+
+# Direction indices in Maze.neighbors() order (N, E, S, W).  Keeping this
+# order means random.choice() sees the same candidate lists as the
+# Direction-based code did, so a seed always produces the same maze.
+_N, _E, _S, _W = range(4)
+
 
 class Genarator:
-    def __init__(self, maze: Maze):
+    # Add loops with mazegen.vectorized (same maze, a few times faster)
+    # when NumPy is installed and the rng is a stock random.Random.
+    # Subclasses that change how loops are chosen must turn this off.
+    vectorize_loops = HAVE_NUMPY
+
+    def __init__(self, maze: Maze, rng: Optional[random.Random] = None):
         self.maze = maze
+        # Every generator draws from its own random.Random (or subclass),
+        # reseeded by generate(), so generators in different threads do
+        # not disturb each other.  Random(seed) yields the same numbers as
+        # random.seed(seed), so a seed gives the same maze either way.
+        self.rng = rng if rng is not None else random.Random()
+        # Set by MazeGenerator(instrument=True); generate() fills it in.
+        self.stats: Optional["GenerationStats"] = None
+        # Per-cell scratch buffers kept between generate() calls, and the
+        # blank contents they are reset from (see _cell_buffer and
+        # _parent_buffer).
+        self._zeros = b""
+        self._buffers: List[bytearray] = []
+        self._identity: Optional["array[int]"] = None
+        self._parent: Optional["array[int]"] = None
+
+    def _cell_buffer(self, slot: int = 0) -> bytearray:
+        """A bytearray of one zero byte per cell.
+
+        The same buffer (one per slot) is zeroed and handed out again by
+        every generate(), so regenerating allocates nothing; it is only
+        valid until the next one.
+        """
+        n = self.maze.width * self.maze.height
+        if len(self._zeros) != n:
+            self._zeros = bytes(n)
+        buffers = self._buffers
+        while len(buffers) <= slot:
+            buffers.append(bytearray(n))
+        buf = buffers[slot]
+        buf[:] = self._zeros
+        return buf
+
+    def _parent_buffer(self) -> "array[int]":
+        """A union-find parent array with every cell its own root, reused
+        like _cell_buffer()."""
+        n = self.maze.width * self.maze.height
+        if self._identity is None or len(self._identity) != n:
+            self._identity = array("i", range(n))
+            self._parent = array("i", self._identity)
+            return self._parent
+        assert self._parent is not None
+        self._parent[:] = self._identity
+        return self._parent
 
     def _random_unlocked_cell(self) -> Tuple[int, int]:
-        x = random.randint(0, self.maze.width - 1)
-        y = random.randint(0, self.maze.height - 1)
-        while self.maze.cells[y][x].locked:
-            x = random.randint(0, self.maze.width - 1)
-            y = random.randint(0, self.maze.height - 1)
+        randint = self.rng.randint
+        x = randint(0, self.maze.width - 1)
+        y = randint(0, self.maze.height - 1)
+        while self.maze.is_locked(x, y):
+            x = randint(0, self.maze.width - 1)
+            y = randint(0, self.maze.height - 1)
         return (x, y)
 
-    def _would_create_wide_corridor(
-        self, x: int, y: int, d: Direction
-    ) -> bool:
-        nx, ny = x + d.dx, y + d.dy
-
-        # Normalize the carved wall to an E or S wall for consistent checking
-        if d == Direction.E:
-            carved = (x, y, Direction.E)
-        elif d == Direction.W:
-            carved = (nx, ny, Direction.E)
-        elif d == Direction.S:
-            carved = (x, y, Direction.S)
-        else:
-            carved = (nx, ny, Direction.S)
-
-        # Check all 3x3 regions that contain both (x,y) and (nx,ny)
-        tx_min = max(x, nx) - 2
-        tx_max = min(x, nx)
-        ty_min = max(y, ny) - 2
-        ty_max = min(y, ny)
-
-        for tx in range(tx_min, tx_max + 1):
-            for ty in range(ty_min, ty_max + 1):
-                if self._is_3x3_open(tx, ty, carved):
-                    return True
-        return False
-
-    def _is_3x3_open(
-        self,
-        tx: int,
-        ty: int,
-        carved: Tuple[int, int, Direction],
-    ) -> bool:
-        """Check if 3x3 region at top-left (tx,ty) would be fully open,
-        treating the carved wall as already open."""
-        # Bounds check for all 9 cells
-        for row in range(3):
-            for col in range(3):
-                if not self.maze.in_bounds(tx + col, ty + row):
-                    return False
-
-        # Check 6 east (horizontal) internal walls: cols 0-1, rows 0-2
-        for row in range(3):
-            for col in range(2):
-                px, py = tx + col, ty + row
-                if (px, py, Direction.E) == carved:
-                    continue
-                if self.maze.cells[py][px].is_closed(Direction.E):
-                    return False
-
-        # Check 6 south (vertical) internal walls: cols 0-2, rows 0-1
-        for row in range(2):
-            for col in range(3):
-                px, py = tx + col, ty + row
-                if (px, py, Direction.S) == carved:
-                    continue
-                if self.maze.cells[py][px].is_closed(Direction.S):
-                    return False
-
-        return True
-
-    def _add_loops(self, visited: Set[Tuple[int, int]]) -> None:
-        num_loops = int(len(visited) * 0.1)
-        attempts = 0
+    def _in_bounds_dirs(self, i: int) -> List[int]:
+        w = self.maze.width
+        y, x = divmod(i, w)
+        dirs = []
+        if y > 0:
+            dirs.append(_N)
+        if x < w - 1:
+            dirs.append(_E)
+        if y < self.maze.height - 1:
+            dirs.append(_S)
+        if x > 0:
+            dirs.append(_W)
+        return dirs
+
+    def _would_create_wide_corridor(self, i: int, d: int) -> bool:
+        return self.maze.would_open_3x3(i, d)
+
+    def _add_loops(self, visited: bytearray) -> Tuple[int, int, int]:
+        """Open about 10% more walls between visited cells.  Returns the
+        number of attempts, of walls opened and of walls rejected because
+        they would open a 3x3 area."""
+        if self.vectorize_loops and vectorized.can_replay(self.rng):
+            return vectorized.add_loops(self.maze, visited, self.rng)
+        w, h = self.maze.width, self.maze.height
+        walls, locked = self.maze.walls, self.maze.locked
+        offsets = (-w, 1, w, -1)
+        randint, choice = self.rng.randint, self.rng.choice
+
+        num_loops = int(visited.count(1) * 0.1)
+        attempts = opened = rejected = 0
         max_attempts = num_loops * 10
 
         while num_loops > 0 and attempts < max_attempts:
             attempts += 1
-            x = random.randint(0, self.maze.width - 1)
-            y = random.randint(0, self.maze.height - 1)
+            x = randint(0, w - 1)
+            y = randint(0, h - 1)
+            i = y * w + x
 
-            if (x, y) not in visited or self.maze.cells[y][x].locked:
+            if not visited[i] or locked[i]:
                 continue
 
-            neighbors = self.maze.neighbors(x, y)
+            neighbors = self._in_bounds_dirs(i)
             if not neighbors:
                 continue
 
-            d, nx, ny = random.choice(neighbors)
-            if (nx, ny) in visited and not self.maze.cells[ny][nx].locked:
-                if self.maze.cells[y][x].is_closed(d):
-                    if not self._would_create_wide_corridor(x, y, d):
-                        self.maze.carve(x, y, d)
+            d = choice(neighbors)
+            j = i + offsets[d]
+            if visited[j] and not locked[j]:
+                if walls[i] & DIR_BITS[d]:
+                    if self._would_create_wide_corridor(i, d):
+                        rejected += 1
+                    else:
+                        self.maze.open_wall(i, d)
                         num_loops -= 1
+                        opened += 1
+        return attempts, opened, rejected
 
     def generate(self, seed: int) -> None:
+        """Carve a spanning tree over the unlocked cells, then add loops
+        unless the maze is perfect."""
+        start = time.perf_counter()
         self.maze.reset()
 
-        random.seed(seed)
-        visited: Set[Tuple[int, int]] = set()
+        self.rng.seed(seed)
+        visited = self._carve_tree()
+        carved = time.perf_counter()
+
+        loops = (0, 0, 0)
+        if not self.maze.perfect:
+            loops = self._add_loops(visited)
+        if self.maze.validate:
+            self.maze.check_invariants()
+
+        stats = self.stats
+        if stats is not None:
+            stats.phases["carve"] = carved - start
+            stats.phases["loops"] = time.perf_counter() - carved
+            # A tree over the carved cells has one wall fewer than cells.
+            stats.counters["carves"] = max(visited.count(1) - 1, 0)
+            attempts, opened, rejected = loops
+            stats.counters["loop_attempts"] = attempts
+            stats.counters["loops"] = opened
+            stats.counters["loop_rejections"] = rejected
+
+    def _carve_tree(self) -> bytearray:
+        """Carve the maze with an iterative depth-first search and return
+        the visited map (1 per cell reached).
+
+        Cells are flat indices into ``maze.walls``.  Carving clears wall
+        bits in place, which never touches the border walls; this is safe
+        because Maze.reset() drops the 3x3 counts, so nothing needs to be
+        kept in sync until _add_loops rebuilds them.  A spanning tree never
+        has an open 2x2 area, so subclasses that override this only have to
+        produce a tree.
+        """
+        w, h = self.maze.width, self.maze.height
+        walls, locked = self.maze.walls, self.maze.locked
+        offsets = (-w, 1, w, -1)
+        visited = self._cell_buffer()
+        choice = self.rng.choice
+        on_carve = self._on_carve
 
         start_x, start_y = self._random_unlocked_cell()
-        stack = [(start_x, start_y)]
-        visited.add((start_x, start_y))
+        start = start_y * w + start_x
+        stack = [start]
+        visited[start] = 1
+        on_carve(start, stack)
 
         while stack:
-            x, y = stack[-1]
-
+            i = stack[-1]
+            y, x = divmod(i, w)
+
+            # An unvisited cell still has all four walls closed, and every
+            # cell of a 3x3 region has at least two walls inside it, so
+            # carving into an unvisited cell can never open a 3x3 area.
+            # The wide-corridor check is therefore only needed in
+            # _add_loops.
             candidates = []
-            for d, nx, ny in self.maze.neighbors(x, y):
-                isLocked = self.maze.cells[ny][nx].locked
-                if (nx, ny) not in visited and not isLocked:
-                    if not self._would_create_wide_corridor(x, y, d):
-                        candidates.append((d, nx, ny))
+            for d, ok in enumerate((y > 0, x < w - 1, y < h - 1, x > 0)):
+                if ok:
+                    j = i + offsets[d]
+                    if not visited[j] and not locked[j]:
+                        candidates.append(d)
 
             if candidates:
-                d, nx, ny = random.choice(candidates)
-                self.maze.carve(x, y, d)
-                visited.add((nx, ny))
-                stack.append((nx, ny))
+                d = choice(candidates)
+                j = i + offsets[d]
+                walls[i] &= ~DIR_BITS[d]
+                walls[j] &= ~OPPOSITE_DIR_BITS[d]
+                visited[j] = 1
+                stack.append(j)
+                on_carve(j, stack)
             else:
                 stack.pop()
 
-        if not self.maze.perfect:
-            self._add_loops(visited)
+        return visited
+
+    def _on_carve(self, i: int, stack: List[int]) -> None:
+        """Called by _carve_tree() for every cell i it reaches, starting
+        with the start cell; stack is the tree path from the start cell
+        to i (do not change it).  Does nothing; subclasses may watch the
+        carve through it, or raise to stop it."""
@@ -0,0 +1,259 @@
+"""Export mazes as PNG or PPM images.
+
+Pixels come from the grid of mazegen.raster: every wall row and column
+of the grid is ``wall`` pixels thick, every cell ``cell`` pixels, and
+each kind (wall, path, entry, exit, "42" cell) has its own color.  A
+grid row becomes a row of palette indices with one extended-slice
+assignment per pixel column of a cell, and that row is written once for
+every pixel row it covers, so no Python code runs per pixel.  (This is
+already a small part of the time next to zlib, so there is no NumPy
+variant.)
+
+PNG files are 8-bit palette images compressed with zlib; PPM (binary
+P6) files are plain RGB and need no library at all.
+"""
+
+import struct
+import zlib
+from functools import partial
+from typing import (
+    TYPE_CHECKING,
+    BinaryIO,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from mazegen.batch import MazeConfig, map_seeds, seed_path
+from mazegen.maze import Coord, Maze
+from mazegen.overlay import PathOverlay
+from mazegen.raster import K_END, K_FROZEN, K_PATH, K_SPACE, K_START, K_WALL
+from mazegen.raster import KINDS, grid_rows
+
+if TYPE_CHECKING:
+    from mazegen import MazeGenerator
+
+RGB = Tuple[int, int, int]
+
+# Default colors, by the name used in the colors argument.
+COLORS: Dict[str, RGB] = {
+    "background": (255, 255, 255),
+    "wall": (0, 0, 0),
+    "path": (40, 100, 230),
+    "entry": (30, 170, 60),
+    "exit": (220, 40, 40),
+    "locked": (0, 160, 170),
+}
+_KIND_NAMES = {
+    K_SPACE: "background",
+    K_WALL: "wall",
+    K_PATH: "path",
+    K_START: "entry",
+    K_END: "exit",
+    K_FROZEN: "locked",
+}
+FORMATS = ("png", "ppm")
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# Compressed bytes collected before an IDAT chunk is written.
+IDAT_SIZE = 1 << 20
+
+# What to draw over the maze: one path, or an overlay of any number.
+Paths = Union[List[Coord], PathOverlay]
+
+
+def image_size(maze: Maze, cell: int = 4, wall: int = 1) -> Tuple[int, int]:
+    """Width and height in pixels of the image of maze."""
+    if cell < 1 or wall < 1:
+        raise ValueError("cell and wall sizes must be at least 1 pixel")
+    return (
+        maze.width * (cell + wall) + wall,
+        maze.height * (cell + wall) + wall,
+    )
+
+
+def _palette(colors: Optional[Dict[str, RGB]]) -> List[RGB]:
+    merged = dict(COLORS)
+    if colors:
+        unknown = set(colors) - set(COLORS)
+        if unknown:
+            raise ValueError(
+                f"unknown color name(s) {sorted(unknown)}, expected some of "
+                f"{list(COLORS)}"
+            )
+        merged.update(colors)
+    return [merged[_KIND_NAMES[kind]] for kind in range(KINDS)]
+
+
+def _pixel_rows(
+    maze: Maze, paths: Optional[Paths], cell: int, wall: int
+) -> Iterator[Tuple[bytes, int]]:
+    """Rows of palette indices, each with the number of pixel rows it
+    fills."""
+    mask = None
+    if isinstance(paths, PathOverlay):
+        mask = paths.mask
+    elif paths:
+        mask = PathOverlay(maze, [paths]).mask
+    period = cell + wall
+    width = image_size(maze, cell, wall)[0]
+    for gy, kinds in enumerate(grid_rows(maze, mask)):
+        row = bytearray(width)
+        walls = kinds[0::2]
+        cells = kinds[1::2]
+        for d in range(wall):
+            row[d::period] = walls
+        for d in range(wall, period):
+            row[d::period] = cells
+        yield bytes(row), cell if gy % 2 else wall
+
+
+def _chunk(kind: bytes, data: bytes) -> bytes:
+    return (
+        struct.pack(">I", len(data))
+        + kind
+        + data
+        + struct.pack(">I", zlib.crc32(kind + data))
+    )
+
+
+def dump_png(
+    f: BinaryIO,
+    maze: Maze,
+    paths: Optional[Paths] = None,
+    cell: int = 4,
+    wall: int = 1,
+    colors: Optional[Dict[str, RGB]] = None,
+    level: int = 6,
+) -> None:
+    """Write maze as an 8-bit palette PNG to a binary stream.
+
+    Args:
+        f: Writable binary stream.
+        maze: The maze to draw.
+        paths: A path (list of cells) or a PathOverlay to draw.
+        cell: Size of a cell in pixels.
+        wall: Thickness of a wall in pixels.
+        colors: Colors replacing some of COLORS, by name.
+        level: zlib compression level, 0 (none) to 9 (smallest).
+    """
+    width, height = image_size(maze, cell, wall)
+    palette = _palette(colors)
+    f.write(PNG_SIGNATURE)
+    f.write(
+        _chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 3, 0, 0, 0))
+    )
+    f.write(_chunk(b"PLTE", b"".join(bytes(rgb) for rgb in palette)))
+    z = zlib.compressobj(level)
+    pending: List[bytes] = []
+    size = 0
+    for row, repeat in _pixel_rows(maze, paths, cell, wall):
+        # The first copy of a row unfiltered (type 0), the others as a
+        # difference with the row above (type 2, "Up"): all zeros, which
+        # compress in a fraction of the time and space.
+        same = b"\2" + bytes(len(row))
+        data = z.compress(b"\0" + row + same * (repeat - 1))
+        if data:
+            pending.append(data)
+            size += len(data)
+            if size >= IDAT_SIZE:
+                f.write(_chunk(b"IDAT", b"".join(pending)))
+                pending = []
+                size = 0
+    pending.append(z.flush())
+    f.write(_chunk(b"IDAT", b"".join(pending)))
+    f.write(_chunk(b"IEND", b""))
+
+
+def dump_ppm(
+    f: BinaryIO,
+    maze: Maze,
+    paths: Optional[Paths] = None,
+    cell: int = 4,
+    wall: int = 1,
+    colors: Optional[Dict[str, RGB]] = None,
+) -> None:
+    """Write maze as a binary (P6) PPM to a binary stream; the arguments
+    are those of dump_png()."""
+    width, height = image_size(maze, cell, wall)
+    palette = _palette(colors)
+    channels = [
+        bytes(rgb[c] for rgb in palette) + bytes(256 - KINDS)
+        for c in range(3)
+    ]
+    f.write(b"P6\n%d %d\n255\n" % (width, height))
+    rgb = bytearray(3 * width)
+    for row, repeat in _pixel_rows(maze, paths, cell, wall):
+        for c, table in enumerate(channels):
+            rgb[c::3] = row.translate(table)
+        f.write(bytes(rgb) * repeat)
+
+
+def save_image(
+    output_file: str,
+    maze: Maze,
+    paths: Optional[Paths] = None,
+    cell: int = 4,
+    wall: int = 1,
+    colors: Optional[Dict[str, RGB]] = None,
+    format: Optional[str] = None,
+) -> None:
+    """Save maze as an image, PNG or PPM depending on format or, by
+    default, on the extension of output_file.  The other arguments are
+    those of dump_png()."""
+    if format is None:
+        format = output_file.rsplit(".", 1)[-1].lower()
+    if format not in FORMATS:
+        raise ValueError(
+            f"unknown image format {format!r}, expected one of {FORMATS}"
+        )
+    with open(output_file, "wb") as f:
+        if format == "png":
+            dump_png(f, maze, paths, cell, wall, colors)
+        else:
+            dump_ppm(f, maze, paths, cell, wall, colors)
+
+
+def is_image_file(output_file: str) -> bool:
+    """Whether save_image() can infer a format from the extension."""
+    return output_file.rsplit(".", 1)[-1].lower() in FORMATS
+
+
+def _write_image(
+    output: str,
+    cell: int,
+    wall: int,
+    colors: Optional[Dict[str, RGB]],
+    show_path: bool,
+    mg: "MazeGenerator",
+    seed: int,
+) -> str:
+    mg.regenerate(seed)
+    path = seed_path(output, seed)
+    mg.save_image(path, cell, wall, colors, show_path)
+    return path
+
+
+def save_images(
+    config: MazeConfig,
+    seeds: Iterable[int],
+    output: str,
+    workers: Optional[int] = None,
+    cell: int = 4,
+    wall: int = 1,
+    colors: Optional[Dict[str, RGB]] = None,
+    show_path: bool = True,
+) -> List[str]:
+    """Generate one maze per seed, like generate_many(), and save each as
+    an image named as by mazegen.batch.seed_path (the extension of output
+    picks the format).  Workers write the files themselves.  Returns the
+    paths written.
+    """
+    if not is_image_file(output):
+        raise ValueError(f"{output}: expected a .png or .ppm file name")
+    job = partial(_write_image, output, cell, wall, colors, show_path)
+    return list(map_seeds(config, seeds, job, workers))
@@ -1,12 +1,38 @@
 import math
-from typing import List, Tuple
-from mazegen.cell import Cell
+from typing import List, Optional, Tuple
+from mazegen.cell import (
+    ALL_WALLS,
+    DIR_BITS,
+    DIR_INDEX,
+    EAST,
+    NORTH,
+    OPPOSITE_DIR_BITS,
+    SOUTH,
+    WALL_BITS,
+    WEST,
+    CellGrid,
+)
 from mazegen.direction import Direction
 
 Coord = Tuple[int, int]
 
+# 1 for each wall byte whose east (resp. south) wall is open, else 0.
+_EAST_OPEN = bytes(0 if b & EAST else 1 for b in range(256))
+_SOUTH_OPEN = bytes(0 if b & SOUTH else 1 for b in range(256))
+# 1 for each wall byte whose wall on one side is closed, else 0.
+_CLOSED = tuple(
+    bytes(1 if b & bit else 0 for b in range(256))
+    for bit in (NORTH, EAST, SOUTH, WEST)
+)
+
 
 class Maze:
+    # Debug option: check_invariants() after every generation and
+    # load_walls().  Off by default: the walls are kept consistent by
+    # construction (carve() refuses to leave the grid, fill() and reset()
+    # only close walls, open_wall() needs an existing neighbour).
+    validate = False
+
     def __init__(
         self,
         width: int,
@@ -32,23 +58,55 @@ class Maze:
         if entry == exit:
             raise ValueError("entry and exit must be different")
 
-        self.cells: List[List[Cell]] = []
-        for _ in range(height):
-            row = []
-            for _ in range(width):
-                row.append(Cell())
-            self.cells.append(row)
+        # Row-major flat storage: one wall nibble (N=1, E=2, S=4, W=8)
+        # and one locked flag per cell, indexed by y * width + x.
+        self.walls = bytearray([ALL_WALLS]) * (width * height)
+        self.locked = bytearray(width * height)
+        self.cells = CellGrid(
+            self.walls, self.locked, width, height, self._cells_changed
+        )
+        self._offsets = (-width, 1, width, -1)
+
+        # Number of open internal walls (0-12) of every 3x3 region, indexed
+        # by its top-left cell as ty * (width - 2) + tx.  A region with 11
+        # open walls is one carve away from becoming a wide corridor.  The
+        # counts are built in bulk on first use and then kept up to date by
+        # open_wall/carve/fill; None means "not built yet" (also after a
+        # write through cells, which only sets one side of a wall).
+        self._win_w = max(width - 2, 0)
+        self._win_h = max(height - 2, 0)
+        self._open_3x3: Optional[bytearray] = None
+
         self._draw_42()
-        self._enforce_borders_closed()
+        # The grid as stamped above: every wall closed, "42" locked.
+        # reset() copies it back in one slice assignment.
+        self._blank = bytes(self.walls)
 
-        if self.cells[ty][tx].locked:
+        if self.is_locked(tx, ty):
             raise ValueError("Exit cannot be on 42 sign.")
-        if self.cells[ey][ex].locked:
+        if self.is_locked(ex, ey):
             raise ValueError("Entry cannot be on 42 sign.")
 
+    @staticmethod
+    def load(path: str) -> "Maze":
+        """Read a maze file written by Writer.save (the solution line is
+        checked but dropped; see mazegen.reader.load_maze to keep it)."""
+        from mazegen.reader import load_maze
+
+        return load_maze(path)[0]
+
     def in_bounds(self, x: int, y: int) -> bool:
         return 0 <= x < self.width and 0 <= y < self.height
 
+    def index(self, x: int, y: int) -> int:
+        return y * self.width + x
+
+    def is_locked(self, x: int, y: int) -> bool:
+        return bool(self.locked[y * self.width + x])
+
+    def is_closed(self, x: int, y: int, d: Direction) -> bool:
+        return bool(self.walls[y * self.width + x] & WALL_BITS[d])
+
     def neighbors(self, x: int, y: int) -> List[Tuple[Direction, int, int]]:
         result = []
         for d in Direction:
@@ -57,72 +115,229 @@ class Maze:
                 result.append((d, nx, ny))
         return result
 
-    def _enforce_borders_closed(self) -> None:
-        for x in range(self.width):
-            self.cells[0][x].north = True
-        for x in range(self.width):
-            self.cells[self.height - 1][x].south = True
-        for y in range(self.height):
-            self.cells[y][0].west = True
-        for y in range(self.height):
-            self.cells[y][self.width - 1].east = True
+    def check_invariants(self) -> None:
+        """Check that every wall is seen the same from both of its cells,
+        that the outer walls are closed and that locked cells are closed
+        on all sides.  Raises ValueError naming the first bad cell.
+
+        One pass of bytes.translate and slice comparisons, so it is cheap
+        enough to run after each generation (see Maze.validate).
+        """
+        w, walls = self.width, self.walls
+        north, east, south, west = (walls.translate(t) for t in _CLOSED)
+        n = len(walls)
+
+        def fail(i: int, message: str) -> None:
+            raise ValueError(f"cell ({i % w}, {i // w}): {message}")
+
+        for side, cells in (
+            (north, range(w)),
+            (south, range(n - w, n)),
+            (west, range(0, n, w)),
+            (east, range(w - 1, n, w)),
+        ):
+            border = side[cells.start:cells.stop:cells.step]
+            if 0 in border:
+                fail(cells[border.index(0)], "outer wall is open")
+        for y in range(0, n, w):
+            a, b = east[y:y + w - 1], west[y + 1:y + w]
+            if a != b:
+                x = next(x for x in range(w - 1) if a[x] != b[x])
+                fail(y + x, f"east wall does not match the west wall of "
+                     f"({x + 1}, {y // w})")
+        a, b = south[:n - w], north[w:]
+        if a != b:
+            i = next(i for i in range(n - w) if a[i] != b[i])
+            fail(i, f"south wall does not match the north wall of "
+                 f"({i % w}, {i // w + 1})")
+        i = self.locked.find(1)
+        while i >= 0:
+            if walls[i] != ALL_WALLS:
+                fail(i, "locked cell is not closed")
+            i = self.locked.find(1, i + 1)
+
+    def _windows_of(self, i: int, d: int) -> Tuple[int, int, int, int]:
+        """Return the (tx0, tx1, ty0, ty1) range of 3x3 regions that have
+        the wall on side d of cell i as an internal wall."""
+        if d == 3:
+            i, d = i - 1, 1
+        elif d == 0:
+            i, d = i - self.width, 2
+        cy, cx = divmod(i, self.width)
+        if d == 1:
+            x0, y0 = cx - 1, cy - 2
+        else:
+            x0, y0 = cx - 2, cy - 1
+        return (
+            max(x0, 0),
+            min(cx, self._win_w - 1),
+            max(y0, 0),
+            min(cy, self._win_h - 1),
+        )
+
+    def open_walls_3x3(self) -> bytearray:
+        """Open internal wall count of every 3x3 region, row-major by its
+        top-left cell (ty * (width - 2) + tx)."""
+        if self._open_3x3 is None:
+            self._open_3x3 = self._count_open_3x3()
+        return self._open_3x3
+
+    def _count_open_3x3(self) -> bytearray:
+        w, ww, wh = self.width, self._win_w, self._win_h
+        if not ww or not wh:
+            return bytearray()
+        # Treat the 0/1 open-wall maps as base-256 integers: shifting right
+        # by 8 * m bits lines cell i + m up with cell i, so adding the 12
+        # shifted maps sums each region's walls in one pass (at most 12 per
+        # digit, so no carries).
+        east = int.from_bytes(self.walls.translate(_EAST_OPEN), "little")
+        south = int.from_bytes(self.walls.translate(_SOUTH_OPEN), "little")
+        total = 0
+        for m in (0, 1, w, w + 1, 2 * w, 2 * w + 1):
+            total += east >> (8 * m)
+        for m in (0, 1, 2, w, w + 1, w + 2):
+            total += south >> (8 * m)
+        flat = total.to_bytes(len(self.walls), "little")
+        return bytearray(
+            b"".join(flat[t:t + ww] for t in range(0, wh * w, w))
+        )
+
+    def _count_open(self, i: int, d: int, delta: int) -> None:
+        counts = self._open_3x3
+        if counts is None:
+            return
+        ww = self._win_w
+        x0, x1, y0, y1 = self._windows_of(i, d)
+        for ty in range(y0, y1 + 1):
+            for t in range(ty * ww + x0, ty * ww + x1 + 1):
+                counts[t] += delta
+
+    def would_open_3x3(self, i: int, d: int) -> bool:
+        """Whether opening the closed wall on side d (0-3 for N, E, S, W) of
+        cell index i would leave some 3x3 region without internal walls."""
+        counts = self.open_walls_3x3()
+        ww = self._win_w
+        x0, x1, y0, y1 = self._windows_of(i, d)
+        for ty in range(y0, y1 + 1):
+            for t in range(ty * ww + x0, ty * ww + x1 + 1):
+                if counts[t] == 11:
+                    return True
+        return False
+
+    def open_wall(self, i: int, d: int) -> None:
+        """Open the wall on side d (0-3 for N, E, S, W) of cell index i
+        without any validation; the neighbour must exist."""
+        self.walls[i] &= ~DIR_BITS[d]
+        self.walls[i + self._offsets[d]] &= ~OPPOSITE_DIR_BITS[d]
+        if self._open_3x3 is not None:
+            self._count_open(i, d, 1)
 
     def carve(self, x: int, y: int, d: Direction) -> None:
         nx, ny = x + d.dx, y + d.dy
         if not self.in_bounds(nx, ny):
             raise ValueError("cannot carve outside maze bounds")
-        if self.cells[y][x].locked or self.cells[ny][nx].locked:
+        i = y * self.width + x
+        j = ny * self.width + nx
+        if self.locked[i] or self.locked[j]:
             raise AssertionError("Cannot carve the the locked cells")
-        self.cells[y][x].set_wall(d, False)
-        self.cells[ny][nx].set_wall(Direction.opposite(d), False)
-        self._enforce_borders_closed()
+        k = DIR_INDEX[d]
+        if self.walls[i] & DIR_BITS[k]:
+            self.open_wall(i, k)
 
     def fill(self, x: int, y: int) -> None:
         if not self.in_bounds(x, y):
             return
 
-        c = self.cells[y][x]
-        c.north = c.east = c.south = c.west = True
-
+        i = y * self.width + x
         for d, nx, ny in self.neighbors(x, y):
-            self.cells[ny][nx].set_wall(Direction.opposite(d), True)
-        c.lock()
-        self._enforce_borders_closed()
+            k = DIR_INDEX[d]
+            if not self.walls[i] & DIR_BITS[k]:
+                self._count_open(i, k, -1)
+            self.walls[ny * self.width + nx] |= OPPOSITE_DIR_BITS[k]
+        self.walls[i] = ALL_WALLS
+        self.locked[i] = 1
+
+    def load_walls(self, walls: bytes) -> None:
+        """Replace the walls of every cell at once, e.g. with a saved copy
+        of a maze of the same size and 42 pattern."""
+        self.walls[:] = walls
+        self._open_3x3 = None
+        if self.validate:
+            self.check_invariants()
 
     def reset(self) -> None:
-        for row in self.cells:
-            for cell in row:
-                cell.reset()
+        """Close every wall again, keeping the "42" cells locked."""
+        self.walls[:] = self._blank
+        self._open_3x3 = None
+
+    def _cells_changed(self) -> None:
+        # A cell view was written to: rebuild the 3x3 counts when needed.
+        self._open_3x3 = None
 
     def _draw_42(self) -> None:
-        # rect 7x5
-        H = 5
-        W = 7
-        if self.width <= W + 1 or self.height <= H + 1:
+        coords = pattern_42(self.width, self.height)
+        if not coords:
             self.did_draw_42 = False
             return
-        cx = math.ceil((self.width - W) / 2)
-        cy = math.ceil((self.height - H) / 2)
-        coords: List[Coord] = [
-            (0, 0),
-            (0, 1),
-            (0, 2),
-            (1, 2),
-            (2, 2),
-            (2, 3),
-            (2, 4),
-            (4, 0),
-            (5, 0),
-            (6, 0),
-            (6, 1),
-            (6, 2),
-            (5, 2),
-            (4, 2),
-            (4, 3),
-            (4, 4),
-            (5, 4),
-            (6, 4),
-        ]
-
         for x, y in coords:
-            self.fill(x + cx, y + cy)
+            self.fill(x, y)
+
+
+def opens_3x3(walls: bytearray, w: int, h: int, i: int, d: int) -> bool:
+    """Whether the closed wall on side d (0-3 for N, E, S, W) of cell i is
+    the last closed internal wall of some 3x3 region of a w x h grid,
+    counted from walls.
+
+    Like Maze.would_open_3x3 but without the region counts, for walls
+    that are not (or not yet) a whole Maze.
+    """
+    if d == 3:
+        i, d = i - 1, 1
+    elif d == 0:
+        i, d = i - w, 2
+    y, x = divmod(i, w)
+    dx, dy = (1, 2) if d == 1 else (2, 1)
+    for ty in range(max(y - dy, 0), min(y, h - 3) + 1):
+        for tx in range(max(x - dx, 0), min(x, w - 3) + 1):
+            closed = 0
+            for t in range(ty * w + tx, (ty + 3) * w + tx, w):
+                a, b, c = walls[t], walls[t + 1], walls[t + 2]
+                closed += (a & EAST > 0) + (b & EAST > 0)
+                if t < (ty + 2) * w:
+                    closed += (a & SOUTH > 0) + (b & SOUTH > 0)
+                    closed += c & SOUTH > 0
+            if closed == 1:
+                return True
+    return False
+
+
+def pattern_42(width: int, height: int) -> List[Coord]:
+    """Cells locked by the centered "42" sign, or [] if it does not fit."""
+    # rect 7x5
+    H = 5
+    W = 7
+    if width <= W + 1 or height <= H + 1:
+        return []
+    cx = math.ceil((width - W) / 2)
+    cy = math.ceil((height - H) / 2)
+    coords: List[Coord] = [
+        (0, 0),
+        (0, 1),
+        (0, 2),
+        (1, 2),
+        (2, 2),
+        (2, 3),
+        (2, 4),
+        (4, 0),
+        (5, 0),
+        (6, 0),
+        (6, 1),
+        (6, 2),
+        (5, 2),
+        (4, 2),
+        (4, 3),
+        (4, 4),
+        (5, 4),
+        (6, 4),
+    ]
+    return [(x + cx, y + cy) for x, y in coords]
@@ -0,0 +1,75 @@
+"""Paths drawn over a maze as one byte of flags per cell.
+
+A PathOverlay marks, for each cell, whether a path goes through it and
+whether a path crosses its east or its south wall (the west and north
+walls are the east and south walls of the neighbours).  Renderers turn
+a row of these bytes into screen characters with a single
+``bytes.translate``, so drawing a row costs the same however many paths
+the overlay holds: adding a path only ORs more bits into the same mask.
+"""
+
+from typing import Iterable, List
+
+from mazegen.maze import Coord, Maze
+
+# Flags of one cell of PathOverlay.mask.
+ON_PATH = 1
+CROSS_EAST = 2
+CROSS_SOUTH = 4
+
+
+class PathOverlay:
+    """Cells and wall crossings of one or more paths of a maze.
+
+    Args:
+        maze: The maze the paths belong to (only its size is used).
+        paths: Paths to add, each a list of adjacent (x, y) cells.
+    """
+
+    def __init__(self, maze: Maze, paths: Iterable[List[Coord]] = ()) -> None:
+        self.width = maze.width
+        self.height = maze.height
+        self.mask = bytearray(maze.width * maze.height)
+        self.paths = 0
+        for path in paths:
+            self.add(path)
+
+    def add(self, path: List[Coord]) -> None:
+        """Mark the cells of path and the walls between consecutive ones.
+
+        Consecutive cells that are not neighbours only mark the cells.
+        """
+        w = self.width
+        mask = self.mask
+        cells = [y * w + x for x, y in path]
+        for i in cells:
+            mask[i] |= ON_PATH
+        for a, b in zip(cells, cells[1:]):
+            if a > b:
+                a, b = b, a
+            if b - a == w:
+                mask[a] |= CROSS_SOUTH
+            elif b - a == 1 and b % w:
+                mask[a] |= CROSS_EAST
+        self.paths += 1
+
+    def clear(self) -> None:
+        """Remove all paths."""
+        self.mask[:] = bytes(len(self.mask))
+        self.paths = 0
+
+    def __contains__(self, cell: Coord) -> bool:
+        x, y = cell
+        return bool(self.mask[y * self.width + x] & ON_PATH)
+
+    def crosses(self, a: Coord, b: Coord) -> bool:
+        """Whether a path steps between the neighbouring cells a and b."""
+        i = a[1] * self.width + a[0]
+        j = b[1] * self.width + b[0]
+        if i > j:
+            i, j = j, i
+        if j - i == self.width:
+            return bool(self.mask[i] & CROSS_SOUTH)
+        if j - i == 1 and j % self.width:
+            return bool(self.mask[i] & CROSS_EAST)
+        return False
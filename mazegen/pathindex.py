@@ -0,0 +1,176 @@
+"""Constant-time distance queries between any two cells of a perfect maze.
+
+A perfect maze is a tree, so the path between two cells goes through
+their lowest common ancestor (LCA) and
+
+    distance(a, b) = depth[a] + depth[b] - 2 * depth[lca(a, b)]
+
+PathIndex roots the tree at the entry and numbers the cells in DFS
+preorder.  For two cells u, v with ``tin[u] < tin[v]``, the LCA is the
+parent with the smallest preorder number among the cells at preorder
+positions ``tin[u] + 1 .. tin[v]``, which turns LCA into a range-minimum
+query over one flat array.  That array is cut into BLOCK-sized blocks: a
+sparse table over the block minimums answers the whole blocks and running
+minimums inside each block answer the two partial ends, so every query is
+a handful of lookups.  This keeps the tables at about 3n + n / BLOCK *
+log(n) entries instead of the n * log(n) of a plain sparse table.
+"""
+
+from array import array
+from itertools import accumulate
+from typing import List
+
+from mazegen.cell import OPEN_DIRS
+from mazegen.maze import Coord, Maze
+
+# Cells per block of the range-minimum structure.
+BLOCK = 16
+
+
+class PathIndex:
+    """Distance and path queries over a perfect maze, built once.
+
+    The index describes the maze as it was when built; build a new one
+    after the maze changes (MazeGenerator.path_index does this for you).
+    Locked cells are not part of the tree: distance() returns -1 and
+    path() returns [] for them.
+    """
+
+    def __init__(self, maze: Maze) -> None:
+        if not maze.perfect:
+            raise ValueError("PathIndex needs a perfect maze")
+        self.maze = maze
+        n = maze.width * maze.height
+        walls = maze.walls
+        off = (-maze.width, 1, maze.width, -1)
+
+        # Iterative DFS from the entry: preorder number (tin), parent and
+        # depth of every cell, plus the cell at every preorder position.
+        tin = array("i", [-1]) * n
+        parent = array("i", [-1]) * n
+        depth = array("i", [0]) * n
+        order = array("i")
+        root = maze.entry[1] * maze.width + maze.entry[0]
+        stack = [root]
+        while stack:
+            i = stack.pop()
+            tin[i] = len(order)
+            order.append(i)
+            if len(order) > n:
+                raise ValueError("maze is not a tree")
+            p = parent[i]
+            d = depth[i] + 1
+            for k in OPEN_DIRS[walls[i]]:
+                j = i + off[k]
+                if j != p:
+                    parent[j] = i
+                    depth[j] = d
+                    stack.append(j)
+
+        # keys[pos]: preorder number of the parent of the cell at pos.
+        keys = array("i", [0]) * len(order)
+        for pos in range(1, len(order)):
+            keys[pos] = tin[parent[order[pos]]]
+
+        # Per block: minimum of the whole block, and running minimums from
+        # its start (prefix) and up to its end (suffix).
+        blocks = array("i")
+        prefix = array("i")
+        suffix = array("i")
+        for start in range(0, len(keys), BLOCK):
+            chunk = keys[start:start + BLOCK]
+            prefix.extend(accumulate(chunk, min))
+            tail = list(accumulate(reversed(chunk), min))
+            suffix.extend(reversed(tail))
+            blocks.append(tail[-1])
+
+        table = [blocks]
+        h = 1
+        while 2 * h <= len(blocks):
+            prev = table[-1]
+            table.append(array("i", map(min, prev[:-h], prev[h:])))
+            h *= 2
+
+        self._tin = tin
+        self._parent = parent
+        self._depth = depth
+        self._order = order
+        self._keys = keys
+        self._prefix = prefix
+        self._suffix = suffix
+        self._table = table
+
+    def __len__(self) -> int:
+        """Number of cells reachable from the entry."""
+        return len(self._order)
+
+    def _cell(self, c: Coord) -> int:
+        return c[1] * self.maze.width + c[0]
+
+    def _lca_pos(self, a: int, b: int) -> int:
+        """Preorder number of the LCA of the cells at preorder positions
+        a < b: the minimum of keys[a + 1:b + 1]."""
+        lo = a + 1
+        first, last = lo // BLOCK, b // BLOCK
+        if first == last:
+            return min(self._keys[lo:b + 1])
+        best = min(self._suffix[lo], self._prefix[b])
+        if last - first > 1:
+            k = (last - first - 1).bit_length() - 1
+            level = self._table[k]
+            best = min(best, level[first + 1], level[last - (1 << k)])
+        return best
+
+    def lca(self, a: Coord, b: Coord) -> Coord:
+        """Lowest common ancestor of a and b, with the tree rooted at the
+        entry; raises ValueError for cells outside the tree."""
+        ia, ib = self._cell(a), self._cell(b)
+        ta, tb = self._tin[ia], self._tin[ib]
+        if ta < 0 or tb < 0:
+            raise ValueError("cell is not reachable from the entry")
+        if ta == tb:
+            return a
+        i = self._order[self._lca_pos(min(ta, tb), max(ta, tb))]
+        w = self.maze.width
+        return (i % w, i // w)
+
+    def distance(self, a: Coord, b: Coord) -> int:
+        """Number of steps between a and b, or -1 if either is locked."""
+        w = self.maze.width
+        tin, depth = self._tin, self._depth
+        ia = a[1] * w + a[0]
+        ib = b[1] * w + b[0]
+        ta, tb = tin[ia], tin[ib]
+        if ta < 0 or tb < 0:
+            return -1
+        if ta == tb:
+            return 0
+        if ta > tb:
+            ta, tb = tb, ta
+        top = depth[self._order[self._lca_pos(ta, tb)]]
+        return depth[ia] + depth[ib] - 2 * top
+
+    def path(self, a: Coord, b: Coord) -> List[Coord]:
+        """The path from a to b as (x, y) coordinates, or [] if either is
+        locked.  Takes time proportional to the path length."""
+        ia, ib = self._cell(a), self._cell(b)
+        parent, depth = self._parent, self._depth
+        if self._tin[ia] < 0 or self._tin[ib] < 0:
+            return []
+        up: List[int] = []
+        down: List[int] = []
+        while depth[ia] > depth[ib]:
+            up.append(ia)
+            ia = parent[ia]
+        while depth[ib] > depth[ia]:
+            down.append(ib)
+            ib = parent[ib]
+        while ia != ib:
+            up.append(ia)
+            down.append(ib)
+            ia = parent[ia]
+            ib = parent[ib]
+        up.append(ia)
+        up.extend(reversed(down))
+        w = self.maze.width
+        return [(i % w, i // w) for i in up]
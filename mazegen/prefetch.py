@@ -0,0 +1,181 @@
+"""Generate the next seeds of a MazeGenerator in the background.
+
+A Prefetcher runs a second MazeGenerator with the same parameters in a
+daemon thread.  It generates, solves and serializes seed, seed + 1, ...
+ahead of time and queues the results, at most ``depth`` of them and no
+more than ``max_bytes`` in all (at least one).  MazeGenerator.prefetch()
+starts one; regenerate() then swaps in the queued maze of the next seed
+instead of generating it, and save_async() writes its ready text.
+
+The thread has its own generator and random.Random, so it never touches
+the foreground maze.  A regenerate() to any other seed drops the queue
+and restarts it after that seed.
+"""
+
+import threading
+from array import array
+from collections import deque
+from dataclasses import dataclass
+from io import StringIO
+from typing import TYPE_CHECKING, Callable, Deque, Optional
+
+from mazegen.profiling import GenerationStats
+
+if TYPE_CHECKING:
+    from mazegen import MazeGenerator
+
+# Default bound on the memory held by queued mazes.
+DEFAULT_MAX_BYTES = 256 * 2**20
+
+
+@dataclass
+class Prepared:
+    """One maze generated ahead: its walls, its solution as cell indices
+    (y * width + x), its save() text and, if instrumented, its stats."""
+
+    seed: int
+    walls: bytes
+    path: "array[int]"
+    text: str
+    stats: Optional[GenerationStats]
+
+    @property
+    def size(self) -> int:
+        """Bytes held, roughly."""
+        return (
+            len(self.walls)
+            + self.path.itemsize * len(self.path)
+            + len(self.text)
+        )
+
+
+def prepare(mg: "MazeGenerator") -> Prepared:
+    """Snapshot the current maze of mg."""
+    w = mg.maze.width
+    buf = StringIO()
+    mg.dump(buf)
+    return Prepared(
+        mg.seed,
+        bytes(mg.maze.walls),
+        array("i", [y * w + x for x, y in mg.solution]),
+        buf.getvalue(),
+        mg.stats,
+    )
+
+
+class Prefetcher:
+    """Background queue of the mazes of seed, seed + 1, ...
+
+    Args:
+        make: Builds the background MazeGenerator for a seed (which
+            generates that seed); called once, in the thread.
+        seed: First seed to prepare.
+        depth: Most mazes queued at once.
+        max_bytes: Most bytes queued at once; one maze is queued even if
+            it is larger.
+    """
+
+    def __init__(
+        self,
+        make: Callable[[int], "MazeGenerator"],
+        seed: int,
+        depth: int = 2,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        if depth < 1:
+            raise ValueError("depth must be >= 1")
+        self.depth = depth
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._make = make
+        self._next = seed
+        # Bumped by every restart; results of an older one are dropped.
+        self._generation = 0
+        self._queue: Deque[Prepared] = deque()
+        self._held = 0
+        self._error: Optional[BaseException] = None
+        self._stopped = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(
+            target=self._run, name="mazegen-prefetch", daemon=True
+        )
+        self._thread.start()
+
+    def _full(self) -> bool:
+        queue = self._queue
+        if len(queue) >= self.depth:
+            return True
+        # Room for one more of about the size of the last one?
+        return bool(queue) and self._held + queue[-1].size > self.max_bytes
+
+    def _run(self) -> None:
+        mg: Optional["MazeGenerator"] = None
+        cond = self._cond
+        while True:
+            with cond:
+                while not self._stopped and self._full():
+                    cond.wait()
+                if self._stopped:
+                    return
+                seed, generation = self._next, self._generation
+            try:
+                if mg is None:
+                    mg = self._make(seed)
+                else:
+                    mg.regenerate(seed)
+                ready = prepare(mg)
+            except BaseException as e:
+                with cond:
+                    self._error = e
+                    cond.notify_all()
+                return
+            with cond:
+                if generation == self._generation:
+                    self._queue.append(ready)
+                    self._held += ready.size
+                    self._next = seed + 1
+                    cond.notify_all()
+
+    def take(self, seed: int) -> Optional[Prepared]:
+        """The maze of seed if it is queued or being prepared (waiting for
+        it then), else None after restarting the queue at seed + 1 for
+        the caller to generate seed itself."""
+        cond = self._cond
+        with cond:
+            while True:
+                if self._error is not None:
+                    raise self._error
+                queue = self._queue
+                if queue and queue[0].seed == seed:
+                    ready = queue.popleft()
+                    self._held -= ready.size
+                    self.hits += 1
+                    cond.notify_all()
+                    return ready
+                if not queue and self._next == seed and not self._stopped:
+                    cond.wait()
+                    continue
+                queue.clear()
+                self._held = 0
+                self._generation += 1
+                self._next = seed + 1
+                self.misses += 1
+                cond.notify_all()
+                return None
+
+    @property
+    def queued(self) -> int:
+        """Mazes ready to be taken."""
+        with self._cond:
+            return len(self._queue)
+
+    def close(self) -> None:
+        """Stop the thread (after the maze it is preparing, if any) and
+        drop the queue."""
+        with self._cond:
+            self._stopped = True
+            self._queue.clear()
+            self._held = 0
+            self._cond.notify_all()
+        self._thread.join()
@@ -0,0 +1,81 @@
+"""Timings and counters of one maze generation, for MazeGenerator(
+instrument=True).
+
+Nothing here runs unless instrumentation is on: the generator and solver
+only keep a few numbers they get for free (attempt counts, the epoch
+stamps of the last search), and the counters are derived from them after
+the fact, so the hot loops are the same with or without it.
+"""
+
+import cProfile
+import json
+import pstats
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List
+
+# Functions listed from a cProfile run, by cumulative time.
+PROFILE_LIMIT = 25
+
+
+@dataclass
+class GenerationStats:
+    """What one generate()/regenerate() of a MazeGenerator did.
+
+    Attributes:
+        seed, algorithm, width, height, perfect: The maze generated.
+        cached: Whether the maze came from the MazeCache.
+        prefetched: Whether it was generated ahead by
+            MazeGenerator.prefetch(); the rest describes that run.
+        elapsed: Wall time of the whole build in seconds.
+        phases: Seconds per phase: "carve" (the spanning tree), "loops"
+            (imperfect mazes), "solve", and "cache" (lookup and store).
+        counters: "carves" (tree walls opened), "loop_attempts",
+            "loops" (walls opened by them), "loop_rejections" (walls
+            left closed because they would open a 3x3 area) and
+            "solver_expanded" (cells the solver expanded).
+        profile: With profile=True, the PROFILE_LIMIT functions with the
+            most cumulative time, as dicts of function, calls, tottime
+            and cumtime.
+    """
+
+    seed: int
+    algorithm: str
+    width: int
+    height: int
+    perfect: bool
+    cached: bool = False
+    prefetched: bool = False
+    elapsed: float = 0.0
+    phases: Dict[str, float] = field(default_factory=dict)
+    counters: Dict[str, int] = field(default_factory=dict)
+    profile: List[Dict[str, Any]] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    def to_json(self, indent: Any = None) -> str:
+        return json.dumps(self.to_dict(), indent=indent)
+
+
+def profile_rows(
+    profiler: cProfile.Profile, limit: int = PROFILE_LIMIT
+) -> List[Dict[str, Any]]:
+    """The limit functions of a finished profile with the most cumulative
+    time."""
+    stats = pstats.Stats(profiler)
+    rows = []
+    # Stats.stats maps (file, line, name) to (primitive calls, calls,
+    # tottime, cumtime, callers).
+    entries = stats.stats.items()  # type: ignore[attr-defined]
+    for (filename, line, name), (_, calls, tottime, cumtime, _) in sorted(
+        entries, key=lambda item: -item[1][3]
+    )[:limit]:
+        rows.append(
+            {
+                "function": f"{filename}:{line}({name})",
+                "calls": calls,
+                "tottime": tottime,
+                "cumtime": cumtime,
+            }
+        )
+    return rows
@@ -0,0 +1,120 @@
+"""The maze as a grid of kinds, the common ground of all renderers.
+
+A maze of width x height cells is drawn on a (2 * width + 1) x
+(2 * height + 1) grid: odd rows and columns are cells, even ones are
+the walls between them and the corners where walls meet.  grid_rows()
+yields that grid one row of kind bytes (K_SPACE, K_WALL, ...) at a time,
+or any window of it, built with ``bytes.translate`` and extended-slice
+assignments from the cells under the window only.  Renderers then map
+kinds to characters, pixels or colors with one more translate.
+"""
+
+from typing import Iterator, Optional, Tuple, Union
+
+from mazegen.cell import EAST, SOUTH, WEST
+from mazegen.maze import Maze
+from mazegen.overlay import CROSS_EAST, CROSS_SOUTH, ON_PATH
+
+# What each position of the grid shows.
+K_SPACE, K_WALL, K_PATH, K_START, K_END, K_FROZEN = range(6)
+KINDS = 6
+
+# bytes.translate() tables from wall nibbles to kinds.
+_EAST_WALL = bytes(K_WALL if b & EAST else K_SPACE for b in range(256))
+_SOUTH_WALL = bytes(K_WALL if b & SOUTH else K_SPACE for b in range(256))
+_LOCKED = bytes([K_SPACE, K_FROZEN]) + bytes(254)
+
+# PathOverlay flags -> kinds of a cell and of the gaps east and south.
+_PATH_CELL = bytes(K_PATH if b & ON_PATH else 0 for b in range(256))
+_PATH_GAP_EAST = bytes(K_PATH if b & CROSS_EAST else 0 for b in range(256))
+_PATH_GAP_SOUTH = bytes(K_PATH if b & CROSS_SOUTH else 0 for b in range(256))
+# 0xFF where a kind is K_SPACE, else 0: paths are only drawn over spaces,
+# never over walls or locked cells (K_FROZEN | K_PATH is no kind).
+_SPACE = bytes([0xFF]) + bytes(255)
+
+Row = Union[bytes, bytearray]
+
+
+def _or(*rows: Row) -> bytes:
+    """Bytewise OR of equally long rows."""
+    acc = 0
+    for row in rows:
+        acc |= int.from_bytes(row, "little")
+    return acc.to_bytes(len(rows[0]), "little")
+
+
+def _add_path(line: bytearray, path: bytearray) -> None:
+    """Mark the K_SPACE positions of line that path marks K_PATH."""
+    keep = int.from_bytes(line.translate(_SPACE), "little")
+    acc = int.from_bytes(line, "little")
+    acc |= int.from_bytes(path, "little") & keep
+    line[:] = acc.to_bytes(len(line), "little")
+
+
+def grid_size(maze: Maze) -> Tuple[int, int]:
+    """Columns and rows of the grid of maze."""
+    return 2 * maze.width + 1, 2 * maze.height + 1
+
+
+def grid_rows(
+    maze: Maze,
+    mask: Optional[Row] = None,
+    x0: int = 0,
+    y0: int = 0,
+    x1: Optional[int] = None,
+    y1: Optional[int] = None,
+) -> Iterator[bytes]:
+    """Kind rows y0 to y1 - 1 of the grid, columns x0 to x1 - 1 (default:
+    the whole grid).
+
+    Args:
+        maze: The maze to draw.
+        mask: A PathOverlay.mask whose paths are drawn as K_PATH over
+            open cells and gaps (the entry and exit keep K_START and
+            K_END; walls and locked cells keep their kind).
+    """
+    w = maze.width
+    if x1 is None:
+        x1 = 2 * w + 1
+    if y1 is None:
+        y1 = 2 * maze.height + 1
+    # Cells a to b - 1 give grid columns 2 * a to 2 * b; column 2 * a
+    # is only right for a == 0 but is then never shown.
+    a = max(0, x0 // 2 - 1)
+    b = min(w, x1 // 2 + 1)
+    lo, hi = x0 - 2 * a, x1 - 2 * a
+    ends = ((maze.entry, K_START), (maze.exit, K_END))
+    for gy in range(y0, y1):
+        if gy == 0:
+            yield bytes([K_WALL]) * (hi - lo)
+            continue
+        y, under = divmod(gy - 1, 2)
+        walls = maze.walls[y * w + a:y * w + b]
+        east = walls.translate(_EAST_WALL)
+        line = bytearray(2 * (b - a) + 1)
+        path = bytearray(len(line))
+        if not under:
+            line[0] = K_WALL if walls[0] & WEST else K_SPACE
+            line[1::2] = maze.locked[y * w + a:y * w + b].translate(_LOCKED)
+            line[2::2] = east
+            if mask is not None:
+                cells = mask[y * w + a:y * w + b]
+                path[1::2] = cells.translate(_PATH_CELL)
+                path[2::2] = cells.translate(_PATH_GAP_EAST)
+                _add_path(line, path)
+            for (x, ey), kind in ends:
+                if ey == y and a <= x < b:
+                    line[2 * (x - a) + 1] = kind
+        else:
+            south = walls.translate(_SOUTH_WALL)
+            after = maze.walls[y * w + b] if b < w else 0
+            line[0] = K_WALL if walls[0] & (SOUTH | WEST) else K_SPACE
+            line[1::2] = south
+            line[2::2] = _or(
+                south, east, south[1:] + bytes([_SOUTH_WALL[after]])
+            )
+            if mask is not None:
+                cells = mask[y * w + a:y * w + b]
+                path[1::2] = cells.translate(_PATH_GAP_SOUTH)
+                _add_path(line, path)
+        yield bytes(line[lo:hi])
@@ -0,0 +1,220 @@
+"""Read mazes back from the hex text format written by Writer.
+
+Each row is checked as a whole: ``int(row, 16)`` turns it into one big
+integer whose every hex digit is a cell, so comparing a cell's east wall
+with its neighbour's west wall, or a row's south walls with the north
+walls of the next row, is a mask, a shift and a comparison.
+``bytes.translate`` gives the wall nibbles.  read_rows() yields rows as
+it checks them, so files larger than memory can be processed row by
+row; load_maze() builds a Maze from a whole file.
+"""
+
+import zlib
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+
+from mazegen.cell import ALL_WALLS, DIR_BITS, EAST, SOUTH, WEST
+from mazegen.maze import Coord, Maze, pattern_42
+
+# Wall nibble of each hex digit character (upper or lower case).
+HEX_VALUES = bytes(
+    int(chr(c), 16) if chr(c) in "0123456789abcdefABCDEF" else 0
+    for c in range(256)
+)
+_HEX_CHARS = b"0123456789abcdefABCDEF"
+_MOVES = {"N": 0, "E": 1, "S": 2, "W": 3}
+
+# Number of open walls among the east and south ones of each hex digit.
+_OPEN_EAST_SOUTH = bytes(
+    (not HEX_VALUES[c] & EAST) + (not HEX_VALUES[c] & SOUTH)
+    if c in _HEX_CHARS
+    else 0
+    for c in range(256)
+)
+# Bytes of at most 2 that zlib.adler32 can sum exactly: its low half is
+# 1 + sum(data) modulo 65521.
+_SUM_CHUNK = 32759
+
+
+def _small_byte_sum(data: bytes) -> int:
+    """Sum of data, whose bytes are all 0, 1 or 2, computed in C."""
+    total = 0
+    for i in range(0, len(data), _SUM_CHUNK):
+        total += (zlib.adler32(data[i:i + _SUM_CHUNK]) & 0xFFFF) - 1
+    return total
+
+
+class _RowChecker:
+    """Wall-consistency checks for the rows of one grid width.
+
+    A row is an integer with cell x in the hex digit at bit offset
+    4 * (width - 1 - x), so the west wall of cell x + 1 sits two bits
+    below the east wall of cell x, and the north walls of one row two bits
+    below the south walls of the row above.
+    """
+
+    def __init__(self, width: int) -> None:
+        self.width = width
+        self.north = int("1" * width, 16)
+        self.east = int("2" * width, 16)
+        self.south = int("4" * width, 16)
+        self.west = int("8" * width, 16)
+        self.inner_east = self.east >> 4 << 4
+        self.inner_west = self.west >> 4
+        self.border = EAST | WEST << 4 * (width - 1)
+
+    def _x(self, a: int, b: int) -> int:
+        """Column of the first cell where rows a and b differ."""
+        return self.width - 1 - ((a ^ b).bit_length() - 1) // 4
+
+    def check(self, value: int, above: Optional[int], y: int) -> None:
+        if value & self.border != self.border:
+            x = self._x(value & self.border, self.border)
+            raise ValueError(f"cell ({x}, {y}): outer wall is open")
+        east = (value & self.inner_east) >> 2
+        west = value & self.inner_west
+        if east != west:
+            x = self._x(east, west) - 1
+            raise ValueError(
+                f"cell ({x}, {y}): east wall does not match the west wall "
+                f"of ({x + 1}, {y})"
+            )
+        north = value & self.north
+        if above is None:
+            if north != self.north:
+                x = self._x(north, self.north)
+                raise ValueError(f"cell ({x}, {y}): outer wall is open")
+            return
+        south = (above & self.south) >> 2
+        if south != north:
+            x = self._x(south, north)
+            raise ValueError(
+                f"cell ({x}, {y}): north wall does not match the south "
+                f"wall of ({x}, {y - 1})"
+            )
+
+    def check_bottom(self, value: int, y: int) -> None:
+        south = value & self.south
+        if south != self.south:
+            x = self._x(south, self.south)
+            raise ValueError(f"cell ({x}, {y}): outer wall is open")
+
+
+def _rows(lines: Iterator[bytes]) -> Iterator[bytes]:
+    """Check and yield the hex lines of the grid, up to the empty line."""
+    checker: Optional[_RowChecker] = None
+    above: Optional[int] = None
+    y = 0
+    for line in lines:
+        line = line.rstrip(b"\r\n")
+        if not line:
+            break
+        if line.translate(None, _HEX_CHARS):
+            raise ValueError(f"line {y + 1}: not a row of hex digits")
+        if checker is None:
+            checker = _RowChecker(len(line))
+        elif len(line) != checker.width:
+            raise ValueError(
+                f"line {y + 1}: {len(line)} cells, expected {checker.width}"
+            )
+        value = int(line, 16)
+        checker.check(value, above, y)
+        yield line
+        above = value
+        y += 1
+    if checker is None or above is None:
+        raise ValueError("no maze rows found")
+    checker.check_bottom(above, y - 1)
+
+
+def read_rows(f: BinaryIO) -> Iterator[bytearray]:
+    """Yield each row of the hex grid of an open binary file as a
+    bytearray of wall nibbles, checking it against the row above.
+
+    Stops after the empty line that ends the grid, leaving f at the
+    entry line for read_footer().  Raises ValueError on malformed or
+    inconsistent rows.
+    """
+    for line in _rows(f):
+        yield bytearray(line.translate(HEX_VALUES))
+
+
+def _read_coord(lines: Iterator[bytes], what: str) -> Coord:
+    parts = next(lines, b"").split()
+    try:
+        x, y = (int(p) for p in parts)
+    except ValueError:
+        raise ValueError(f"{what}: expected two integers 'x y'") from None
+    return (x, y)
+
+
+def read_footer(f: BinaryIO) -> Tuple[Coord, Coord, str]:
+    """Entry, exit and N/E/S/W path string that follow the grid."""
+    return _footer(f)
+
+
+def _footer(lines: Iterator[bytes]) -> Tuple[Coord, Coord, str]:
+    entry = _read_coord(lines, "entry")
+    exit = _read_coord(lines, "exit")
+    path = next(lines, b"").strip().decode("ascii", "replace")
+    if path.strip("NESW"):
+        raise ValueError("path: only N, E, S and W are allowed")
+    return entry, exit, path
+
+
+def decode_path(
+    maze: Maze, directions: str, start: Optional[Coord] = None
+) -> List[Coord]:
+    """Coordinates visited by following directions from start (default:
+    the entry); raises ValueError if a step goes through a wall."""
+    if start is None:
+        start = maze.entry
+    w = maze.width
+    walls = maze.walls
+    offsets = (-w, 1, w, -1)
+    i = start[1] * w + start[0]
+    cells = [i]
+    for step, c in enumerate(directions):
+        d = _MOVES[c]
+        if walls[i] & DIR_BITS[d]:
+            raise ValueError(
+                f"path step {step + 1} ({c}) from {(i % w, i // w)} "
+                f"goes through a wall"
+            )
+        i += offsets[d]
+        cells.append(i)
+    return [(i % w, i // w) for i in cells]
+
+
+def load_maze(path: str) -> Tuple[Maze, List[Coord]]:
+    """Read a file written by Writer.save into a Maze and its solution.
+
+    The maze counts as perfect when its passages form a tree, i.e. there
+    are exactly (unlocked cells - 1) of them.  The solution must lead
+    from the entry to the exit; an empty path line gives [].
+    """
+    with open(path, "rb") as f:
+        lines = iter(f.read().split(b"\n"))
+    rows = []
+    passages = 0
+    for line in _rows(lines):
+        rows.append(line)
+        passages += _small_byte_sum(line.translate(_OPEN_EAST_SOUTH))
+    entry, exit, directions = _footer(lines)
+    del lines
+
+    width, height = len(rows[0]), len(rows)
+    maze = Maze(width, height, entry, exit)
+    maze.walls[:] = b"".join(rows).translate(HEX_VALUES)
+    del rows
+    locked = pattern_42(width, height)
+    for x, y in locked:
+        if maze.walls[y * width + x] != ALL_WALLS:
+            raise ValueError(f"cell ({x}, {y}) of the 42 sign is not closed")
+    maze.perfect = passages == width * height - len(locked) - 1
+
+    if not directions:
+        return maze, []
+    solution = decode_path(maze, directions)
+    if solution[-1] != exit:
+        raise ValueError(f"path ends at {solution[-1]}, not at exit {exit}")
+    return maze, solution
@@ -0,0 +1,362 @@
+"""Search seeds for mazes that meet difficulty targets.
+
+find_seeds(config, criteria, count) scores candidate seeds in worker
+processes and returns the first ``count`` seeds, in the order they were
+given, whose maze meets the Criteria: a solution length range, a minimum
+number of dead ends and a minimum share of junctions.  Each maze is the
+one MazeGenerator builds for that configuration and seed.
+
+With the "dfs" algorithm the solution length is known during carving:
+the entry-to-exit path of the spanning tree is fixed as soon as both
+cells are carved, and it is the solution of a perfect maze (loops can
+only make it shorter).  A seed whose tree path is already too short (or,
+in a perfect maze, too long) is rejected there, before the rest of the
+maze is carved, looped and solved.
+
+Scores are kept in a ScoreCache per configuration and seed, so searching
+the same seeds again, even with other criteria, only scores the seeds
+that were rejected early under criteria that no longer reject them.
+"""
+
+import math
+import os
+import random
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from itertools import islice
+from typing import Iterable, List, Optional, Tuple
+
+from mazegen.batch import MazeConfig, Params, config_params
+from mazegen.algorithms import get_algorithm
+from mazegen.generator import Genarator
+from mazegen.maze import Maze
+from mazegen.solver import Solver
+
+# Candidate seeds of find_seeds() by default.
+MAX_TRIES = 100_000
+# Scores kept by a ScoreCache by default.
+MAX_SCORES = 100_000
+# Seeds per worker scored in one round; a round is scored as a whole, so
+# a search stops at most one round after it found enough seeds.
+ROUND_PER_WORKER = 32
+
+# 1 for each wall byte of a dead end (one open side) or of a junction
+# (three or four), else 0.  Locked cells have no open side.
+_DEAD_END = bytes(1 if bin(b & 15).count("1") == 3 else 0 for b in range(256))
+_JUNCTION = bytes(1 if bin(b & 15).count("1") <= 1 else 0 for b in range(256))
+
+
+@dataclass(frozen=True)
+class Score:
+    """What a seed's maze was measured to be.
+
+    length is the number of moves of the solution.  An incomplete score
+    comes from a seed rejected while carving: length is then the
+    entry-to-exit path of the spanning tree (the solution of a perfect
+    maze, at least as long as that of an imperfect one) and the counts
+    are 0.
+    """
+
+    seed: int
+    length: int
+    dead_ends: int = 0
+    junctions: int = 0
+    cells: int = 0
+    complete: bool = True
+
+    @property
+    def branching(self) -> float:
+        """Junctions per unlocked cell."""
+        return self.junctions / self.cells if self.cells else 0.0
+
+
+@dataclass(frozen=True)
+class Criteria:
+    """Difficulty targets of find_seeds().
+
+    Args:
+        min_length: Fewest moves of the solution.
+        max_length: Most moves of the solution (None: no bound).
+        min_dead_ends: Fewest dead ends.
+        min_branching: Smallest share of unlocked cells that are
+            junctions (three or four open sides).
+    """
+
+    min_length: int = 0
+    max_length: Optional[int] = None
+    min_dead_ends: int = 0
+    min_branching: float = 0.0
+
+    def too_short(self, length: int) -> bool:
+        return length < self.min_length
+
+    def too_long(self, length: int) -> bool:
+        return self.max_length is not None and length > self.max_length
+
+    def accepts(self, score: Score, perfect: bool) -> Optional[bool]:
+        """Whether the maze of score meets the targets; None if score is
+        incomplete and not enough to tell."""
+        if not score.complete:
+            if self.too_short(score.length) or (
+                perfect and self.too_long(score.length)
+            ):
+                return False
+            return None
+        return (
+            not self.too_short(score.length)
+            and not self.too_long(score.length)
+            and score.dead_ends >= self.min_dead_ends
+            and score.branching >= self.min_branching
+        )
+
+
+class ScoreCache:
+    """Scores by configuration and seed, least recently used dropped
+    beyond max_entries.  One is shared by all find_seeds() calls that are
+    not given their own."""
+
+    def __init__(self, max_entries: int = MAX_SCORES) -> None:
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._scores: "OrderedDict[Tuple[Params, int], Score]" = (
+            OrderedDict()
+        )
+
+    def get(self, params: Params, seed: int) -> Optional[Score]:
+        score = self._scores.get((params, seed))
+        if score is None:
+            self.misses += 1
+            return None
+        self._scores.move_to_end((params, seed))
+        self.hits += 1
+        return score
+
+    def put(self, params: Params, score: Score) -> None:
+        scores = self._scores
+        scores[(params, score.seed)] = score
+        scores.move_to_end((params, score.seed))
+        while len(scores) > self.max_entries:
+            scores.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def clear(self) -> None:
+        self._scores.clear()
+
+
+_shared_cache = ScoreCache()
+
+
+@dataclass
+class SearchResult:
+    """Seeds found by find_seeds(), with their scores (in the same
+    order), and how the search went: seeds tried, scored by a worker,
+    rejected while carving, and answered from the cache."""
+
+    seeds: List[int] = field(default_factory=list)
+    scores: List[Score] = field(default_factory=list)
+    tried: int = 0
+    scored: int = 0
+    rejected_early: int = 0
+    cached: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rate(self) -> float:
+        """Seeds tried per second."""
+        return self.tried / self.elapsed if self.elapsed else 0.0
+
+
+class _Rejected(Exception):
+    """The tree path of the seed being carved misses the length bounds."""
+
+
+class _BoundedGenerator(Genarator):
+    """The "dfs" Genarator, which also measures the entry-to-exit tree
+    path while carving and raises _Rejected as soon as it misses the
+    bounds.  Carves exactly the same maze otherwise."""
+
+    def __init__(self, maze: Maze, rng: Optional[random.Random] = None):
+        super().__init__(maze, rng)
+        self.criteria = Criteria()
+        # Moves of the tree path of the last maze carved (None if the
+        # entry or exit was not reached).
+        self.path_length: Optional[int] = None
+        self._ends: Tuple[int, int] = (-1, -1)
+        self._first: Optional[List[int]] = None
+
+    def _carve_tree(self) -> bytearray:
+        w = self.maze.width
+        (ex, ey), (tx, ty) = self.maze.entry, self.maze.exit
+        self._ends = (ey * w + ex, ty * w + tx)
+        self._first = None
+        self.path_length = None
+        return super()._carve_tree()
+
+    def _on_carve(self, i: int, stack: List[int]) -> None:
+        # When the second of the entry and exit is reached, the path
+        # between the two is what is left of both stacks after their
+        # common prefix.
+        if i != self._ends[0] and i != self._ends[1]:
+            return
+        first = self._first
+        if first is None:
+            self._first = list(stack)
+            return
+        common = 0
+        for a, b in zip(first, stack):
+            if a != b:
+                break
+            common += 1
+        length = len(first) + len(stack) - 2 * common
+        self.path_length = length
+        criteria = self.criteria
+        if criteria.too_short(length) or (
+            self.maze.perfect and criteria.too_long(length)
+        ):
+            raise _Rejected()
+
+
+class _Scorer:
+    """The maze, generator and solver of one configuration, reused for
+    every seed scored in a process."""
+
+    def __init__(self, params: Params) -> None:
+        width, height, entry, exit, perfect, algorithm = params
+        self.maze = Maze(width, height, entry, exit, perfect)
+        if algorithm == "dfs":
+            self.bounded: Optional[_BoundedGenerator] = _BoundedGenerator(
+                self.maze
+            )
+            self.generator: Genarator = self.bounded
+        else:
+            self.bounded = None
+            self.generator = get_algorithm(algorithm)(self.maze)
+        self.solver = Solver(self.maze)
+
+    def score(self, criteria: Criteria, seed: int) -> Score:
+        maze, bounded = self.maze, self.bounded
+        if bounded is not None:
+            bounded.criteria = criteria
+        try:
+            self.generator.generate(seed)
+        except _Rejected:
+            assert bounded is not None and bounded.path_length is not None
+            return Score(seed, bounded.path_length, complete=False)
+        if maze.perfect and bounded is not None and (
+            bounded.path_length is not None
+        ):
+            length = bounded.path_length
+        else:
+            length = max(len(self.solver.solve()) - 1, 0)
+        walls = maze.walls
+        return Score(
+            seed,
+            length,
+            walls.translate(_DEAD_END).count(1),
+            walls.translate(_JUNCTION).count(1),
+            maze.locked.count(0),
+        )
+
+
+_scorer: Optional[_Scorer] = None
+
+
+def _init_worker(params: Params) -> None:
+    global _scorer
+    _scorer = _Scorer(params)
+
+
+def _score_in_worker(criteria: Criteria, seed: int) -> Score:
+    assert _scorer is not None
+    return _scorer.score(criteria, seed)
+
+
+def find_seeds(
+    config: MazeConfig,
+    criteria: Criteria,
+    count: int,
+    workers: Optional[int] = None,
+    seeds: Iterable[int] = range(MAX_TRIES),
+    cache: Optional[ScoreCache] = None,
+) -> SearchResult:
+    """The first count seeds of seeds whose maze meets criteria.
+
+    The result is the same for any number of workers: seeds are scored
+    in rounds and taken in the order they were given.  Fewer seeds are
+    returned if seeds runs out first.
+
+    Args:
+        config: Any object with width, height, entry, exit and perfect
+            attributes (and optionally algorithm), as for generate_many().
+        criteria: The targets.
+        count: Seeds wanted.
+        workers: Worker processes; 1 scores in this process.  Defaults
+            to os.cpu_count().
+        seeds: Candidates, in order (default: 0 to MAX_TRIES - 1).
+        cache: Scores to reuse and add to (default: one shared by every
+            call).
+    """
+    start = time.perf_counter()
+    params = config_params(config)
+    perfect = config.perfect
+    if cache is None:
+        cache = _shared_cache
+    if workers is None:
+        workers = os.cpu_count() or 1
+    result = SearchResult()
+    candidates = iter(seeds)
+    pool: Optional[ProcessPoolExecutor] = None
+    scorer: Optional[_Scorer] = None
+    if workers > 1:
+        pool = ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(params,)
+        )
+        size = workers * ROUND_PER_WORKER
+    else:
+        scorer = _Scorer(params)
+        size = 1
+    try:
+        while len(result.seeds) < count:
+            batch = list(islice(candidates, size))
+            if not batch:
+                break
+            known = {}
+            for seed in batch:
+                score = cache.get(params, seed)
+                if score is not None and (
+                    criteria.accepts(score, perfect) is not None
+                ):
+                    known[seed] = score
+            todo = [seed for seed in batch if seed not in known]
+            if pool is not None:
+                chunksize = max(1, math.ceil(len(todo) / workers))
+                job = partial(_score_in_worker, criteria)
+                scored = list(pool.map(job, todo, chunksize=chunksize))
+            else:
+                assert scorer is not None
+                scored = [scorer.score(criteria, seed) for seed in todo]
+            for score in scored:
+                cache.put(params, score)
+                known[score.seed] = score
+            result.scored += len(scored)
+            result.rejected_early += sum(not s.complete for s in scored)
+            result.cached += len(batch) - len(todo)
+            for seed in batch:
+                result.tried += 1
+                score = known[seed]
+                if criteria.accepts(score, perfect):
+                    result.seeds.append(seed)
+                    result.scores.append(score)
+                    if len(result.seeds) == count:
+                        break
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    result.elapsed = time.perf_counter() - start
+    return result
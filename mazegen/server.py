@@ -0,0 +1,481 @@
+"""Serve mazes over HTTP with asyncio and the standard library only.
+
+Usage:
+    python -m mazegen.server [--host HOST] [--port PORT] [--workers N]
+                             [--pool-size N] [--warm WxH[/imperfect],...]
+
+Endpoints (GET only; HTTP/1.1 keep-alive is supported):
+
+    /maze       A maze.  Query parameters: width and height (default
+                20x15), perfect (1/0, default 1), algorithm (default
+                "dfs"), format ("text", the Writer format, or "binary",
+                the .mzb format; default text) and seed (a signed 64-bit
+                integer).  The seed used is sent back in the X-Maze-Seed
+                header.
+    /metrics    JSON: requests and responses by status, latency
+                percentiles, warm pool hits and misses, coalesced
+                requests, mazes generated, and the pools.
+    /health     "ok".
+
+Generation runs in a process pool, so the event loop only parses
+requests and writes responses.  A response is the whole maze, rendered
+by a worker and held in memory until it is written (MAX_CELLS bounds
+its size).  Requests without a seed are served from a
+warm pool of ready mazes.  Every configuration (width, height, perfect,
+algorithm, format) requested POPULAR_AFTER times, or passed as
+``warm``, keeps POOL_SIZE of them, refilled in the background.
+Requests for a seed that is already being generated wait for that
+generation instead of starting another.  Mazes are entry (0, 0) to exit
+(width - 1, height - 1).
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import multiprocessing
+import random
+import statistics
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import partial
+from typing import (
+    Deque,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+from urllib.parse import parse_qs, urlsplit
+
+from mazegen import MazeGenerator
+from mazegen.algorithms import ALGORITHMS
+from mazegen.binary import SEED_MAX, SEED_MIN, dump_binary
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8042
+POOL_SIZE = 4
+POPULAR_AFTER = 3
+# Most configurations with a warm pool, and most cells of one maze.
+MAX_POOLS = 32
+MAX_CELLS = 4_000_000
+# Latencies kept for the percentiles of /metrics.
+LATENCY_WINDOW = 10_000
+# Longest request line or header line accepted.
+MAX_LINE = 8192
+
+FORMATS = {"text": "text/plain; charset=ascii", "binary": "application/mzb"}
+
+# width, height, perfect, algorithm, format
+Config = Tuple[int, int, bool, str, str]
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    500: "Internal Server Error",
+}
+
+# Generators kept by each worker, one per configuration.  Thread-local,
+# so that a thread pool executor never shares one between two requests.
+_local = threading.local()
+
+
+def render_maze(config: Config, seed: int) -> bytes:
+    """The maze of config and seed, serialized in its format.  Runs in
+    the workers; each reuses one MazeGenerator per configuration."""
+    width, height, perfect, algorithm, fmt = config
+    key = (width, height, perfect, algorithm)
+    generators: Optional[Dict[Tuple[int, int, bool, str], MazeGenerator]]
+    generators = getattr(_local, "generators", None)
+    if generators is None:
+        generators = _local.generators = {}
+    mg = generators.get(key)
+    if mg is None:
+        mg = generators[key] = MazeGenerator(
+            width, height, seed=seed, perfect=perfect, algorithm=algorithm
+        )
+    else:
+        mg.regenerate(seed)
+    if fmt == "binary":
+        buf = io.BytesIO()
+        dump_binary(buf, mg.maze, mg.solution, seed)
+        return buf.getvalue()
+    text = io.StringIO()
+    mg.dump(text)
+    return text.getvalue().encode("ascii")
+
+
+def parse_config(query: Dict[str, List[str]]) -> Tuple[Config, Optional[int]]:
+    """Configuration and seed (None if not given) of a /maze query.
+    Raises ValueError on bad values."""
+
+    def get(name: str, default: str) -> str:
+        return query.get(name, [default])[-1]
+
+    try:
+        width = int(get("width", "20"))
+        height = int(get("height", "15"))
+        seed = int(query["seed"][-1]) if "seed" in query else None
+    except ValueError:
+        raise ValueError("width, height and seed must be integers")
+    if seed is not None and not SEED_MIN <= seed <= SEED_MAX:
+        # The .mzb header keeps the seed in a signed 64-bit field.
+        raise ValueError(f"seed must be from {SEED_MIN} to {SEED_MAX}")
+    if width < 1 or height < 1 or width * height < 2:
+        raise ValueError("the maze needs at least 2 cells")
+    if width * height > MAX_CELLS:
+        raise ValueError(f"at most {MAX_CELLS} cells")
+    perfect = get("perfect", "1").lower() not in ("0", "false", "no")
+    algorithm = get("algorithm", "dfs")
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"unknown algorithm {algorithm!r}")
+    fmt = get("format", "text")
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+    return (width, height, perfect, algorithm, fmt), seed
+
+
+class Metrics:
+    """Request counters and a window of recent latencies."""
+
+    def __init__(self) -> None:
+        self.started = time.time()
+        self.requests = 0
+        self.responses: Dict[int, int] = {}
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.pool_hits = 0
+        self.pool_misses = 0
+        self.coalesced = 0
+        self.generated = 0
+        self.fill_errors = 0
+
+    def record(self, status: int, latency: float) -> None:
+        self.responses[status] = self.responses.get(status, 0) + 1
+        self.latencies.append(latency)
+
+    def snapshot(self) -> Dict[str, object]:
+        latency: Dict[str, float] = {}
+        window = list(self.latencies)
+        if len(window) >= 2:
+            q = statistics.quantiles(window, n=100, method="inclusive")
+            latency = {"p50": q[49], "p90": q[89], "p99": q[98]}
+        if window:
+            latency["max"] = max(window)
+        responses = sorted(self.responses.items())
+        return {
+            "uptime": time.time() - self.started,
+            "requests": self.requests,
+            "responses": {str(k): v for k, v in responses},
+            "latency": latency,
+            "pool_hits": self.pool_hits,
+            "pool_misses": self.pool_misses,
+            "coalesced": self.coalesced,
+            "generated": self.generated,
+            "fill_errors": self.fill_errors,
+        }
+
+
+class MazeServer:
+    """The HTTP service; see the module docstring.
+
+    Args:
+        host, port: Address to listen on; port 0 picks a free one (see
+            .port after start()).
+        workers: Processes of the default process pool (default:
+            os.cpu_count()).
+        pool_size: Ready mazes kept per warm configuration; 0 turns the
+            warm pools off.
+        popular_after: Requests after which a configuration gets a pool.
+        warm: Configurations to keep a pool for from the start.
+        executor: Executor to generate in instead of a process pool
+            (e.g. a ThreadPoolExecutor); not shut down by close().
+    """
+
+    def __init__(
+        self,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        workers: Optional[int] = None,
+        pool_size: int = POOL_SIZE,
+        popular_after: int = POPULAR_AFTER,
+        warm: Iterable[Config] = (),
+        executor: Optional[Executor] = None,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.pool_size = pool_size
+        self.popular_after = popular_after
+        self.metrics = Metrics()
+        self._warm = list(warm)
+        self._executor = executor
+        self._own_executor = executor is None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._pools: Dict[Config, Deque[Tuple[int, bytes]]] = {}
+        self._asked: Dict[Config, int] = {}
+        self._filling: Set[Config] = set()
+        self._tasks: Set["asyncio.Task[None]"] = set()
+        self._inflight: Dict[Tuple[Config, int], "asyncio.Future[bytes]"] = {}
+        self._seeds = random.Random()
+
+    async def start(self) -> None:
+        if self._executor is None:
+            # Forked workers would inherit the open client sockets and keep
+            # them from closing; start them from a clean process instead.
+            methods = multiprocessing.get_all_start_methods()
+            method = "forkserver" if "forkserver" in methods else "spawn"
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context(method),
+            )
+        self._server = await asyncio.start_server(
+            self._handle, self.host, self.port, limit=MAX_LINE
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        for config in self._warm:
+            self._pool(config)
+
+    async def serve_forever(self) -> None:
+        assert self._server is not None
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._own_executor and self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    # Mazes
+
+    async def generate(self, config: Config, seed: int) -> bytes:
+        """The serialized maze, sharing the generation with any request
+        for the same configuration and seed already in progress."""
+        key = (config, seed)
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.metrics.coalesced += 1
+            return await asyncio.shield(pending)
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, render_maze, *key)
+        self._inflight[key] = future
+        # Forget the generation only once it is done, not when the
+        # request that started it goes away, so that later requests for
+        # the same key keep sharing it.
+        future.add_done_callback(partial(self._generated, key))
+        return await asyncio.shield(future)
+
+    def _generated(
+        self, key: Tuple[Config, int], future: "asyncio.Future[bytes]"
+    ) -> None:
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        if not future.cancelled() and future.exception() is None:
+            self.metrics.generated += 1
+
+    def _new_seed(self) -> int:
+        return self._seeds.randrange(2**31)
+
+    def _pool(self, config: Config) -> Optional[Deque[Tuple[int, bytes]]]:
+        """The warm pool of config, started once it is popular."""
+        pool = self._pools.get(config)
+        if pool is None and self.pool_size > 0:
+            asked = self._asked.get(config, 0)
+            if (
+                asked >= self.popular_after or config in self._warm
+            ) and len(self._pools) < MAX_POOLS:
+                pool = self._pools[config] = deque()
+        if pool is not None and config not in self._filling:
+            if len(pool) < self.pool_size:
+                self._filling.add(config)
+                task = asyncio.ensure_future(self._fill(config, pool))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+        return pool
+
+    async def _fill(
+        self, config: Config, pool: Deque[Tuple[int, bytes]]
+    ) -> None:
+        try:
+            while len(pool) < self.pool_size:
+                seed = self._new_seed()
+                pool.append((seed, await self.generate(config, seed)))
+        except Exception:
+            # Requests still get generated mazes; the next one retries.
+            self.metrics.fill_errors += 1
+        finally:
+            self._filling.discard(config)
+
+    async def maze(
+        self, config: Config, seed: Optional[int]
+    ) -> Tuple[int, bytes]:
+        """(seed, data) for a /maze request."""
+        self._asked[config] = self._asked.get(config, 0) + 1
+        if seed is not None:
+            return seed, await self.generate(config, seed)
+        pool = self._pool(config)
+        if pool:
+            self.metrics.pool_hits += 1
+            seed, data = pool.popleft()
+            self._pool(config)
+            return seed, data
+        self.metrics.pool_misses += 1
+        seed = self._new_seed()
+        return seed, await self.generate(config, seed)
+
+    # HTTP
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while await self._respond(reader, writer):
+                pass
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except (asyncio.LimitOverrunError, ValueError):
+            # Line longer than MAX_LINE.
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> bool:
+        """Answer one request; False once the connection is done."""
+        line = await reader.readline()
+        if not line:
+            return False
+        start = time.perf_counter()
+        self.metrics.requests += 1
+        headers: Dict[str, str] = {}
+        while True:
+            header = await reader.readline()
+            if header in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = header.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        parts = line.decode("latin-1").split()
+        keep_alive = (
+            len(parts) == 3
+            and parts[2] == "HTTP/1.1"
+            and headers.get("connection", "").lower() != "close"
+        )
+        extra: Dict[str, str] = {}
+        if len(parts) != 3:
+            status, body, kind = 400, b"bad request line\n", "text/plain"
+        elif parts[0] != "GET":
+            status, body, kind = 405, b"GET only\n", "text/plain"
+            extra["Allow"] = "GET"
+        else:
+            url = urlsplit(parts[1])
+            status, body, kind = 200, b"", "text/plain"
+            if url.path == "/maze":
+                try:
+                    config, seed = parse_config(parse_qs(url.query))
+                    seed, body = await self.maze(config, seed)
+                    kind = FORMATS[config[4]]
+                    extra["X-Maze-Seed"] = str(seed)
+                except ValueError as e:
+                    status, body = 400, f"{e}\n".encode()
+                except Exception as e:
+                    status, body = 500, f"{type(e).__name__}: {e}\n".encode()
+            elif url.path == "/metrics":
+                body = json.dumps(self.snapshot(), indent=1).encode()
+                kind = "application/json"
+            elif url.path == "/health":
+                body = b"ok\n"
+            else:
+                status, body = 404, b"not found\n"
+
+        head = [
+            f"HTTP/1.1 {status} {_REASONS[status]}",
+            f"Content-Type: {kind}",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        head += [f"{k}: {v}" for k, v in extra.items()]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+        writer.write(body)
+        await writer.drain()
+        self.metrics.record(status, time.perf_counter() - start)
+        return keep_alive
+
+    def snapshot(self) -> Dict[str, object]:
+        """What /metrics reports."""
+        data = self.metrics.snapshot()
+        data["pools"] = {
+            _config_name(config): len(pool)
+            for config, pool in self._pools.items()
+        }
+        return data
+
+
+def _config_name(config: Config) -> str:
+    width, height, perfect, algorithm, fmt = config
+    kind = "perfect" if perfect else "imperfect"
+    return f"{width}x{height}/{kind}/{algorithm}/{fmt}"
+
+
+def parse_warm(spec: str) -> List[Config]:
+    """Configurations from "WxH[/imperfect][/FORMAT],..." (dfs)."""
+    configs = []
+    for item in spec.split(","):
+        size, *options = item.split("/")
+        w, _, h = size.partition("x")
+        perfect = "imperfect" not in options
+        fmt = "binary" if "binary" in options else "text"
+        configs.append((int(w), int(h or w), perfect, "dfs", fmt))
+    return configs
+
+
+async def serve(server: MazeServer) -> None:
+    await server.start()
+    print(f"Serving mazes on http://{server.host}:{server.port}/maze")
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+
+def main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(prog="python -m mazegen.server")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--pool-size", type=int, default=POOL_SIZE)
+    parser.add_argument(
+        "--warm",
+        default="",
+        help="configurations to pool from the start, e.g. 20x15,100x100/"
+        "imperfect/binary",
+    )
+    args = parser.parse_args(argv)
+    server = MazeServer(
+        args.host,
+        args.port,
+        args.workers,
+        args.pool_size,
+        warm=parse_warm(args.warm) if args.warm else (),
+    )
+    try:
+        asyncio.run(serve(server))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,41 +1,333 @@
+import heapq
+from array import array
 from collections import deque
-from typing import Deque, Dict, List, Optional, Set
+from typing import Callable, Deque, List, Optional
 
+from mazegen.cell import DIR_BITS, OPEN_DIRS
 from mazegen.maze import Coord, Maze
 
+# Moves and path letters by direction number (N, E, S, W).
+_DX = (0, 1, 0, -1)
+_DY = (-1, 0, 1, 0)
+_DIRECTION_LETTERS = b"NESW" + bytes(252)
+
+
+# Strategies accepted by Solver; "auto" means "tree" for perfect mazes and
+# "bfs" otherwise.
+STRATEGIES = ("auto", "bfs", "bidirectional", "astar", "tree")
+
 
 class Solver:
-    def __init__(self, maze: Maze) -> None:
+    """Shortest paths over a Maze's flat wall storage.
+
+    Search state lives in preallocated ``array`` buffers indexed by cell
+    (y * width + x) that are reused by every call.  Instead of clearing
+    them, each search bumps an epoch number and a cell counts as seen only
+    if its stamp equals the current epoch.
+
+    Strategies:
+        bfs: breadth-first search, exploring N, E, S, W in that order.
+        bidirectional: breadth-first from both ends, meeting in the middle.
+        astar: A* with the Manhattan distance as heuristic.
+        tree: depth-first walk following parent pointers, for perfect
+            mazes where the path is unique.  Falls back to bfs on a
+            maze not flagged perfect, and as soon as it reaches a cell
+            twice.
+    """
+
+    def __init__(self, maze: Maze, strategy: str = "auto") -> None:
         self.maze = maze
+        self.strategy = self._check_strategy(strategy)
+        n = maze.width * maze.height
+        self._offsets = (-maze.width, 1, maze.width, -1)
+        self._epoch = 0
+        self._seen = array("I", [0]) * n
+        self._parent = array("i", [-1]) * n
+        self._seen_back: Optional["array[int]"] = None
+        self._parent_back: Optional["array[int]"] = None
+        self._cost: Optional["array[int]"] = None
+        # What expanded() needs about the last search: its strategy, and
+        # the cells still queued at the end ("tree": the cells expanded).
+        self._searched = ""
+        self._queued = 0
+
+    @staticmethod
+    def _check_strategy(strategy: str) -> str:
+        if strategy not in STRATEGIES:
+            raise ValueError(
+                f"unknown strategy {strategy!r} "
+                f"(expected one of: {', '.join(STRATEGIES)})"
+            )
+        return strategy
+
+    def _next_epoch(self) -> int:
+        self._epoch += 1
+        if self._epoch >= 2**32:
+            n = len(self._seen)
+            self._seen = array("I", [0]) * n
+            if self._seen_back is not None:
+                self._seen_back = array("I", [0]) * n
+            self._epoch = 1
+        return self._epoch
 
-    def solve(self) -> List[Coord]:
-        queue: Deque[Coord] = deque([self.maze.entry])
-        visited: Set[Coord] = {self.maze.entry}
-        parent: Dict[Coord, Optional[Coord]] = {self.maze.entry: None}
+    def expanded(self) -> int:
+        """Cells the last solve() expanded (took off its queue, stack or
+        heap and looked past), 0 before any.
 
+        Derived from the search's epoch stamps on demand, which takes
+        time proportional to the maze, so the searches themselves count
+        nothing.  For "astar" a cell pushed twice counts once.
+        """
+        if self._searched == "tree":
+            return self._queued
+        if not self._searched:
+            return 0
+        reached = self._seen.count(self._epoch)
+        if self._searched == "bidirectional" and self._seen_back:
+            reached += self._seen_back.count(self._epoch)
+        return max(reached - self._queued, 0)
+
+    def solve(
+        self,
+        start: Optional[Coord] = None,
+        goal: Optional[Coord] = None,
+        strategy: Optional[str] = None,
+    ) -> List[Coord]:
+        """Shortest path from start (default: entry) to goal (default:
+        exit) as a list of (x, y) coordinates, or [] if there is none."""
+        if start is None:
+            start = self.maze.entry
+        if goal is None:
+            goal = self.maze.exit
+        strategy = self._check_strategy(strategy or self.strategy)
+        if strategy == "auto":
+            strategy = "tree" if self.maze.perfect else "bfs"
+
+        w = self.maze.width
+        s = start[1] * w + start[0]
+        g = goal[1] * w + goal[0]
+        if s == g:
+            return [start]
+        if strategy == "bfs":
+            found = self._bfs(s, g)
+        elif strategy == "bidirectional":
+            found = self._bidirectional(s, g)
+        elif strategy == "astar":
+            found = self._astar(s, g)
+        else:
+            found = self._tree(s, g)
+        if not found:
+            return []
+
+        path: List[Coord] = []
+        parent = self._parent
+        i = g
+        while i != -1:
+            path.append((i % w, i // w))
+            i = parent[i]
+        path.reverse()
+        return path
+
+    def distance_field(self, source: Optional[Coord] = None) -> "array[int]":
+        """Distance in steps from source (default: entry) to every cell,
+        indexed by y * width + x; -1 where a cell cannot be reached."""
+        if source is None:
+            source = self.maze.entry
+        walls, off = self.maze.walls, self._offsets
+        dist = array("i", [-1]) * len(walls)
+        s = source[1] * self.maze.width + source[0]
+        dist[s] = 0
+        level = [s]
+        depth = 0
+        while level:
+            depth += 1
+            nxt = []
+            for i in level:
+                for d in OPEN_DIRS[walls[i]]:
+                    j = i + off[d]
+                    if dist[j] < 0:
+                        dist[j] = depth
+                        nxt.append(j)
+            level = nxt
+        return dist
+
+    def _bfs(self, s: int, g: int) -> bool:
+        walls, off = self.maze.walls, self._offsets
+        seen, parent = self._seen, self._parent
+        epoch = self._next_epoch()
+        seen[s] = epoch
+        parent[s] = -1
+        queue: Deque[int] = deque([s])
+        self._searched = "bfs"
         while queue:
-            current: Coord = queue.popleft()
+            i = queue.popleft()
+            if i == g:
+                self._queued = len(queue) + 1
+                return True
+            for d in OPEN_DIRS[walls[i]]:
+                j = i + off[d]
+                if seen[j] != epoch:
+                    seen[j] = epoch
+                    parent[j] = i
+                    queue.append(j)
+        self._queued = 0
+        return False
+
+    def _tree(self, s: int, g: int) -> bool:
+        if not self.maze.perfect:
+            return self._bfs(s, g)
+        walls, off = self.maze.walls, self._offsets
+        seen, parent = self._seen, self._parent
+        epoch = self._next_epoch()
+        seen[s] = epoch
+        parent[s] = -1
+        stack = [s]
+        expanded = 0
+        self._searched = "tree"
+        while stack:
+            i = stack.pop()
+            expanded += 1
+            if i == g:
+                self._queued = expanded
+                return True
+            p = parent[i]
+            for d in OPEN_DIRS[walls[i]]:
+                j = i + off[d]
+                if j != p:
+                    if seen[j] == epoch:
+                        # Reached twice: the maze has loops after all.
+                        return self._bfs(s, g)
+                    seen[j] = epoch
+                    parent[j] = i
+                    stack.append(j)
+        self._queued = expanded
+        return False
+
+    def _astar(self, s: int, g: int) -> bool:
+        walls, off = self.maze.walls, self._offsets
+        w = self.maze.width
+        seen, parent = self._seen, self._parent
+        if self._cost is None:
+            self._cost = array("i", [0]) * len(walls)
+        cost = self._cost
+        epoch = self._next_epoch()
+        gy, gx = divmod(g, w)
+
+        seen[s] = epoch
+        cost[s] = 0
+        parent[s] = -1
+        sy, sx = divmod(s, w)
+        heap = [(abs(sx - gx) + abs(sy - gy), 0, s)]
+        self._searched = "astar"
+        while heap:
+            _, neg_c, i = heapq.heappop(heap)
+            if i == g:
+                self._queued = len(heap) + 1
+                return True
+            c = -neg_c
+            if c > cost[i]:
+                continue
+            for d in OPEN_DIRS[walls[i]]:
+                j = i + off[d]
+                if seen[j] != epoch or c + 1 < cost[j]:
+                    seen[j] = epoch
+                    cost[j] = c + 1
+                    parent[j] = i
+                    jy, jx = divmod(j, w)
+                    f = c + 1 + abs(jx - gx) + abs(jy - gy)
+                    heapq.heappush(heap, (f, -(c + 1), j))
+        self._queued = 0
+        return False
 
-            if current == self.maze.exit:
-                path: List[Coord] = []
-                cur: Optional[Coord] = current
+    def _bidirectional(self, s: int, g: int) -> bool:
+        walls, off = self.maze.walls, self._offsets
+        if self._seen_back is None or self._parent_back is None:
+            n = len(walls)
+            self._seen_back = array("I", [0]) * n
+            self._parent_back = array("i", [-1]) * n
+        epoch = self._next_epoch()
+        sides = [
+            (self._seen, self._parent, [s]),
+            (self._seen_back, self._parent_back, [g]),
+        ]
+        for (seen, parent, frontier) in sides:
+            seen[frontier[0]] = epoch
+            parent[frontier[0]] = -1
 
-                while cur is not None:
-                    path.append(cur)
-                    cur = parent[cur]
+        meet = -1
+        while meet < 0 and sides[0][2] and sides[1][2]:
+            # Grow the smaller frontier by one whole level.
+            k = 0 if len(sides[0][2]) <= len(sides[1][2]) else 1
+            seen, parent, frontier = sides[k]
+            other_seen, other_parent, _ = sides[1 - k]
+            nxt = []
+            best = -1
+            for i in frontier:
+                for d in OPEN_DIRS[walls[i]]:
+                    j = i + off[d]
+                    if seen[j] == epoch:
+                        continue
+                    seen[j] = epoch
+                    parent[j] = i
+                    nxt.append(j)
+                    if other_seen[j] == epoch:
+                        length = self._depth(other_parent, j)
+                        if best < 0 or length < best:
+                            best, meet = length, j
+            sides[k] = (seen, parent, nxt)
+        self._searched = "bidirectional"
+        self._queued = len(sides[0][2]) + len(sides[1][2])
+        if meet < 0:
+            return False
 
-                path.reverse()
-                return path
+        # Re-point the backward half so that parents lead from g to s.
+        parent, back = self._parent, self._parent_back
+        cur, nxt_cell = meet, back[meet]
+        while nxt_cell != -1:
+            parent[nxt_cell] = cur
+            cur, nxt_cell = nxt_cell, back[nxt_cell]
+        return True
 
-            x, y = current
-            cell = self.maze.cells[y][x]
+    @staticmethod
+    def _depth(parent: "array[int]", i: int) -> int:
+        depth = 0
+        while parent[i] != -1:
+            i = parent[i]
+            depth += 1
+        return depth
 
-            for d, nx, ny in self.maze.neighbors(x, y):
-                neighbor: Coord = (nx, ny)
 
-                if neighbor not in visited and not cell.is_closed(d):
-                    visited.add(neighbor)
-                    parent[neighbor] = current
-                    queue.append(neighbor)
+def follow_walls(
+    walls_at: Callable[[int, int], int],
+    entry: Coord,
+    exit: Coord,
+    max_steps: int,
+) -> str:
+    """Entry-to-exit path of a perfect maze as an N/E/S/W string.
 
-        return []
+    Walks with a hand on the right wall, which in a tree visits every cell,
+    and cancels each step that immediately walks back.  Only ``walls_at(x,
+    y)`` (the cell's wall nibble) is needed, so the maze can be read lazily,
+    for example from a file.
+    """
+    steps = bytearray()
+    x, y = entry
+    heading = 1
+    for _ in range(max_steps):
+        if (x, y) == exit:
+            return steps.translate(_DIRECTION_LETTERS).decode("ascii")
+        bits = walls_at(x, y)
+        for turn in (1, 0, 3, 2):
+            d = (heading + turn) % 4
+            if not bits & DIR_BITS[d]:
+                break
+        else:
+            break
+        if steps and steps[-1] == (d + 2) % 4:
+            steps.pop()
+        else:
+            steps.append(d)
+        x += _DX[d]
+        y += _DY[d]
+        heading = d
+    raise ValueError("exit is not reachable from entry")
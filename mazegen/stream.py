@@ -0,0 +1,123 @@
+"""Row-streaming generation for mazes too large to hold in memory.
+
+Rows come from Eller's algorithm (mazegen.algorithms.eller_rows) and are
+written in the Writer hex format as soon as they are final, so memory
+depends on the width only.  For a perfect maze a streamed maze is the same
+as ``MazeGenerator(..., algorithm="eller")`` with the same seed.
+"""
+
+import mmap
+import random
+from typing import Dict, Iterator, List, Optional
+
+from mazegen.algorithms import eller_rows
+from mazegen.maze import Coord, pattern_42
+from mazegen.reader import HEX_VALUES
+from mazegen.solver import follow_walls
+from mazegen.writer import Writer
+
+
+def _locked_rows(
+    width: int, height: int, entry: Coord, exit: Coord
+) -> Dict[int, List[int]]:
+    """Validate the dimensions and endpoints like Maze does and return the
+    locked "42" columns of every row that has some."""
+    if width <= 0 or height <= 0:
+        raise ValueError("width/height must be > 0")
+    for x, y in (entry, exit):
+        if not (0 <= x < width and 0 <= y < height):
+            raise ValueError("entry/exit must be inside maze bounds")
+    if entry == exit:
+        raise ValueError("entry and exit must be different")
+
+    locked: Dict[int, List[int]] = {}
+    for x, y in pattern_42(width, height):
+        locked.setdefault(y, []).append(x)
+    if exit[0] in locked.get(exit[1], []):
+        raise ValueError("Exit cannot be on 42 sign.")
+    if entry[0] in locked.get(entry[1], []):
+        raise ValueError("Entry cannot be on 42 sign.")
+    return locked
+
+
+def stream_rows(
+    width: int,
+    height: int,
+    entry: Optional[Coord] = None,
+    exit: Optional[Coord] = None,
+    seed: int = 42,
+    perfect: bool = True,
+) -> Iterator[bytearray]:
+    """Yield the rows of a new maze, top to bottom, as bytearrays of wall
+    nibbles (N=1, E=2, S=4, W=8).
+
+    Arguments mean the same as for MazeGenerator; entry and exit are only
+    validated.  Imperfect mazes get their loops row by row instead of in a
+    separate pass, so they differ from the in-memory ones.
+    """
+    if entry is None:
+        entry = (0, 0)
+    if exit is None:
+        exit = (width - 1, height - 1)
+    locked = _locked_rows(width, height, entry, exit)
+
+    def locked_row(y: int) -> bytearray:
+        row = bytearray(width)
+        for x in locked.get(y, ()):
+            row[x] = 1
+        return row
+
+    return eller_rows(
+        width, height, locked_row, loops=not perfect, rng=random.Random(seed)
+    )
+
+
+def stream_to_file(
+    output_file: str,
+    width: int,
+    height: int,
+    entry: Optional[Coord] = None,
+    exit: Optional[Coord] = None,
+    seed: int = 42,
+    perfect: bool = True,
+    solve: bool = True,
+) -> None:
+    """Generate a maze row by row straight into a Writer-format file.
+
+    With ``solve`` the solution is found by a second pass that walks the
+    rows already written through a read-only mmap of the file; it needs a
+    perfect maze.  Pass ``solve=False`` to leave the path line empty.
+    """
+    if entry is None:
+        entry = (0, 0)
+    if exit is None:
+        exit = (width - 1, height - 1)
+    if solve and not perfect:
+        raise ValueError(
+            "streamed mazes can only be solved when perfect; "
+            "pass solve=False"
+        )
+    rows = stream_rows(width, height, entry, exit, seed, perfect)
+
+    with open(output_file, "w") as f:
+        Writer.write_rows(f, rows)
+        Writer.write_endpoints(f, entry, exit)
+        path = ""
+        if solve:
+            f.flush()
+            path = _solve_file(output_file, width, height, entry, exit)
+        f.write(path + "\n")
+
+
+def _solve_file(
+    path: str, width: int, height: int, entry: Coord, exit: Coord
+) -> str:
+    line = width + 1
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return follow_walls(
+                lambda x, y: HEX_VALUES[mm[y * line + x]],
+                entry,
+                exit,
+                4 * width * height,
+            )
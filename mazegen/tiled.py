@@ -0,0 +1,341 @@
+"""Generate one large maze across processes, a rectangular tile each.
+
+The grid is cut into ``tiles`` rectangles (tile_grid() picks the columns
+and rows).  A worker carves a depth-first spanning forest over the
+unlocked cells of its tile: one tree per piece the "42" or the tile edges
+cut off, usually just one.  Imperfect tiles then get their loops the way
+Genarator._add_loops adds them, checked against the 3x3 rule inside the
+tile.
+
+Back in the calling process the pieces are joined by a randomized
+Kruskal over the seam walls between tiles: a seam wall is opened only
+if it joins two pieces that are not connected yet, so a perfect maze
+stays one spanning tree.  A tree has no open 2x2 area, so these walls
+can never open a 3x3 one either.  Imperfect mazes then open about
+SEAM_LOOPS of the remaining seam walls, each checked with opens_3x3()
+against the whole maze, since the regions across a seam belong to no
+single tile.
+
+Every tile and the seams draw from their own random.Random, seeded from
+the seed, the tile layout and the tile's position.  The maze depends on
+the seed and the number of tiles only, not on the number of workers or
+the order they finish in.  It differs from the serial Genarator maze of
+the same seed.
+"""
+
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from mazegen.cell import DIR_BITS, EAST, NORTH, OPPOSITE_DIR_BITS, SOUTH, WEST
+from mazegen.generator import Genarator
+from mazegen.maze import Maze, opens_3x3
+
+# Share of the seam walls left closed by the joining that imperfect mazes
+# open as loops: about the share of all walls the loop phase opens.
+SEAM_LOOPS = 0.05
+# Smallest tile side: below it seams would outnumber the tile walls.
+MIN_TILE = 8
+
+# x0, y0, width, height of one tile.
+Tile = Tuple[int, int, int, int]
+# Tile walls (row-major, width * height nibbles), the piece of every
+# cell on the tile edge by index within the tile, and the number of
+# pieces.
+TileResult = Tuple[bytes, Dict[int, int], int]
+
+
+def tile_grid(width: int, height: int, tiles: int) -> Tuple[int, int]:
+    """Columns and rows of the tiles: the factorization of tiles whose
+    tiles are closest to square, or of fewer tiles if they would be
+    narrower than MIN_TILE."""
+    if tiles < 1:
+        raise ValueError("tiles must be >= 1")
+    for count in range(tiles, 1, -1):
+        shapes = [
+            (cols, count // cols)
+            for cols in range(1, count + 1)
+            if count % cols == 0
+            and width // cols >= MIN_TILE
+            and height // (count // cols) >= MIN_TILE
+        ]
+        if shapes:
+            return min(
+                shapes,
+                key=lambda s: abs(math.log(width * s[1] / (height * s[0]))),
+            )
+    return (1, 1)
+
+
+def _split(size: int, parts: int) -> List[Tuple[int, int]]:
+    """(start, length) of parts nearly equal spans covering size."""
+    bounds = [size * k // parts for k in range(parts + 1)]
+    return [(bounds[k], bounds[k + 1] - bounds[k]) for k in range(parts)]
+
+
+def _tile_random(
+    seed: int, layout: Tuple[int, int], name: str
+) -> random.Random:
+    # String seeds are hashed with SHA-512, so this is the same in every
+    # process whatever PYTHONHASHSEED is.
+    return random.Random(f"{seed}/{layout[0]}x{layout[1]}/{name}")
+
+
+def carve_tile(
+    width: int,
+    height: int,
+    locked: bytes,
+    rng: random.Random,
+    perfect: bool,
+) -> TileResult:
+    """Carve a depth-first spanning forest over the unlocked cells of one
+    width x height tile (locked: 1 per locked cell), adding loops unless
+    perfect."""
+    n = width * height
+    walls = bytearray([NORTH | EAST | SOUTH | WEST]) * n
+    offsets = (-width, 1, width, -1)
+    visited = bytearray(locked)
+    choice = rng.choice
+    edge: Dict[int, int] = {}
+    border = bytearray(n)
+    for i in range(width):
+        border[i] = border[n - width + i] = 1
+    for i in range(0, n, width):
+        border[i] = border[i + width - 1] = 1
+
+    free = n - locked.count(1)
+    piece = 0
+    scan = 0
+    first = True
+    while free:
+        if first:
+            # Start like Genarator: at a random unlocked cell.
+            start = rng.randrange(n)
+            while locked[start]:
+                start = rng.randrange(n)
+            first = False
+        else:
+            start = visited.index(0, scan)
+            scan = start + 1
+        visited[start] = 1
+        free -= 1
+        if border[start]:
+            edge[start] = piece
+        stack = [start]
+        while stack:
+            i = stack[-1]
+            y, x = divmod(i, width)
+            candidates = []
+            for d, ok in enumerate(
+                (y > 0, x < width - 1, y < height - 1, x > 0)
+            ):
+                if ok and not visited[i + offsets[d]]:
+                    candidates.append(d)
+            if candidates:
+                d = choice(candidates)
+                j = i + offsets[d]
+                walls[i] &= ~DIR_BITS[d]
+                walls[j] &= ~OPPOSITE_DIR_BITS[d]
+                visited[j] = 1
+                free -= 1
+                if border[j]:
+                    edge[j] = piece
+                stack.append(j)
+            else:
+                stack.pop()
+        piece += 1
+
+    if not perfect:
+        _add_tile_loops(walls, width, height, locked, rng)
+    return bytes(walls), edge, piece
+
+
+def _add_tile_loops(
+    walls: bytearray,
+    width: int,
+    height: int,
+    locked: bytes,
+    rng: random.Random,
+) -> None:
+    """Genarator._add_loops for one tile, checked with opens_3x3()."""
+    offsets = (-width, 1, width, -1)
+    num_loops = int((len(walls) - locked.count(1)) * 0.1)
+    attempts = 0
+    max_attempts = num_loops * 10
+    while num_loops > 0 and attempts < max_attempts:
+        attempts += 1
+        i = rng.randrange(len(walls))
+        if locked[i]:
+            continue
+        y, x = divmod(i, width)
+        dirs = [
+            d
+            for d, ok in enumerate(
+                (y > 0, x < width - 1, y < height - 1, x > 0)
+            )
+            if ok
+        ]
+        d = rng.choice(dirs)
+        j = i + offsets[d]
+        if locked[j] or not walls[i] & DIR_BITS[d]:
+            continue
+        if opens_3x3(walls, width, height, i, d):
+            continue
+        walls[i] &= ~DIR_BITS[d]
+        walls[j] &= ~OPPOSITE_DIR_BITS[d]
+        num_loops -= 1
+
+
+def _carve_job(
+    job: Tuple[Tile, bytes, int, Tuple[int, int], int, bool]
+) -> TileResult:
+    (x0, y0, w, h), locked, seed, layout, index, perfect = job
+    rng = _tile_random(seed, layout, f"tile{index}")
+    return carve_tile(w, h, locked, rng, perfect)
+
+
+def _find(parent: List[int], i: int) -> int:
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+class TiledGenerator(Genarator):
+    """Genarator that carves the maze tile by tile in worker processes
+    and stitches the tiles along their seams (see the module docstring).
+
+    Args:
+        maze: The maze to carve.
+        tiles: Number of tiles; the maze depends on it.
+        workers: Worker processes; 1 carves every tile in this process.
+            Defaults to os.cpu_count().  Does not change the maze.
+    """
+
+    vectorize_loops = False
+
+    def __init__(
+        self, maze: Maze, tiles: int = 4, workers: Optional[int] = None
+    ) -> None:
+        super().__init__(maze)
+        self.layout = tile_grid(maze.width, maze.height, tiles)
+        self.workers = workers
+
+    def tiles(self) -> List[Tile]:
+        """(x0, y0, width, height) of every tile, row by row."""
+        cols, rows = self.layout
+        return [
+            (x0, y0, w, h)
+            for y0, h in _split(self.maze.height, rows)
+            for x0, w in _split(self.maze.width, cols)
+        ]
+
+    def generate(self, seed: int) -> None:
+        start = time.perf_counter()
+        maze = self.maze
+        maze.reset()
+        W = maze.width
+        tiles = self.tiles()
+        jobs = []
+        for index, (x0, y0, w, h) in enumerate(tiles):
+            locked = b"".join(
+                maze.locked[y * W + x0:y * W + x0 + w]
+                for y in range(y0, y0 + h)
+            )
+            jobs.append(
+                ((x0, y0, w, h), locked, seed, self.layout, index,
+                 maze.perfect)
+            )
+
+        workers = self.workers or os.cpu_count() or 1
+        workers = min(workers, len(jobs))
+        if workers <= 1:
+            results = [_carve_job(job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_carve_job, jobs))
+
+        # Copy the tiles in and number their pieces globally.
+        piece: Dict[int, int] = {}
+        pieces = 0
+        for (x0, y0, w, h), (walls, edge, count) in zip(tiles, results):
+            for r in range(h):
+                row = (y0 + r) * W + x0
+                maze.walls[row:row + w] = walls[r * w:(r + 1) * w]
+            for i, p in edge.items():
+                y, x = divmod(i, w)
+                piece[(y0 + y) * W + x0 + x] = pieces + p
+            pieces += count
+        carved = time.perf_counter()
+        self._stitch(seed, piece, pieces)
+
+        if maze.validate:
+            maze.check_invariants()
+        stats = self.stats
+        if stats is not None:
+            stats.phases["tiles"] = carved - start
+            stats.phases["stitch"] = time.perf_counter() - carved
+            stats.counters["tiles"] = len(tiles)
+            stats.counters["pieces"] = pieces
+
+    def _seam_walls(self) -> List[int]:
+        """Seam walls between two unlocked cells, encoded as 2 * i for
+        the east wall of cell i and 2 * i + 1 for its south wall."""
+        maze = self.maze
+        W, H = maze.width, maze.height
+        locked = maze.locked
+        seams = []
+        cols, rows = self.layout
+        for x0, _ in _split(W, cols)[1:]:
+            for y in range(H):
+                i = y * W + x0 - 1
+                if not locked[i] and not locked[i + 1]:
+                    seams.append(2 * i)
+        for y0, _ in _split(H, rows)[1:]:
+            for x in range(W):
+                i = (y0 - 1) * W + x
+                if not locked[i] and not locked[i + W]:
+                    seams.append(2 * i + 1)
+        return seams
+
+    def _stitch(self, seed: int, piece: Dict[int, int], pieces: int) -> None:
+        maze = self.maze
+        W, H = maze.width, maze.height
+        walls = maze.walls
+        rng = _tile_random(seed, self.layout, "seams")
+        seams = self._seam_walls()
+        rng.shuffle(seams)
+
+        parent = list(range(pieces))
+        left = []
+        for e in seams:
+            i = e >> 1
+            j = i + (W if e & 1 else 1)
+            ri, rj = _find(parent, piece[i]), _find(parent, piece[j])
+            if ri == rj:
+                left.append(e)
+                continue
+            parent[ri] = rj
+            _open(walls, W, e)
+
+        if maze.perfect:
+            return
+        for e in left:
+            if rng.random() >= SEAM_LOOPS:
+                continue
+            i = e >> 1
+            if not opens_3x3(walls, W, H, i, 2 if e & 1 else 1):
+                _open(walls, W, e)
+
+
+def _open(walls: bytearray, width: int, e: int) -> None:
+    i = e >> 1
+    if e & 1:
+        walls[i] &= ~SOUTH
+        walls[i + width] &= ~NORTH
+    else:
+        walls[i] &= ~EAST
+        walls[i + 1] &= ~WEST
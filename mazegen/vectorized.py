@@ -0,0 +1,396 @@
+"""NumPy versions of the bulk work on a maze: loop insertion and stats.
+
+Importing this module needs NumPy; the rest of mazegen never does and
+only uses it when the import succeeds (see mazegen.generator).
+
+Maze.walls is viewed as a (height, width) ``uint8`` array without a
+copy.  add_loops() makes exactly the choices of Genarator._add_loops
+for the same random state, so a seed gives the same maze with or
+without NumPy:
+
+* Which random numbers an attempt consumes depends only on the visited
+  and locked maps, never on the loops opened so far.  A block of 32-bit
+  Mersenne Twister outputs is drawn at once with getrandbits() and every
+  attempt is decoded from it with array operations, replaying the
+  rejection sampling of randint() and choice().  The generator is then
+  rewound and advanced by the outputs actually used.
+* Candidate walls (closed, between two visited unlocked cells, not the
+  last closed wall of a 3x3 region) are found with array masks, and so
+  are the 3x3 regions that cannot fill up whatever the attempts open.
+  Only the attempts that pick a candidate reach the Python loop, which
+  opens them in order and rechecks the few walls of other regions.
+
+The replay only holds for the stock random.Random; Genarator falls back
+to its own loop for any generator can_replay() turns down.
+"""
+
+import random
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+from mazegen.cell import DIR_BITS, EAST, OPPOSITE_DIR_BITS, SOUTH
+from mazegen.maze import Coord, Maze, opens_3x3
+
+# random.Random methods the replay relies on; a subclass that overrides
+# any of them draws differently (random() alone changes _randbelow).
+_REPLAYED = (
+    "random", "getrandbits", "_randbelow", "randrange", "randint",
+    "choice", "seed", "getstate", "setstate",
+)
+# Bounds on the 32-bit words drawn for the first block.
+MIN_BLOCK = 1 << 12
+MAX_BLOCK = 1 << 22
+
+# _NTH[mask, r]: the r-th direction (0-3 for N, E, S, W) set in mask,
+# which is what choice() returns from Genarator._in_bounds_dirs().
+_NTH = np.zeros((16, 4), np.int64)
+for _mask in range(16):
+    for _r, _d in enumerate(d for d in range(4) if _mask >> d & 1):
+        _NTH[_mask, _r] = _d
+_POPCOUNT = np.array([bin(m).count("1") for m in range(16)], np.int64)
+# Bits randint()/choice() draw to pick one of n values (n.bit_length()).
+_BITS = np.array([max(n.bit_length(), 1) for n in range(5)], np.uint32)
+# (dx, dy) from a cell to the top-left cells of the 3x3 regions that
+# have its east / south wall inside them.
+_EAST_REGIONS = [(dx, dy) for dy in range(3) for dx in range(2)]
+_SOUTH_REGIONS = [(dx, dy) for dy in range(2) for dx in range(3)]
+
+
+def walls_array(maze: Maze) -> NDArray[np.uint8]:
+    """maze.walls as a writable (height, width) uint8 array (no copy)."""
+    return np.frombuffer(maze.walls, np.uint8).reshape(
+        maze.height, maze.width
+    )
+
+
+def _cell_mask(
+    maze: Maze, visited: Optional[bytearray]
+) -> NDArray[np.bool_]:
+    """Flat bool array of the cells loops may join."""
+    free: NDArray[np.bool_] = np.frombuffer(maze.locked, np.uint8) == 0
+    if visited is not None:
+        free &= np.frombuffer(visited, np.uint8) != 0
+    return free
+
+
+def _any_region(
+    flags: NDArray[np.bool_], h: int, w: int, dx: int, dy: int
+) -> NDArray[np.bool_]:
+    """(h, w) array: whether any 3x3 region flagged in flags (indexed by
+    its top-left cell) starts up to dx columns left and dy rows above a
+    cell.  With (dx, dy) = (1, 2) these are the regions that have the
+    cell's east wall inside them, with (2, 1) its south wall."""
+    padded = np.zeros((h + dy, w + dx), bool)
+    padded[dy:dy + flags.shape[0], dx:dx + flags.shape[1]] = flags
+    out = np.zeros((h, w), bool)
+    for oy in range(dy + 1):
+        for ox in range(dx + 1):
+            out |= padded[dy - oy:dy - oy + h, dx - ox:dx - ox + w]
+    return out
+
+
+def _regions_of(
+    wall: NDArray[np.int64], on_east: NDArray[np.bool_], h: int, w: int
+) -> NDArray[np.int64]:
+    """Flat indices (ty * (w - 2) + tx) of the 3x3 regions that have each
+    given wall inside them: the east wall of cell wall[k] where on_east[k],
+    else its south wall.  One index per (wall, region) pair."""
+    y, x = np.divmod(wall, w)
+    tx = np.concatenate(
+        [x[on_east] - dx for dx, _ in _EAST_REGIONS]
+        + [x[~on_east] - dx for dx, _ in _SOUTH_REGIONS]
+    )
+    ty = np.concatenate(
+        [y[on_east] - dy for _, dy in _EAST_REGIONS]
+        + [y[~on_east] - dy for _, dy in _SOUTH_REGIONS]
+    )
+    inside = (tx >= 0) & (tx < w - 2) & (ty >= 0) & (ty < h - 2)
+    regions: NDArray[np.int64] = ty[inside] * (w - 2) + tx[inside]
+    return regions
+
+
+def loop_candidates(
+    maze: Maze, visited: Optional[bytearray] = None
+) -> Tuple[NDArray[np.bool_], NDArray[np.bool_]]:
+    """Walls that a loop could open now, as two (height, width) bool
+    arrays: the east and the south wall of each cell.
+
+    A candidate is closed, joins two unlocked (and, given visited, visited)
+    cells and is not the last closed internal wall of a 3x3 region.
+    Opening walls only ever removes candidates.
+    """
+    east, south, east_blocked, south_blocked = _closed_walls(maze, visited)
+    return east & ~east_blocked, south & ~south_blocked
+
+
+def _closed_walls(
+    maze: Maze, visited: Optional[bytearray]
+) -> Tuple[
+    NDArray[np.bool_], NDArray[np.bool_], NDArray[np.bool_], NDArray[np.bool_]
+]:
+    """The closed east and south walls between cells loops may join, and
+    those that are the last closed internal wall of a 3x3 region."""
+    w, h = maze.width, maze.height
+    walls = walls_array(maze)
+    free = _cell_mask(maze, visited).reshape(h, w)
+    east = (walls & EAST) != 0
+    east[:, :-1] &= free[:, :-1] & free[:, 1:]
+    east[:, -1] = False
+    south = (walls & SOUTH) != 0
+    south[:-1] &= free[:-1] & free[1:]
+    south[-1] = False
+    east_blocked = np.zeros((h, w), bool)
+    south_blocked = np.zeros((h, w), bool)
+    if w >= 3 and h >= 3:
+        counts = np.frombuffer(maze.open_walls_3x3(), np.uint8)
+        full = counts.reshape(h - 2, w - 2) == 11
+        east_blocked = east & _any_region(full, h, w, 1, 2)
+        south_blocked = south & _any_region(full, h, w, 2, 1)
+    return east, south, east_blocked, south_blocked
+
+
+def _next_true(mask: NDArray[np.bool_]) -> NDArray[np.int64]:
+    """Index of the first True at or after each position (and one past
+    the end), len(mask) where there is none."""
+    n = len(mask)
+    idx = np.where(mask, np.arange(n), n)
+    out = np.empty(n + 1, np.int64)
+    out[:n] = np.minimum.accumulate(idx[::-1])[::-1]
+    out[n] = n
+    return out
+
+
+def _decode(
+    words: NDArray[np.uint32],
+    w: int,
+    h: int,
+    free: NDArray[np.bool_],
+    dirs: NDArray[np.int64],
+) -> Tuple[NDArray[np.int64], NDArray[np.int64], NDArray[np.int64]]:
+    """For an attempt starting at every word: the cell, the direction
+    (-1 if choice() is not called) and the start of the next attempt (0
+    if the attempt does not fit in the block, and at the end)."""
+    n = len(words)
+    last = n - 1
+    rx = words >> np.uint32(32 - w.bit_length())
+    ry = words >> np.uint32(32 - h.bit_length())
+    next_x = _next_true(rx < w)
+    next_y = _next_true(ry < h)
+    next_choice = np.stack([
+        _next_true((words >> (32 - _BITS[k])) < k) for k in range(5)
+    ])
+
+    qx = next_x[:n]
+    qy = next_y[np.minimum(qx + 1, n)]
+    cell = ry[np.minimum(qy, last)].astype(np.int64) * w
+    cell += rx[np.minimum(qx, last)]
+    cell = np.where(qy < n, cell, 0)
+    count = _POPCOUNT[dirs[cell]]
+    chooses = free[cell] & (count > 0) & (qy < n)
+    end = np.where(chooses, next_choice[count, np.minimum(qy + 1, n)], qy)
+    fits = end < n
+    r = words[np.minimum(end, last)] >> (32 - _BITS[count])
+    d = np.where(chooses & fits, _NTH[dirs[cell], np.minimum(r, 3)], -1)
+    succ = np.zeros(n + 1, np.int64)
+    succ[:n] = np.where(fits, end + 1, 0)
+    return cell, d, succ
+
+
+def can_replay(rng: Optional[random.Random]) -> bool:
+    """Whether add_loops() makes the same choices as
+    Genarator._add_loops with rng: it must be a random.Random (or the
+    random module's, for None) that does not override how it draws."""
+    if rng is None:
+        return True
+    cls = type(rng)
+    return isinstance(rng, random.Random) and all(
+        getattr(cls, name) is getattr(random.Random, name)
+        for name in _REPLAYED
+    )
+
+
+def add_loops(
+    maze: Maze, visited: bytearray, rng: Optional[random.Random] = None
+) -> Tuple[int, int, int]:
+    """Open about 10% more walls between visited cells, choosing exactly
+    like Genarator._add_loops with the same random state.
+
+    Args:
+        maze: Maze carved by Genarator._carve_tree().
+        visited: Its visited map (1 per carved cell).
+        rng: Random number generator (default: the random module's);
+            see can_replay().
+
+    Returns:
+        The numbers of attempts, of walls opened and of walls rejected
+        by the 3x3 check, as Genarator._add_loops counts them.
+    """
+    w, h = maze.width, maze.height
+    walls = maze.walls
+    getrandbits = random.getrandbits if rng is None else rng.getrandbits
+    getstate = random.getstate if rng is None else rng.getstate
+    setstate = random.setstate if rng is None else rng.setstate
+
+    num_loops = int(visited.count(1) * 0.1)
+    attempts_left = num_loops * 10
+    attempts = opened = rejected = 0
+    if num_loops <= 0:
+        return attempts, opened, rejected
+
+    free = _cell_mask(maze, visited)
+    ys, xs = np.divmod(np.arange(w * h), w)
+    dirs = (
+        (ys > 0) * 1 | (xs < w - 1) * 2 | (ys < h - 1) * 4 | (xs > 0) * 8
+    ).astype(np.int64)
+    east, south, east_blocked, south_blocked = _closed_walls(maze, visited)
+    east_flat, south_flat = east.ravel(), south.ravel()
+    east_blocked_flat = east_blocked.ravel()
+    south_blocked_flat = south_blocked.ravel()
+    counts = None
+    if w >= 3 and h >= 3:
+        counts = np.frombuffer(maze.open_walls_3x3(), np.uint8).reshape(
+            h - 2, w - 2
+        )
+    # The wall on side d of cell i is the east or south wall of cell
+    # i + shift[d].
+    shift = np.array([-w, 0, 0, -1], np.int64)
+    is_east = np.array([False, True, False, True])
+    offsets = (-w, 1, w, -1)
+
+    # Roughly two attempts per loop and five words per attempt, so this
+    # is usually a single block.
+    block = min(max(MIN_BLOCK, 12 * num_loops), MAX_BLOCK)
+    while num_loops > 0 and attempts_left > 0:
+        state = getstate()
+        words = np.frombuffer(
+            getrandbits(32 * block).to_bytes(4 * block, "little"), "<u4"
+        )
+        cell, d, succ = _decode(words, w, h, free, dirs)
+
+        # Follow the attempts from the first word of the block.
+        starts: List[int] = []
+        append = starts.append
+        succ_list = succ.tolist()
+        p = 0
+        for _ in range(attempts_left):
+            q = succ_list[p]
+            if not q:
+                break
+            append(p)
+            p = q
+        if not starts:
+            setstate(state)
+            block *= 2
+            continue
+        attempts_left -= len(starts)
+        used = p
+        tried = len(starts)
+
+        at = np.array(starts, np.int64)
+        picked = np.flatnonzero(d[at] >= 0)
+        ci, di = cell[at[picked]], d[at[picked]]
+        wall = ci + shift[di]
+        on_east = is_east[di]
+        closed = np.where(on_east, east_flat[wall], south_flat[wall])
+        blocked = np.where(
+            on_east, east_blocked_flat[wall], south_blocked_flat[wall]
+        )
+        # Walls of full regions stay closed and are rejected every time.
+        always_rejected = picked[blocked]
+        keep = closed & ~blocked
+        picked, ci, di = picked[keep], ci[keep], di[keep]
+        wall, on_east = wall[keep], on_east[keep]
+
+        # A wall needs the 3x3 check only if one of its regions could
+        # reach 11 open walls: its count now plus every other candidate
+        # inside it.  Trees leave at most 8, so this is rare.
+        sure = np.ones(len(ci), bool)
+        if counts is not None:
+            hits = np.bincount(
+                _regions_of(wall, on_east, h, w), minlength=counts.size
+            )
+            risky = counts + hits.reshape(counts.shape) >= 12
+            if risky.any():
+                sure = np.where(
+                    on_east,
+                    ~_any_region(risky, h, w, 1, 2).ravel()[wall],
+                    ~_any_region(risky, h, w, 2, 1).ravel()[wall],
+                )
+
+        # Open the walls in order; the rare uncertain ones are checked
+        # against the walls as they are then, and the counts are brought
+        # up to date once at the end.
+        done: List[int] = []
+        for k, (i, dk, ok) in enumerate(
+            zip(ci.tolist(), di.tolist(), sure.tolist())
+        ):
+            if not walls[i] & DIR_BITS[dk]:
+                continue
+            if not ok and opens_3x3(walls, w, h, i, dk):
+                rejected += 1
+                continue
+            walls[i] &= ~DIR_BITS[dk]
+            walls[i + offsets[dk]] &= ~OPPOSITE_DIR_BITS[dk]
+            done.append(k)
+            num_loops -= 1
+            if num_loops == 0:
+                tried = int(picked[k]) + 1
+                used = succ_list[starts[tried - 1]]
+                break
+        attempts += tried
+        opened += len(done)
+        rejected += int(np.count_nonzero(always_rejected < tried))
+        if counts is not None and done:
+            done_at = np.array(done, np.int64)
+            regions = _regions_of(wall[done_at], on_east[done_at], h, w)
+            counts += np.bincount(regions, minlength=counts.size).reshape(
+                counts.shape
+            ).astype(np.uint8)
+
+        setstate(state)
+        getrandbits(32 * used)
+    return attempts, opened, rejected
+
+
+def _longest_run(joined: NDArray[np.bool_]) -> int:
+    """Longest run of True along the rows of a 2D bool array."""
+    rows, cols = joined.shape
+    padded = np.zeros((rows, cols + 1), bool)
+    padded[:, :cols] = joined
+    breaks = np.flatnonzero(~padded.ravel())
+    if not breaks.size:
+        return 0
+    return int((np.diff(breaks, prepend=-1) - 1).max())
+
+
+def maze_stats(
+    maze: Maze, solution: Optional[Sequence[Coord]] = None
+) -> Dict[str, int]:
+    """Shape statistics of maze, from array operations on its walls.
+
+    Returns a dict with:
+        cells: Unlocked cells.
+        dead_ends: Unlocked cells with one open side.
+        junctions: Unlocked cells with three or four open sides.
+        longest_corridor: Most cells in a straight line joined by open
+            walls.
+        solution_length: Moves along solution (0 without one).
+    """
+    walls = walls_array(maze)
+    free = np.frombuffer(maze.locked, np.uint8).reshape(walls.shape) == 0
+    open_sides = 4 - _POPCOUNT[walls & 15]
+    east = (walls & EAST) == 0
+    east[:, -1] = False
+    south = (walls & SOUTH) == 0
+    south[-1] = False
+    longest = max(_longest_run(east), _longest_run(south.T))
+    cells = int(free.sum())
+    return {
+        "cells": cells,
+        "dead_ends": int((free & (open_sides == 1)).sum()),
+        "junctions": int((free & (open_sides >= 3)).sum()),
+        "longest_corridor": longest + 1 if cells else 0,
+        "solution_length": max(len(solution) - 1, 0) if solution else 0,
+    }
@@ -0,0 +1,3 @@
+"""Version of the mazegen package (kept in step with pyproject.toml)."""
+
+__version__ = "1.0.0"
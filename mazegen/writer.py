@@ -1,8 +1,33 @@
-from typing import List
+from typing import Iterable, List, TextIO, Union
 
 from mazegen.maze import Coord
 from mazegen.maze import Maze
 
+# bytes.translate() table turning wall nibbles 0-15 into "0"-"f".
+HEX_DIGITS = b"0123456789abcdef" + bytes(240)
+
+
+def hex_row(walls: Union[bytes, bytearray]) -> str:
+    """Hex line (without newline) for one row of wall nibbles."""
+    return walls.translate(HEX_DIGITS).decode("ascii")
+
+
+def path_directions(solution: List[Coord]) -> str:
+    directions = []
+    for i in range(len(solution) - 1):
+        cx, cy = solution[i]
+        nx, ny = solution[i + 1]
+        dx, dy = nx - cx, ny - cy
+        if dx == 1:
+            directions.append("E")
+        elif dx == -1:
+            directions.append("W")
+        elif dy == 1:
+            directions.append("S")
+        else:
+            directions.append("N")
+    return "".join(directions)
+
 
 class Writer:
     def __init__(self, maze: Maze):
@@ -10,31 +35,30 @@ class Writer:
 
     def save(self, solution: List[Coord], output_file: str) -> None:
         with open(output_file, "w") as f:
-            for y in range(self.maze.height):
-                row_bits = []
-                for x in range(self.maze.width):
-                    row_bits.append(self.maze.cells[y][x].to_bits())
-                f.write("".join(row_bits) + "\n")
-
-            f.write("\n")
-
-            ex, ey = self.maze.entry
-            f.write(f"{ex} {ey}\n")
-
-            tx, ty = self.maze.exit
-            f.write(f"{tx} {ty}\n")
-
-            directions = []
-            for i in range(len(solution) - 1):
-                cx, cy = solution[i]
-                nx, ny = solution[i + 1]
-                dx, dy = nx - cx, ny - cy
-                if dx == 1:
-                    directions.append("E")
-                elif dx == -1:
-                    directions.append("W")
-                elif dy == 1:
-                    directions.append("S")
-                else:
-                    directions.append("N")
-            f.write("".join(directions) + "\n")
+            self.dump(solution, f)
+
+    def dump(self, solution: List[Coord], f: TextIO) -> None:
+        """Write the maze and its solution to an open text stream."""
+        w, h = self.maze.width, self.maze.height
+        walls = self.maze.walls
+        self.write_rows(f, (walls[y * w:(y + 1) * w] for y in range(h)))
+        self.write_endpoints(f, self.maze.entry, self.maze.exit)
+        f.write(path_directions(solution) + "\n")
+
+    @staticmethod
+    def write_rows(
+        f: TextIO, rows: Iterable[Union[bytes, bytearray]]
+    ) -> None:
+        """Write the hex grid, one line per row of wall nibbles, and the
+        empty line that ends it.  Rows are written as they arrive."""
+        for row in rows:
+            f.write(hex_row(row) + "\n")
+        f.write("\n")
+
+    @staticmethod
+    def write_endpoints(f: TextIO, entry: Coord, exit: Coord) -> None:
+        ex, ey = entry
+        f.write(f"{ex} {ey}\n")
+
+        tx, ty = exit
+        f.write(f"{tx} {ty}\n")
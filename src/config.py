@@ -9,6 +9,7 @@ class Config:
         self.exit: Coord = (19, 14)
         self.output_file: str = "maze.txt"
         self.perfect: bool = True
+        self.algorithm: str = "dfs"
 
     def load(self, address: str) -> None:
         with open(address, "r") as f:
@@ -33,3 +34,5 @@ class Config:
                     self.output_file = value
                 elif key == "PERFECT":
                     self.perfect = value.lower() == "true"
+                elif key == "ALGORITHM":
+                    self.algorithm = value.lower()
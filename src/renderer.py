@@ -1,7 +1,13 @@
-from typing import FrozenSet, List, Set
+import re
+import shutil
+import sys
+from typing import Dict, List, Optional, Pattern, TextIO, Tuple, Union
 
 from mazegen.maze import Coord
 from mazegen.maze import Maze
+from mazegen.overlay import PathOverlay
+from mazegen.raster import K_END, K_PATH, K_SPACE, K_START, KINDS
+from mazegen.raster import grid_rows, grid_size
 
 WALL_COLORS = [
     None,
@@ -15,86 +21,318 @@ FROZEN = "▒"
 START = "\033[92m█\033[0m"
 END = "\033[91m█\033[0m"
 PATH = "\033[94m█\033[0m"
+# Home the cursor, clear the screen and the scrollback, like clear(1).
+CLEAR = "\033[H\033[2J\033[3J"
+
+# Zoom levels, from closest to farthest: one character per grid
+# character, then half blocks and braille dots packing several grid
+# characters into one.
+MODES = ("full", "half", "braille")
+# Grid characters (columns, rows) covered by one character in each mode.
+SCALE = {"full": (1, 1), "half": (1, 2), "braille": (2, 4)}
+
+# Frames are lists of rows of mazegen.raster kinds (K_SPACE, K_WALL, ...).
+# Kinds -> one placeholder letter each (no letter used in escape codes).
+# _SEPARATOR passes through painting unchanged, so many pieces can be
+# painted in one go and split apart afterwards.
+_PLACEHOLDERS = bytes.maketrans(bytes(range(6)), b" WPSEF")
+_SEPARATOR = "\x06"
+# Placeholder letters -> the characters finally shown.
+_GLYPHS = str.maketrans(
+    {"W": "█", "P": "█", "S": "█", "E": "█", "F": FROZEN}
+)
+
+# Zoomed-out modes: kinds -> dot weight of each position in a character
+# ([column][row]), and kinds -> color flags (path 1, start 2, end 4).
+_BRAILLE_DOTS = [[1, 2, 4, 64], [8, 16, 32, 128]]
+_HALF_DOTS = [[1, 2]]
+_FLAGS = bytes(
+    {K_PATH: 1, K_START: 2, K_END: 4}.get(k, 0) for k in range(256)
+)
+_DOT_TABLES = {
+    weight: bytes(0 if k == K_SPACE else weight for k in range(KINDS))
+    + bytes(256 - KINDS)
+    for weight in (1, 2, 4, 8, 16, 32, 64, 128)
+}
+_DOT_GLYPHS = {
+    "half": str.maketrans({0: " ", 1: "▀", 2: "▄", 3: "█"}),
+    "braille": {i: chr(0x2800 + i) for i in range(256)},
+}
+# Color flags -> placeholder letter; start and end win over the path.
+_FLAG_LETTERS = bytes.maketrans(bytes(range(8)), b"WPSSEESS")
+_SAME_LETTER = re.compile(r"(.)\1*")
+
+# Runs of changed characters, allowing short unchanged gaps that are
+# cheaper to rewrite than to jump over with another cursor move.
+_CHANGED_RUN = re.compile(rb"[^\x00]+(?:\x00{1,6}[^\x00]+)*")
+
+Scheme = List[Tuple[Pattern[str], str]]
+# What to draw over the maze: one path, or an overlay of any number.
+Paths = Union[List[Coord], PathOverlay]
+
+
+def _color_codes(wall_color: Optional[str]) -> Dict[str, Optional[str]]:
+    return {
+        "W": wall_color,
+        "P": PATH[:-len("█" + RESET)],
+        "S": START[:-len("█" + RESET)],
+        "E": END[:-len("█" + RESET)],
+    }
+
+
+def _scheme(wall_color: Optional[str]) -> Scheme:
+    """Substitutions that color each run of same-kind placeholders with
+    one escape sequence instead of one per character."""
+    # Spaces look the same in any color, so a wall run may include them.
+    patterns = {"W": "W(?:[W ]*W)?", "P": "P+", "S": "S", "E": "E"}
+    return [
+        (re.compile(patterns[letter]), code + r"\g<0>" + RESET)
+        for letter, code in _color_codes(wall_color).items()
+        if code is not None
+    ]
+
+
+# Glyph tables, precomputed for each entry of WALL_COLORS.
+_SCHEMES = [_scheme(color) for color in WALL_COLORS]
+_CODES = [_color_codes(color) for color in WALL_COLORS]
 
 
 class Renderer:
-    def __init__(self, maze: Maze):
+    """Draw a maze with ANSI colors.
+
+    render() writes the whole maze in one write.  draw() keeps a view of
+    it on screen instead, sized to the terminal: pan() scrolls it,
+    zoom_out() and zoom_in() switch between MODES.  The first call
+    clears the screen and draws everything, later calls only move the
+    cursor to the characters that changed (path shown or hidden, new
+    maze) and rewrite those, then leave the cursor on the line below.
+    Only the visible part of the maze is ever built, so a draw() costs
+    the same on any maze size.
+
+    Both take the path to show as a list of cells or as a PathOverlay,
+    which can hold several paths (MazeGenerator.path_overlay caches the
+    one of its solution); every path costs the same to draw.
+
+    Args:
+        maze: The maze to draw.
+        out: Stream to write to (default: sys.stdout at draw time).
+        reserve_rows: Terminal lines draw() leaves free below the maze
+            (for a menu).
+        size: (columns, lines) to draw into instead of the terminal size.
+    """
+
+    def __init__(
+        self,
+        maze: Maze,
+        out: Optional[TextIO] = None,
+        reserve_rows: int = 0,
+        size: Optional[Tuple[int, int]] = None,
+    ) -> None:
         self.maze = maze
+        self._out = out
+        self.reserve_rows = reserve_rows
+        self.size = size
+        self.mode = MODES[0]
+        self.origin: Coord = (0, 0)
         self._wall_color_index = 0
+        self._shown: Optional[List[bytes]] = None
+        self._shown_state: Tuple[str, Coord, int] = ("", (0, 0), 0)
+        self._overlay: Optional[PathOverlay] = None
+        self._overlay_path: Optional[List[Coord]] = None
+        self._overlay_len = 0
 
     def rotate_colors(self) -> None:
         self._wall_color_index = (self._wall_color_index + 1) % len(
             WALL_COLORS
         )
 
-    def _wall_char(self) -> str:
-        color = WALL_COLORS[self._wall_color_index]
-        if color is None:
-            return "█"
-        return f"{color}█{RESET}"
-
-    def render(self, solution: List[Coord] = []) -> None:
-        self._path_set: Set[Coord] = set(solution)
-        self._path_edges: Set[FrozenSet[Coord]] = set()
-        for i in range(len(solution) - 1):
-            self._path_edges.add(frozenset((solution[i], solution[i + 1])))
-        w = self._wall_char()
-        print(w * (self.maze.width * 2 + 1))
-        for y in range(self.maze.height):
-            self._render_cell_line(y)
-            self._render_wall_line(y)
-
-    def _is_path_edge(self, a: Coord, b: Coord) -> bool:
-        return frozenset((a, b)) in self._path_edges
-
-    def _cell_char(self, x: int, y: int) -> str:
-        coord = (x, y)
-        if coord == self.maze.entry:
-            return START
-        if coord == self.maze.exit:
-            return END
-        if coord in self._path_set:
-            return PATH
-        if self.maze.cells[y][x].locked:
-            return FROZEN
-        return SPACE
-
-    def _render_cell_line(self, y: int) -> None:
-        line = ""
-        for x in range(self.maze.width):
-            cell = self.maze.cells[y][x]
-            if x == 0:
-                line += self._wall_char() if cell.west else SPACE
-            line += self._cell_char(x, y)
-            if (
-                not cell.east
-                and x < self.maze.width - 1
-                and self._is_path_edge((x, y), (x + 1, y))
-            ):
-                line += PATH
-            else:
-                line += self._wall_char() if cell.east else SPACE
-        print(line)
-
-    def _render_wall_line(self, y: int) -> None:
-        ny = y + 1
-        line = ""
-        for x in range(self.maze.width):
-            cell = self.maze.cells[y][x]
-            has_wall = cell.south
-            if x == 0:
-                line += self._wall_char() if has_wall or cell.west else SPACE
-            if (
-                not has_wall
-                and self.maze.in_bounds(x, ny)
-                and self._is_path_edge((x, y), (x, ny))
-            ):
-                line += PATH
-            else:
-                line += self._wall_char() if has_wall else SPACE
-            has_corner = has_wall or cell.east
-            if x < self.maze.width - 1:
-                next_cell = self.maze.cells[y][x + 1]
-                has_corner = has_corner or next_cell.south
-            line += self._wall_char() if has_corner else SPACE
-        print(line)
+    def invalidate(self) -> None:
+        """Make the next draw() redraw the whole screen."""
+        self._shown = None
+
+    def view_size(self) -> Tuple[int, int]:
+        """Columns and lines available to draw()."""
+        if self.size is not None:
+            columns, lines = self.size
+        else:
+            columns, lines = shutil.get_terminal_size()
+        return columns, max(1, lines - self.reserve_rows)
+
+    def pan(self, dx: int, dy: int) -> None:
+        """Scroll the view by dx columns and dy lines of the screen."""
+        sx, sy = SCALE[self.mode]
+        x, y = self.origin
+        self.origin = (x + dx * sx, y + dy * sy)
+
+    def zoom_out(self) -> None:
+        """Show more of the maze per character, if possible."""
+        self._set_mode(MODES[min(MODES.index(self.mode) + 1, len(MODES) - 1)])
+
+    def zoom_in(self) -> None:
+        """Show less of the maze per character, if possible."""
+        self._set_mode(MODES[max(MODES.index(self.mode) - 1, 0)])
+
+    def _set_mode(self, mode: str) -> None:
+        """Switch to mode keeping the center of the view in place."""
+        columns, lines = self.view_size()
+        sx, sy = SCALE[self.mode]
+        nx, ny = SCALE[mode]
+        x, y = self.origin
+        self.origin = (
+            max(0, x + columns * (sx - nx) // 2),
+            max(0, y + lines * (sy - ny) // 2),
+        )
+        self.mode = mode
+
+    def _write(self, text: str) -> None:
+        out = self._out or sys.stdout
+        out.write(text)
+        out.flush()
+
+    def _paint(self, kinds: bytes) -> str:
+        text = kinds.translate(_PLACEHOLDERS).decode("ascii")
+        for pattern, template in _SCHEMES[self._wall_color_index]:
+            text = pattern.sub(template, text)
+        return text.translate(_GLYPHS)
+
+    def _paint_dots(self, row: bytes) -> str:
+        """Paint a zoomed-out row: dot patterns, then color flags."""
+        n = len(row) // 2
+        text = row[:n].decode("latin-1").translate(_DOT_GLYPHS[self.mode])
+        letters = row[n:].translate(_FLAG_LETTERS).decode("ascii")
+        codes = _CODES[self._wall_color_index]
+        parts = []
+        for m in _SAME_LETTER.finditer(letters):
+            code = codes[m.group(1)]
+            piece = text[m.start():m.end()]
+            parts.append(piece if code is None else code + piece + RESET)
+        return "".join(parts)
+
+    def _path_mask(self, paths: Paths) -> Optional[bytearray]:
+        """Overlay mask of paths; a plain path list gets an overlay kept
+        for as long as the same list is drawn."""
+        if isinstance(paths, PathOverlay):
+            return paths.mask
+        if not paths:
+            return None
+        if paths is not self._overlay_path or len(paths) != self._overlay_len:
+            self._overlay = PathOverlay(self.maze, [paths])
+            self._overlay_path = paths
+            self._overlay_len = len(paths)
+        assert self._overlay is not None
+        return self._overlay.mask
+
+    def _window(
+        self, x0: int, y0: int, x1: int, y1: int, solution: Paths
+    ) -> List[bytes]:
+        """Kind rows y0 to y1 - 1 of the grid, columns x0 to x1 - 1."""
+        mask = self._path_mask(solution)
+        return list(grid_rows(self.maze, mask, x0, y0, x1, y1))
+
+    def _dots(
+        self, rows: List[bytes], width: int, sx: int, sy: int
+    ) -> List[bytes]:
+        """Pack sx x sy grid characters into each character: the dot
+        pattern bytes of a row followed by its color flag bytes."""
+        weights = _BRAILLE_DOTS if sx == 2 else _HALF_DOTS
+        columns = -(-width // sx)
+        blank = bytes(columns * sx)
+        packed = []
+        for r in range(0, len(rows), sy):
+            dots = 0
+            flags = 0
+            for dy in range(sy):
+                row = rows[r + dy] if r + dy < len(rows) else blank
+                row = row.ljust(columns * sx, b"\0")
+                for dx in range(sx):
+                    part = row[dx::sx]
+                    table = _DOT_TABLES[weights[dx][dy]]
+                    dots += int.from_bytes(part.translate(table), "little")
+                    flags |= int.from_bytes(part.translate(_FLAGS), "little")
+            packed.append(
+                dots.to_bytes(columns, "little")
+                + flags.to_bytes(columns, "little")
+            )
+        return packed
+
+    def frame(self, solution: Paths = []) -> List[bytes]:
+        """The whole grid as rows of kinds (K_SPACE, K_WALL, ...), with
+        the cells of solution and the gaps between them marked K_PATH."""
+        return list(grid_rows(self.maze, self._path_mask(solution)))
+
+    def text(self, solution: Paths = []) -> str:
+        """The whole maze as one string, one line per grid row."""
+        return self._paint(b"\n".join(self.frame(solution))) + "\n"
+
+    def render(self, solution: Paths = []) -> None:
+        """Write the whole maze, with solution (a path or a PathOverlay)
+        shown if given."""
+        self._write(self.text(solution))
+
+    def view(self, solution: Paths = []) -> List[bytes]:
+        """Rows of what draw() shows: kinds in "full" mode, packed dots
+        and flags in the others.  Moves origin back inside the maze."""
+        columns, lines = self.view_size()
+        sx, sy = SCALE[self.mode]
+        grid_w, grid_h = grid_size(self.maze)
+        view_w = min(columns * sx, grid_w)
+        view_h = min(lines * sy, grid_h)
+        x = max(0, min(self.origin[0], grid_w - view_w))
+        y = max(0, min(self.origin[1], grid_h - view_h))
+        self.origin = (x, y)
+        rows = self._window(x, y, x + view_w, y + view_h, solution)
+        if self.mode == "full":
+            return rows
+        return self._dots(rows, view_w, sx, sy)
+
+    def _paint_rows(self, rows: List[bytes]) -> str:
+        if self.mode == "full":
+            return self._paint(b"\n".join(rows)) + "\n"
+        return "".join(self._paint_dots(row) + "\n" for row in rows)
+
+    def draw(self, solution: Paths = []) -> None:
+        """Update the view on screen, rewriting only what changed."""
+        rows = self.view(solution)
+        state = (self.mode, self.origin, self._wall_color_index)
+        shown = self._shown
+        below = f"\033[{len(rows) + 1};1H\033[J"
+        if (
+            shown is None
+            or len(shown) != len(rows)
+            or len(shown[0]) != len(rows[0])
+        ):
+            self._write(CLEAR + self._paint_rows(rows))
+        elif state != self._shown_state:
+            # Scrolled, zoomed or every wall changed color: repaint over
+            # the old view, which is less to write than cursor moves.
+            self._write("\033[H" + self._paint_rows(rows) + "\033[J")
+        elif self.mode != "full":
+            self._write(
+                "".join(
+                    f"\033[{r + 1};1H" + self._paint_dots(new)
+                    for r, (old, new) in enumerate(zip(shown, rows))
+                    if old != new
+                )
+                + below
+            )
+        else:
+            moves = []
+            pieces = []
+            for r, (old, new) in enumerate(zip(shown, rows)):
+                if old == new:
+                    continue
+                changed = (
+                    int.from_bytes(old, "little")
+                    ^ int.from_bytes(new, "little")
+                ).to_bytes(len(new), "little")
+                for m in _CHANGED_RUN.finditer(changed):
+                    start, end = m.span()
+                    moves.append(f"\033[{r + 1};{start + 1}H")
+                    pieces.append(new[start:end])
+            painted = self._paint(b"\x06".join(pieces)).split(_SEPARATOR)
+            parts = [""] * (2 * len(moves))
+            parts[::2] = moves
+            parts[1::2] = painted if pieces else []
+            self._write("".join(parts) + below)
+        self._shown = rows
+        self._shown_state = state